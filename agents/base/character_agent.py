@@ -5,14 +5,123 @@ Each character maintains three-tier memory, uses Claude CLI (Claude Code plan) f
 and coordinates through stigmergic bulletin board.
 """
 
+import re
 import json
 import time
+import hashlib
 import subprocess
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from agents.base.hedged_runner import HedgedRunner, CLAUDE_COMMAND
+from agents.base.stream_validator import OutputSpecViolation, StreamValidator, stream_claude
+from utils.tracing import span
+from utils.profiling import profiler
+from utils.usage_ledger import UsageLedger
+from utils.story_timeline import StoryTimeline
+
+
+# Anchor posts: worth best-of-N generation when a run enables it
+ANCHOR_POST_TYPES = ("blog", "editorial")
+
+# Post type specifications (length ranges are also used by utils/quality_scorer.py)
+POST_SPECS = {
+    "social": {
+        "length": "50-150 words (tweet-length)",
+        "description": "Quick, urgent update. Can include image description if relevant.",
+        "include_image": True
+    },
+    "blog": {
+        "length": "300-500 words (anchor post)",
+        "description": "Longer analysis/narrative. Often includes detailed image description.",
+        "include_image": True
+    },
+    "editorial": {
+        "length": "400-600 words (opinion piece)",
+        "description": "Formal op-ed. Can include security footage descriptions.",
+        "include_image": True
+    },
+    "dm": {
+        "length": "100-300 words (private message)",
+        "description": "Confidential message. Often includes specific details/instructions.",
+        "include_image": False
+    },
+    "surveillance": {
+        "length": "200-400 words (security log)",
+        "description": "Security camera or surveillance report. Heavy on technical details and image descriptions.",
+        "include_image": True
+    },
+    "annotation": {
+        "length": "20-60 words (system note)",
+        "description": "One terse system note appended to a procedurally generated log. No greeting, no opinion.",
+        "include_image": False
+    }
+}
+
+# Prompt text shared by every character (also the interned base of agents/base/flyweight_agent.py)
+BEN_STYLE = """
+You write with wit, personality, and vulnerability. You critique power structures explicitly.
+You propose solutions while maintaining healthy skepticism. Show three-dimensional complexity.
+Balance earnestness with sharp observation. Vulnerability and personality evident in every piece."""
+
+SETTING_CONTEXT = """SETTING CONTEXT:
+- You exist in an isolated campus (Akima University)
+- Everything is networked but surveillance-watched
+- Community is divided on refugee protection
+- There's a storm both literal and figurative
+- Technology is salvaged/sustainable hybrid
+- Your posts appear on campus LAN boards"""
+
+GENRE_GUIDE = """GENRE:
+- 60% Cyberpunk: Encryption, resistance, surveillance, power critique
+- 40% Solarpunk: Community action, solutions, hope, nature-tech integration
+- Cypherpunk vocabulary: netrunner, ICE, cyberspace, chrome, jacking, black markets
+- Solarpunk vocabulary: mesh networks, permaculture, bioregion, cooperative, sustainable"""
+
+GROUNDING_INSTRUCTIONS = """INSTRUCTIONS - GROUNDED IN SPECIFIC EVENTS:
+1. ONLY comment on what you personally witnessed or directly experienced
+2. Name specific actions, decisions, moments - not abstractions
+3. "The board rejected emergency shelter" > "Systems of oppression"
+4. "I watched them turn away three families" > "Power structures are cruel"
+5. Reference specific conversations you overheard, decisions you saw, people involved
+6. Ground vulnerability in concrete consequences, not philosophical reflection
+7. Show wit through observation of specific moments, not general commentary
+8. Keep posts 50-300 words
+9. Feel like a witness reporting what happened, not a philosopher
+
+CRITICAL: THIS BOOK IS MADE OF YOUR POSTS. Each post is a story moment.
+- You are reporting events YOU EXPERIENCED
+- Name specific people, locations, decisions, times
+- Posts should advance the plot through your eyes
+- Readers will build the full story from character posts
+- Generic philosophy helps no one. Concrete moments build narrative."""
+
+SHARED_PROMPT_SECTIONS = f"""{SETTING_CONTEXT}
+
+{GENRE_GUIDE}
+
+{GROUNDING_INSTRUCTIONS}
+"""
+
+
+def character_profile(char: Dict, voice_style: str) -> str:
+    """The per-character block of the system prompt."""
+    return f"""YOUR CHARACTER:
+- Background: {char.get('background', 'Unknown')}
+- Age: {char.get('age', 'Unknown')}
+- Motivations: {char.get('motivations', 'Unknown')}
+- Tags/Role: {', '.join(char.get('tags', []))}
+- Social Position: {char.get('social_position', 'student/community')}
+
+VOICE CHARACTERISTICS:
+- Aesthetic lean: {char.get('aesthetic_lean', '60% cyberpunk, 40% solarpunk')}
+- Known for: {char.get('voice_notes', 'Being authentic and thoughtful')}
+- Style: {voice_style}
+"""
+
 
 @dataclass
 class Post:
@@ -31,8 +140,22 @@ class Post:
     def to_dict(self):
         return asdict(self)
 
+    @property
+    def post_id(self) -> str:
+        """Stable content-derived ID, used as the key in draft indexes."""
+        key = f"{self.character_name}|{self.timestamp}|{self.post_type}|{self.content}"
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
     def to_github_issue_body(self) -> str:
         """Format post for GitHub issue creation."""
+        continuity = (self.metadata or {}).get("continuity") or {}
+        continuity_notes = ""
+        if continuity and not continuity.get("ok", True):
+            flags = [f"- Unknown name: {name}" for name in continuity.get("unknown_entities", [])]
+            flags += [f"- Anachronism: \"{a['matched']}\" ({a['event']}, {a['reason']})"
+                      for a in continuity.get("anachronisms", [])]
+            continuity_notes = "\n**Continuity flags:**\n" + "\n".join(flags) + "\n"
+
         return f"""
 ---
 type: draft_post
@@ -48,7 +171,7 @@ post_type: {self.post_type}
 **Location:** {self.location}
 **Encryption:** {self.encryption}
 **Type:** {self.post_type}
-
+{continuity_notes}
 ---
 
 {self.content}
@@ -72,12 +195,21 @@ class CharacterAgent:
         character_name: str,
         character_data: Dict,
         model: str = "claude-3-5-sonnet-20241022",
-        voice_style: str = "ben_west"  # Your writing style as baseline
+        voice_style: str = "ben_west",  # Your writing style as baseline
+        runner: Optional[HedgedRunner] = None,  # Shared hedged CLI runner (None = plain blocking call)
+        stream: bool = False,  # Stream output and abort early on header/length violations
+        ledger: Optional[UsageLedger] = None,  # Shared usage ledger for quota tracking
+        timeline: Optional[StoryTimeline] = None,  # Story timeline for time-correct knowledge
+        announce: bool = True  # Print the init banner (off for short-lived per-call agents)
     ):
         self.character_name = character_name
         self.character_data = character_data
         self.model = model
         self.voice_style = voice_style
+        self.runner = runner
+        self.stream = stream
+        self.ledger = ledger
+        self.timeline = timeline
 
         # Three-tier memory
         self.short_term = []  # Current conversation context
@@ -90,13 +222,16 @@ class CharacterAgent:
         # Generated posts archive
         self.posts_generated = []
 
-        print(f"Initialized {character_name} agent")
+        if announce:
+            print(f"Initialized {character_name} agent")
 
     def generate_post(
         self,
         scenario: str,
         post_type: str = "social",
-        max_retries: int = 3
+        max_retries: int = 3,
+        on_post: Optional[Callable[[Post], None]] = None,
+        as_of: Optional[datetime] = None
     ) -> Optional[Post]:
         """
         Generate a single post in character voice using Claude CLI (Claude Code plan).
@@ -105,42 +240,158 @@ class CharacterAgent:
             scenario: The narrative trigger/context for this post
             post_type: Type of post ("social", "blog", "editorial", "dm", "surveillance")
             max_retries: How many times to retry on failure
+            on_post: Called with the post as soon as it is parsed (forward to downstream stages)
+            as_of: Story time of the post; limits the prompt to events the character knows by then
 
         Returns:
             Post object with generated content, or None if generation failed
         """
+        post = self._generate_candidate(scenario, post_type, max_retries, as_of)
+        if post is None:
+            return None
 
-        for attempt in range(max_retries):
-            try:
-                # Build character context
-                system_prompt = self._build_system_prompt()
-                user_message = self._build_user_prompt(scenario, post_type)
-
-                # Build full prompt combining system + user
-                full_prompt = f"{system_prompt}\n\n{user_message}"
+        # Store in memory
+        self.posts_generated.append(post)
+        self.short_term.append(post)
+        profiler.post_generated()
 
-                # Call Claude through CLI using your Claude Code max plan
-                result = subprocess.run(
-                    ["claude", "--print", "--output-format", "text"],
-                    input=full_prompt,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
+        if on_post:
+            on_post(post)
 
-                if result.returncode != 0:
-                    raise Exception(f"Claude CLI error: {result.stderr}")
+        return post
 
-                generated_content = result.stdout.strip()
+    def generate_best_of(
+        self,
+        scenario: str,
+        post_type: str = "blog",
+        n: int = 3,
+        max_retries: int = 2,
+        on_post: Optional[Callable[[Post], None]] = None,
+        as_of: Optional[datetime] = None,
+        scorer=None,
+        diversity_weight: float = 0.3,
+        archive_dir: str = "./content/candidates"
+    ) -> Optional[Post]:
+        """
+        Generate N candidates concurrently and keep the best one.
 
-                # Parse response for structured post
-                post = self._parse_generated_post(generated_content, post_type, scenario)
+        Candidates run in parallel; a runner built with max_concurrent caps
+        them together with every other agent's calls. Each candidate is ranked
+        by QualityScorer minus a diversity penalty (MinHash similarity to this
+        character's recent posts). The winner is stored like generate_post's
+        result; the runners-up are archived for reference.
 
-                # Store in memory
-                self.posts_generated.append(post)
-                self.short_term.append(post)
+        Args:
+            scenario, post_type, max_retries, on_post, as_of: As for generate_post
+            n: Number of candidates
+            scorer: QualityScorer to rank with (default: one knowing this character's names)
+            diversity_weight: Weight of the similarity penalty in the final rank
+            archive_dir: Where runners-up are written
 
-                return post
+        Returns:
+            The winning Post, or None if every candidate failed
+        """
+        # Imported here: both modules import Post from this one
+        from utils.quality_scorer import QualityScorer
+        from utils.near_duplicate_index import NearDuplicateIndex
+
+        with span("best_of", character=self.character_name, post_type=post_type, n=n):
+            with ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"best-of-{self.character_name}") as pool:
+                futures = [
+                    pool.submit(self._generate_candidate, scenario, post_type, max_retries, as_of)
+                    for _ in range(n)
+                ]
+                candidates = [c for c in (f.result() for f in futures) if c is not None]
+            if not candidates:
+                return None
+
+            scorer = scorer or QualityScorer(
+                known_names=[self.character_name] + list(self.character_data.get("connections") or [])
+            )
+            quality = scorer.score_posts(candidates)
+
+            minhash = NearDuplicateIndex()
+            recent = [minhash.signature(p.content) for p in self.posts_generated[-20:]]
+            ranked = []
+            for candidate, candidate_quality in zip(candidates, quality):
+                signature = minhash.signature(candidate.content)
+                penalty = max(((sig == signature).mean() for sig in recent), default=0.0)
+                ranked.append((float(candidate_quality) - diversity_weight * float(penalty), candidate, float(penalty)))
+            ranked.sort(key=lambda r: -r[0])
+
+            winner = ranked[0][1]
+            winner.metadata["best_of"] = {
+                "n": n,
+                "generated": len(candidates),
+                "candidates": [
+                    {"post_id": c.post_id, "rank_score": round(r, 4), "quality": c.score,
+                     "diversity_penalty": round(penalty, 4)}
+                    for r, c, penalty in ranked
+                ],
+            }
+            runners_up = [c for _, c, _ in ranked[1:]]
+            if runners_up:
+                winner.metadata["best_of"]["archive"] = self._archive_candidates(winner, runners_up, archive_dir)
+
+        self.posts_generated.append(winner)
+        self.short_term.append(winner)
+        profiler.post_generated()
+        if on_post:
+            on_post(winner)
+        return winner
+
+    def _archive_candidates(self, winner: Post, runners_up: List[Post], archive_dir: str) -> str:
+        """Write best-of-N runners-up next to the winner's id."""
+        output_file = Path(archive_dir) / f"{self.character_name}_{datetime.now().isoformat()}.json"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w') as f:
+            json.dump({
+                "character": self.character_name,
+                "winner": winner.post_id,
+                "archived_at": datetime.now().isoformat(),
+                "posts": [p.to_dict() for p in runners_up],
+                "total_posts": len(runners_up)
+            }, f, indent=2, default=str)
+        return str(output_file)
+
+    def _generate_candidate(
+        self,
+        scenario: str,
+        post_type: str,
+        max_retries: int,
+        as_of: Optional[datetime]
+    ) -> Optional[Post]:
+        """Generate and parse one post with retries, without storing it."""
+        for attempt in range(max_retries):
+            try:
+                with span("generate_post", character=self.character_name, post_type=post_type,
+                          attempt=attempt + 1):
+                    with span("prompt_build") as prompt_span:
+                        # Build character context
+                        system_prompt = self._build_system_prompt()
+                        user_message = self._build_user_prompt(scenario, post_type, as_of)
+
+                        # Build full prompt combining system + user
+                        full_prompt = f"{system_prompt}\n\n{user_message}"
+                        prompt_span.set(bytes=len(full_prompt))
+
+                    call_started = time.monotonic()
+                    try:
+                        generated_content = self._call_claude(full_prompt, post_type).strip()
+                    except Exception:
+                        self._record_usage(post_type, full_prompt, "", call_started, success=False)
+                        raise
+                    self._record_usage(post_type, full_prompt, generated_content, call_started, success=True)
+
+                    # Parse response for structured post
+                    with span("parse", bytes=len(generated_content)):
+                        return self._parse_generated_post(generated_content, post_type, scenario, as_of)
+
+            except OutputSpecViolation as e:
+                # Aborted early on a bad response - retry straight away, no backoff needed
+                print(f"Aborted out-of-spec post (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt == max_retries - 1:
+                    return None
 
             except Exception as e:
                 print(f"Error generating post (attempt {attempt + 1}/{max_retries}): {e}")
@@ -149,101 +400,82 @@ class CharacterAgent:
                 else:
                     return None
 
+    def _call_claude(self, full_prompt: str, post_type: str) -> str:
+        """Call Claude through CLI using your Claude Code max plan, hedged if a runner is set."""
+        validator_factory = self._stream_validator_factory(post_type) if self.stream else None
+
+        if self.runner:
+            on_hedge = None
+            if self.ledger:
+                # The call itself is recorded by the caller; each hedge is an extra, unsuccessful call
+                def on_hedge(output: str, seconds: float):
+                    self.ledger.record(self.character_name, post_type, full_prompt, output, seconds, False)
+            return self.runner.run(full_prompt, post_type, validator_factory, on_hedge=on_hedge)
+
+        if validator_factory:
+            return stream_claude(full_prompt, validator_factory(), timeout=30)
+
+        with span("process_spawn"):
+            proc = subprocess.Popen(
+                CLAUDE_COMMAND,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+
+        with span("model_wait") as wait_span:
+            try:
+                stdout, stderr = proc.communicate(input=full_prompt, timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+            wait_span.set(bytes=len(stdout))
+
+        if proc.returncode != 0:
+            raise Exception(f"Claude CLI error: {stderr}")
+
+        return stdout
+
+    def _record_usage(self, post_type: str, prompt: str, output: str, started: float, success: bool):
+        """Every CLI call consumes quota, including failed and aborted ones."""
+        if self.ledger:
+            self.ledger.record(
+                self.character_name, post_type, prompt, output, time.monotonic() - started, success
+            )
+
+    def _stream_validator_factory(self, post_type: str, overrun_factor: float = 1.5) -> Callable[[], StreamValidator]:
+        """Validators allow the post_type's upper word limit plus some slack before aborting."""
+        spec = POST_SPECS.get(post_type, POST_SPECS["social"])
+        upper = re.search(r'\d+\s*-\s*(\d+)', spec["length"])
+        max_words = int(int(upper.group(1)) * overrun_factor) if upper else None
+        return lambda: StreamValidator(max_words=max_words)
+
     def _build_system_prompt(self) -> str:
         """Build the system prompt that defines character."""
-        char = self.character_data
-
-        # Base style from Ben West's writing
-        ben_style = """
-You write with wit, personality, and vulnerability. You critique power structures explicitly.
-You propose solutions while maintaining healthy skepticism. Show three-dimensional complexity.
-Balance earnestness with sharp observation. Vulnerability and personality evident in every piece."""
-
-        # Character-specific details
-        char_prompt = f"""
+        return f"""
 You are {self.character_name} from "Mandate: The Monkey Flower Experiment" by Ben West.
 
-{ben_style}
+{BEN_STYLE}
 
-YOUR CHARACTER:
-- Background: {char.get('background', 'Unknown')}
-- Age: {char.get('age', 'Unknown')}
-- Motivations: {char.get('motivations', 'Unknown')}
-- Tags/Role: {', '.join(char.get('tags', []))}
-- Social Position: {char.get('social_position', 'student/community')}
+{character_profile(self.character_data, self.voice_style)}
+{SHARED_PROMPT_SECTIONS}"""
 
-VOICE CHARACTERISTICS:
-- Aesthetic lean: {char.get('aesthetic_lean', '60% cyberpunk, 40% solarpunk')}
-- Known for: {char.get('voice_notes', 'Being authentic and thoughtful')}
-- Style: {self.voice_style}
-
-SETTING CONTEXT:
-- You exist in an isolated campus (Akima University)
-- Everything is networked but surveillance-watched
-- Community is divided on refugee protection
-- There's a storm both literal and figurative
-- Technology is salvaged/sustainable hybrid
-- Your posts appear on campus LAN boards
-
-GENRE:
-- 60% Cyberpunk: Encryption, resistance, surveillance, power critique
-- 40% Solarpunk: Community action, solutions, hope, nature-tech integration
-- Cypherpunk vocabulary: netrunner, ICE, cyberspace, chrome, jacking, black markets
-- Solarpunk vocabulary: mesh networks, permaculture, bioregion, cooperative, sustainable
-
-INSTRUCTIONS - GROUNDED IN SPECIFIC EVENTS:
-1. ONLY comment on what you personally witnessed or directly experienced
-2. Name specific actions, decisions, moments - not abstractions
-3. "The board rejected emergency shelter" > "Systems of oppression"
-4. "I watched them turn away three families" > "Power structures are cruel"
-5. Reference specific conversations you overheard, decisions you saw, people involved
-6. Ground vulnerability in concrete consequences, not philosophical reflection
-7. Show wit through observation of specific moments, not general commentary
-8. Keep posts 50-300 words
-9. Feel like a witness reporting what happened, not a philosopher
-
-CRITICAL: THIS BOOK IS MADE OF YOUR POSTS. Each post is a story moment.
-- You are reporting events YOU EXPERIENCED
-- Name specific people, locations, decisions, times
-- Posts should advance the plot through your eyes
-- Readers will build the full story from character posts
-- Generic philosophy helps no one. Concrete moments build narrative.
-"""
-        return char_prompt
-
-    def _build_user_prompt(self, scenario: str, post_type: str) -> str:
+    def _build_user_prompt(self, scenario: str, post_type: str, as_of: Optional[datetime] = None) -> str:
         """Build the user message that triggers post generation."""
 
-        # Post type specifications
-        post_specs = {
-            "social": {
-                "length": "50-150 words (tweet-length)",
-                "description": "Quick, urgent update. Can include image description if relevant.",
-                "include_image": True
-            },
-            "blog": {
-                "length": "300-500 words (anchor post)",
-                "description": "Longer analysis/narrative. Often includes detailed image description.",
-                "include_image": True
-            },
-            "editorial": {
-                "length": "400-600 words (opinion piece)",
-                "description": "Formal op-ed. Can include security footage descriptions.",
-                "include_image": True
-            },
-            "dm": {
-                "length": "100-300 words (private message)",
-                "description": "Confidential message. Often includes specific details/instructions.",
-                "include_image": False
-            },
-            "surveillance": {
-                "length": "200-400 words (security log)",
-                "description": "Security camera or surveillance report. Heavy on technical details and image descriptions.",
-                "include_image": True
-            }
-        }
+        spec = POST_SPECS.get(post_type, POST_SPECS["social"])
 
-        spec = post_specs.get(post_type, post_specs["social"])
+        known_events = ""
+        if self.timeline and as_of:
+            events = self.timeline.prompt_context(self.character_name, as_of)
+            if events:
+                known_events = f"""
+
+WHAT YOU KNOW SO FAR (as of {as_of.strftime('%d %B %Y, %I:%M %p')}):
+{events}
+Do not mention anything that happens after this time."""
 
         image_instruction = ""
         if spec.get("include_image"):
@@ -264,7 +496,7 @@ POST TYPE SPECIFICATIONS:
 - Purpose: {spec['description']}
 
 SCENARIO/CONTEXT:
-{scenario}
+{scenario}{known_events}
 
 REQUIRED OUTPUT FORMAT:
 ```
@@ -287,7 +519,8 @@ CRITICAL REQUIREMENTS:
 Generate authentic, voice-consistent post now:
 """
 
-    def _parse_generated_post(self, response: str, post_type: str, scenario: str) -> Post:
+    def _parse_generated_post(self, response: str, post_type: str, scenario: str,
+                              as_of: Optional[datetime] = None) -> Post:
         """Parse Claude's response into structured Post object."""
         # Extract timestamp
         import re
@@ -311,6 +544,16 @@ Generate authentic, voice-consistent post now:
             # Fallback: just use the whole response
             content = response.strip()
 
+        # Record which REQUIRED OUTPUT FORMAT header fields the response carried
+        header_fields = [
+            name for name, found in (
+                ("timestamp", timestamp_match),
+                ("network_location", location_match),
+                ("encryption", encryption_match),
+                ("user", re.search(r'^user:', response, re.MULTILINE)),
+            ) if found
+        ]
+
         # Extract image descriptions
         images = []
         image_matches = re.findall(r'\[image:\s*(.+?)\]', response)
@@ -324,34 +567,44 @@ Generate authentic, voice-consistent post now:
         post = Post(
             character_name=self.character_name,
             content=content,
-            timestamp=f"{datetime.now().date()} {timestamp}",
+            timestamp=f"{(as_of or datetime.now()).date()} {timestamp}",
             location=location,
             encryption=encryption,
             post_type=post_type,
-            metadata={"scenario": scenario},
+            metadata={"scenario": scenario, "format_header": header_fields,
+                      "as_of": as_of.isoformat() if as_of else None},
             images=images if images else None
         )
 
         return post
 
-    def save_posts_to_json(self, output_file: str = None):
-        """Save generated posts to JSON file."""
+    def restore_posts(self, posts: List[Post]):
+        """Reload previously generated posts (e.g. from a run journal) into memory."""
+        self.posts_generated.extend(posts)
+        self.short_term.extend(posts)
+
+    def save_posts_to_json(self, output_file: str = None, posts: Optional[List[Post]] = None):
+        """Save generated posts (default: all of them) to JSON file."""
+        if posts is None:
+            posts = self.posts_generated
         if not output_file:
             output_file = f"./content/drafts/{self.character_name}_{datetime.now().isoformat()}.json"
 
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
 
-        posts_data = {
-            "character": self.character_name,
-            "generated_at": datetime.now().isoformat(),
-            "posts": [p.to_dict() for p in self.posts_generated],
-            "total_posts": len(self.posts_generated)
-        }
+        with span("json_write", character=self.character_name, posts=len(posts)) as write_span:
+            posts_data = {
+                "character": self.character_name,
+                "generated_at": datetime.now().isoformat(),
+                "posts": [p.to_dict() for p in posts],
+                "total_posts": len(posts)
+            }
 
-        with open(output_file, 'w') as f:
-            json.dump(posts_data, f, indent=2, default=str)
+            with open(output_file, 'w') as f:
+                json.dump(posts_data, f, indent=2, default=str)
+                write_span.set(bytes=f.tell())
 
-        print(f"✓ Saved {len(self.posts_generated)} posts to {output_file}")
+        print(f"✓ Saved {len(posts)} posts to {output_file}")
         return output_file
 
     def print_posts(self):
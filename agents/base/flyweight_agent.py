@@ -0,0 +1,286 @@
+"""
+Flyweight agents for large background casts: students, staff and refugees
+posting on the campus LAN.
+
+A CharacterAgent holds its own codex entry, memory lists and conversation
+history, which suits the dozen named characters but not a crowd. Here the
+heavy parts are shared:
+
+- Archetype: one per kind of background voice. Its system-prompt prefix
+  (BEN_STYLE, profile and the shared setting/genre/grounding sections) is
+  rendered once per archetype and interned.
+- FlyweightAgent: a __slots__ record of name, archetype and a small dict of
+  deltas (only what differs from the archetype).
+- BackgroundCast: the shared runner, ledger and timeline plus every
+  member's posts. A CharacterAgent view of a member exists only for the
+  duration of one generation.
+
+Construction cost per member is one small object, so a 100x larger cast
+costs ~100x a few hundred bytes rather than 100x a full agent.
+"""
+
+import sys
+import json
+import random
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from agents.base.character_agent import BEN_STYLE, SHARED_PROMPT_SECTIONS, CharacterAgent, Post, character_profile
+from agents.base.hedged_runner import HedgedRunner
+from utils.story_timeline import StoryTimeline
+from utils.usage_ledger import UsageLedger
+
+
+@dataclass(frozen=True)
+class Archetype:
+    """Codex-style profile shared by every member of one kind of background voice."""
+    name: str
+    background: str
+    motivations: str
+    voice_notes: str
+    social_position: str
+    tags: Tuple[str, ...] = ()
+    aesthetic_lean: str = "60% cyberpunk, 40% solarpunk"
+    # Delta values members are drawn from by BackgroundCast.populate()
+    variations: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+    def as_character_data(self) -> Dict:
+        return {
+            "background": self.background, "motivations": self.motivations, "tags": list(self.tags),
+            "social_position": self.social_position, "aesthetic_lean": self.aesthetic_lean,
+            "voice_notes": self.voice_notes,
+        }
+
+
+ARCHETYPES = {
+    "student": Archetype(
+        name="student",
+        background="Akima University student living on campus through the storm and the refugee crisis.",
+        motivations="Get through the semester, keep friends safe, figure out which side to be on.",
+        voice_notes="Quick, informal LAN posts; rumors, screenshots, dorm gossip, sudden earnestness",
+        social_position="student",
+        tags=("background", "student"),
+        variations=(
+            ("year", ("first-year", "second-year", "third-year", "final-year", "grad student")),
+            ("lives_in", ("Student Housing Block A", "the dorms", "off-campus, stranded by the storm")),
+            ("stance", ("sympathetic to the refugees", "worried about resources", "undecided", "organizing")),
+        ),
+    ),
+    "staff": Archetype(
+        name="staff",
+        background="University staff keeping buildings, networks and food service running.",
+        motivations="Keep the place working; avoid getting blamed for decisions made above them.",
+        voice_notes="Practical and tired; knows where things actually are; careful about what they say on record",
+        social_position="staff",
+        tags=("background", "staff"),
+        variations=(
+            ("role", ("facilities", "dining hall", "IT and network ops", "residence life", "library")),
+            ("tenure", ("new hire", "ten years in", "about to retire")),
+            ("stance", ("quietly helping", "following orders", "fed up with the board")),
+        ),
+    ),
+    "refugee": Archetype(
+        name="refugee",
+        background="Displaced by the storm and the crisis outside, sheltering at or near Akima University.",
+        motivations="Safety, shelter and information for their family; being treated as people, not statistics.",
+        voice_notes="Plain, specific, guarded; posts from borrowed devices; gratitude and anger side by side",
+        social_position="refugee/outsider",
+        tags=("background", "refugee"),
+        variations=(
+            ("sheltering_at", ("the south field", "the gym", "the commons", "the woods")),
+            ("with", ("two kids", "an elderly parent", "no one", "a neighbor's family")),
+            ("device", ("a borrowed phone", "a library terminal", "a mesh handset")),
+        ),
+    ),
+    "faculty": Archetype(
+        name="faculty",
+        background="Akima University faculty member caught between the board and their students.",
+        motivations="Protect students and their own standing; make the institution live up to its words.",
+        voice_notes="Measured, slightly formal, occasionally sharp; cites policy and precedent",
+        social_position="faculty",
+        tags=("background", "faculty"),
+        variations=(
+            ("department", ("ecology", "computer science", "sociology", "engineering", "nursing")),
+            ("stance", ("pushing the board", "cautious", "openly defiant")),
+        ),
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def archetype_prefix(archetype: Archetype, voice_style: str = "ben_west") -> str:
+    """The shared system-prompt prefix for an archetype, rendered once and interned."""
+    return sys.intern(f"""
+You are one of the many background voices on the campus LAN in "Mandate: The Monkey Flower Experiment" by Ben West.
+
+{BEN_STYLE}
+
+{character_profile(archetype.as_character_data(), voice_style)}
+{SHARED_PROMPT_SECTIONS}""")
+
+
+class FlyweightAgent:
+    """One background voice: a name, a shared archetype and only its own deltas."""
+
+    __slots__ = ("name", "archetype", "deltas")
+
+    def __init__(self, name: str, archetype: Archetype, deltas: Optional[Dict[str, str]] = None):
+        self.name = sys.intern(name)
+        self.archetype = archetype
+        self.deltas = deltas or None  # shared and read-only; None for members identical to their archetype
+
+    def system_prompt(self, voice_style: str = "ben_west") -> str:
+        lines = [f"YOU ARE: {self.name} ({self.archetype.name})"]
+        lines += [f"- {key.replace('_', ' ').capitalize()}: {value}" for key, value in (self.deltas or {}).items()]
+        return f"{archetype_prefix(self.archetype, voice_style)}\n" + "\n".join(lines) + "\n"
+
+    def __repr__(self):
+        return f"FlyweightAgent({self.name!r}, {self.archetype.name!r}, {self.deltas!r})"
+
+
+class _MemberVoice(CharacterAgent):
+    """Short-lived CharacterAgent view of one cast member, for a single generation."""
+
+    def __init__(self, member: FlyweightAgent, cast: "BackgroundCast"):
+        # No codex entry: the system prompt comes from the member's archetype and deltas
+        super().__init__(member.name, {}, model=cast.model, voice_style=cast.voice_style, runner=cast.runner,
+                         stream=cast.stream, ledger=cast.ledger, timeline=cast.timeline, announce=False)
+        self._member = member
+
+    def _build_system_prompt(self) -> str:
+        return self._member.system_prompt(self.voice_style)
+
+
+class BackgroundCast:
+    """Shared generation context and post archive for many flyweight agents."""
+
+    def __init__(
+        self,
+        archetypes: Dict[str, Archetype] = None,
+        runner: Optional[HedgedRunner] = None,
+        stream: bool = False,
+        ledger: Optional[UsageLedger] = None,
+        timeline: Optional[StoryTimeline] = None,
+        model: str = "claude-3-5-sonnet-20241022",
+        voice_style: str = "ben_west"
+    ):
+        self.archetypes = archetypes or ARCHETYPES
+        self.runner = runner
+        self.stream = stream
+        self.ledger = ledger
+        self.timeline = timeline
+        self.model = model
+        self.voice_style = voice_style
+        self.members: Dict[str, FlyweightAgent] = {}
+        self.posts: List[Post] = []
+        self._deltas: Dict[Tuple, Dict[str, str]] = {}  # identical delta sets share one dict
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, name: str, archetype: str, **deltas) -> FlyweightAgent:
+        if deltas:
+            deltas = self._deltas.setdefault(tuple(sorted(deltas.items())), deltas)
+        member = FlyweightAgent(name, self.archetypes[archetype], deltas)
+        self.members[member.name] = member
+        return member
+
+    def populate(self, archetype: str, count: int, seed: Optional[int] = None) -> List[FlyweightAgent]:
+        """Add `count` members with LAN handles and deltas drawn from the archetype's variations."""
+        rng = random.Random(seed)
+        spec = self.archetypes[archetype]
+        start = sum(1 for m in self.members.values() if m.archetype is spec)
+        added = []
+        for i in range(start, start + count):
+            deltas = {key: rng.choice(values) for key, values in spec.variations}
+            added.append(self.add(f"{archetype}_{i:04d}", archetype, **deltas))
+        return added
+
+    def generate_post(
+        self,
+        member: Union[str, FlyweightAgent],
+        scenario: str,
+        post_type: str = "social",
+        max_retries: int = 2,
+        on_post: Optional[Callable[[Post], None]] = None,
+        as_of: Optional[datetime] = None
+    ) -> Optional[Post]:
+        """
+        Generate one post in a cast member's voice.
+
+        Args:
+            member: Member or member name
+            scenario: The situation/prompt for the post
+            post_type: Type of post (see POST_SPECS)
+            max_retries: Attempts before giving up
+            on_post: Called with the post as soon as it is parsed
+            as_of: Story time of the post; limits the prompt to events known by then
+
+        Returns:
+            Post (also kept in self.posts), or None if generation failed
+        """
+        if isinstance(member, str):
+            member = self.members[member]
+        post = _MemberVoice(member, self)._generate_candidate(scenario, post_type, max_retries, as_of)
+        if post is None:
+            return None
+        post.metadata["archetype"] = member.archetype.name
+        post.metadata["background_cast"] = True
+        self.posts.append(post)
+        if on_post:
+            on_post(post)
+        return post
+
+    def save_posts_to_json(self, output_file: str = None, posts: Optional[List[Post]] = None) -> str:
+        """Save cast posts (default: all of them) to one drafts file."""
+        posts = self.posts if posts is None else posts
+        output_file = output_file or f"./content/drafts/background_cast_{datetime.now().isoformat()}.json"
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w') as f:
+            json.dump({
+                "character": "background_cast",
+                "generated_at": datetime.now().isoformat(),
+                "posts": [p.to_dict() for p in posts],
+                "total_posts": len(posts)
+            }, f, indent=2, default=str)
+        print(f"✓ Saved {len(posts)} background posts to {output_file}")
+        return output_file
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m agents.base.flyweight_agent
+    # Memory, construction and prompt-render cost per cast size, flyweight vs full CharacterAgent
+    import io
+    import time
+    import tracemalloc
+    import contextlib
+
+    with open("./data/character_codex.json") as f:
+        codex_entry = json.load(f)["characters"]["Chris"]
+    builders = (
+        ("flyweight", lambda n: BackgroundCast().populate("student", n, seed=1),
+         lambda member: member.system_prompt()),
+        ("CharacterAgent", lambda n: [CharacterAgent(f"student_{i:04d}", dict(codex_entry)) for i in range(n)],
+         lambda agent: agent._build_system_prompt()),
+    )
+    for size in (100, 1000, 10000):
+        for label, build, render in builders:
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                cast = build(size)
+                built = time.perf_counter() - started
+                started = time.perf_counter()
+                for agent in cast:
+                    render(agent)
+                rendered = time.perf_counter() - started
+                del cast
+                tracemalloc.start()
+                cast = build(size)
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            print(f"{label:15} {size:6d} agents: {current / size:6.0f} B/agent, "
+                  f"{built / size * 1e6:5.1f} µs/agent to build, {rendered / size * 1e6:5.1f} µs/prompt")
+            del cast
@@ -0,0 +1,253 @@
+"""
+Hedged Claude CLI calls - cut tail latency on post generation.
+
+When a call runs past the observed p90 latency for its post_type, an
+identical second request is launched. Whichever finishes first wins; the
+other process is killed. A shared budget caps how many hedges can be in
+flight at once so hedging never doubles total load.
+"""
+
+import os
+import json
+import time
+import signal
+import queue
+import threading
+import subprocess
+from pathlib import Path
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from agents.base.stream_validator import (
+    CLAUDE_STREAM_COMMAND, OutputSpecViolation, StreamValidator, read_stream
+)
+from utils.tracing import span
+
+CLAUDE_COMMAND = ["claude", "--print", "--output-format", "text"]
+
+
+class LatencyTracker:
+    """Rolling per-post_type latency window used to pick the hedge delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 10):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, post_type: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(post_type, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, post_type: str, q: float) -> Optional[float]:
+        """Return the q-quantile latency, or None until min_samples calls have been seen."""
+        with self._lock:
+            samples = sorted(self._samples.get(post_type, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(int(q * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def save(self, path: str = "./data/latency_stats.json"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {post_type: list(samples) for post_type, samples in self._samples.items()}
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str = "./data/latency_stats.json", **kwargs) -> "LatencyTracker":
+        tracker = cls(**kwargs)
+        if Path(path).exists():
+            with open(path) as f:
+                for post_type, samples in json.load(f).items():
+                    for seconds in samples:
+                        tracker.record(post_type, seconds)
+        return tracker
+
+
+class HedgedRunner:
+    """
+    Runs the Claude CLI with hedging. One instance should be shared by all
+    agents in a run so the hedge budget and latency stats are global.
+    """
+
+    def __init__(
+        self,
+        tracker: Optional[LatencyTracker] = None,
+        max_hedges: int = 2,
+        hedge_quantile: float = 0.9,
+        timeout: float = 30,
+        command: List[str] = None,
+        stream_command: List[str] = None,
+        max_concurrent: Optional[int] = None
+    ):
+        self.tracker = tracker or LatencyTracker()
+        self.hedge_quantile = hedge_quantile
+        self.timeout = timeout
+        self.command = command or CLAUDE_COMMAND
+        self.stream_command = stream_command or CLAUDE_STREAM_COMMAND
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges)
+        # Global cap on in-flight primary calls (None = unbounded); hedges have their own budget
+        self._call_slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+        self.stats = {"calls": 0, "hedges_launched": 0, "hedges_won": 0, "hedges_skipped": 0}
+        self._stats_lock = threading.Lock()
+
+    def run(
+        self,
+        prompt: str,
+        post_type: str,
+        validator_factory: Optional[Callable[[], StreamValidator]] = None,
+        on_hedge: Optional[Callable[[str, float], None]] = None
+    ) -> str:
+        """
+        Run one generation call, hedging it if it runs long.
+
+        Args:
+            prompt: Full prompt sent on stdin
+            post_type: Used to look up the hedge delay
+            validator_factory: If set, stream each process's output through a
+                fresh validator and abort it early when out of spec
+            on_hedge: Called once per hedge process when it finishes or is
+                killed, with (output, wall_seconds) - hedges use quota too
+
+        Returns:
+            stdout of the winning process
+
+        Raises:
+            TimeoutError if no process finishes within `timeout`
+            OutputSpecViolation if every launched process was aborted as out of spec
+            RuntimeError if every launched process fails
+        """
+        if self._call_slots is None:
+            return self._run(prompt, post_type, validator_factory, on_hedge)
+
+        with span("slot_wait"):
+            self._call_slots.acquire()
+        try:
+            return self._run(prompt, post_type, validator_factory, on_hedge)
+        finally:
+            self._call_slots.release()
+
+    def _run(
+        self,
+        prompt: str,
+        post_type: str,
+        validator_factory: Optional[Callable[[], StreamValidator]],
+        on_hedge: Optional[Callable[[str, float], None]] = None
+    ) -> str:
+        """One hedged call; run() holds a concurrency slot around it."""
+        self._count("calls")
+        results = queue.Queue()
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        primary = self._launch(prompt, results, False, validator_factory)
+        running = [primary]
+        hedge_holding_slot = False
+        hedge_started = None
+        hedge_delay = self.tracker.quantile(post_type, self.hedge_quantile)
+        errors = []
+
+        try:
+            with span("model_wait", hedge_delay=hedge_delay) as wait_span:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"Claude CLI timed out after {self.timeout}s")
+
+                    # Wait until the hedge point first, then until the deadline
+                    wait = remaining
+                    can_hedge = hedge_delay is not None and len(running) == 1 and not errors
+                    if can_hedge:
+                        wait = min(wait, max(started + hedge_delay - time.monotonic(), 0))
+
+                    try:
+                        proc, hedge, returncode, stdout, stderr, elapsed = results.get(timeout=wait)
+                    except queue.Empty:
+                        if can_hedge and time.monotonic() < deadline:
+                            if self._hedge_slots.acquire(blocking=False):
+                                hedge_holding_slot = True
+                                hedge_started = time.monotonic()
+                                self._count("hedges_launched")
+                                running.append(self._launch(prompt, results, True, validator_factory))
+                            else:
+                                self._count("hedges_skipped")
+                            hedge_delay = None
+                        continue
+
+                    running = [p for p in running if p is not proc]
+                    if hedge and on_hedge:
+                        on_hedge(stdout, elapsed)
+                    if returncode == 0:
+                        self.tracker.record(post_type, elapsed)
+                        if hedge:
+                            self._count("hedges_won")
+                        wait_span.set(bytes=len(stdout), hedged=hedge_holding_slot, hedge_won=hedge)
+                        return stdout
+
+                    errors.append(stderr)
+                    if not running:
+                        if all(isinstance(e, OutputSpecViolation) for e in errors):
+                            raise errors[0]
+                        raise RuntimeError(f"Claude CLI error: {' | '.join(str(e) for e in errors)}")
+        finally:
+            for proc in running:
+                self._kill(proc)
+                if on_hedge and proc is not primary:
+                    on_hedge("", time.monotonic() - hedge_started)
+            if hedge_holding_slot:
+                self._hedge_slots.release()
+
+    def _launch(
+        self,
+        prompt: str,
+        results: queue.Queue,
+        hedge: bool,
+        validator_factory: Optional[Callable[[], StreamValidator]]
+    ) -> subprocess.Popen:
+        started = time.monotonic()
+        with span("process_spawn", hedge=hedge):
+            proc = subprocess.Popen(
+                self.stream_command if validator_factory else self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                start_new_session=True  # own process group so the whole CLI tree can be killed
+            )
+
+        def wait_for_output():
+            if validator_factory:
+                # Streamed: succeed as soon as the body completes, fail fast when out of spec
+                try:
+                    stdout, stderr, returncode = read_stream(proc, prompt, validator_factory()), "", 0
+                except (OutputSpecViolation, RuntimeError, OSError, ValueError) as e:
+                    stdout, stderr, returncode = "", e, 1
+                results.put((proc, hedge, returncode, stdout, stderr, time.monotonic() - started))
+                return
+
+            try:
+                stdout, stderr = proc.communicate(input=prompt)
+            except (OSError, ValueError) as e:
+                stdout, stderr = "", str(e)
+            results.put((proc, hedge, proc.returncode, stdout, stderr, time.monotonic() - started))
+
+        threading.Thread(target=wait_for_output, daemon=True).start()
+        return proc
+
+    def _kill(self, proc: subprocess.Popen):
+        if proc.poll() is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
@@ -0,0 +1,190 @@
+"""
+Streaming Claude CLI output with early abort on format/length violations.
+
+Reads `claude --output-format stream-json` incrementally and checks the
+REQUIRED OUTPUT FORMAT header and running word count as text arrives. A
+response that skips the header or runs far past the post_type's word limit
+is killed right away instead of costing the full generation time.
+"""
+
+import os
+import re
+import json
+import signal
+import threading
+import subprocess
+from typing import List, Optional, Tuple
+
+from utils.tracing import span
+
+CLAUDE_STREAM_COMMAND = [
+    "claude", "--print", "--output-format", "stream-json", "--verbose", "--include-partial-messages"
+]
+
+
+class OutputSpecViolation(Exception):
+    """Raised when a streamed response is clearly out of spec."""
+
+
+class StreamValidator:
+    """
+    Incremental checks on a streamed post.
+
+    - header: within the first `header_window` characters the response must
+      show a `[HH:MM]` timestamp or a `campus.lan/boards/` location
+    - length: the body (after the `user:` line) may not exceed `max_words`
+    """
+
+    def __init__(self, max_words: Optional[int] = None, header_window: int = 300):
+        self.max_words = max_words
+        self.header_window = header_window
+        self.text = ""
+        self.header_seen = False
+
+    def feed(self, chunk: str):
+        """Add streamed text; raises OutputSpecViolation as soon as the output is out of spec."""
+        self.text += chunk
+
+        if not self.header_seen:
+            if re.search(r'\[\d{2}:\d{2}\]|campus\.lan/boards/', self.text):
+                self.header_seen = True
+            elif len(self.text) > self.header_window:
+                raise OutputSpecViolation(f"No format header in first {self.header_window} chars")
+
+        if self.max_words and self.body_word_count() > self.max_words:
+            raise OutputSpecViolation(f"Body ran past {self.max_words} words")
+
+    def finish(self):
+        """Final check once the body is complete."""
+        if not self.header_seen:
+            raise OutputSpecViolation("Response ended without a format header")
+
+    def body_word_count(self) -> int:
+        body_match = re.search(r'^user:.*?\n', self.text, re.MULTILINE)
+        body = self.text[body_match.end():] if body_match else self.text
+        body = body.split("[image:")[0]
+        return len(body.split())
+
+
+def _text_from_line(line: str) -> Tuple[Optional[str], bool, Optional[str]]:
+    """
+    Decode one stream-json line.
+
+    Returns:
+        (text_delta, body_complete, final_result). Non-JSON lines are treated
+        as plain text so `--output-format text` output streams too.
+    """
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return line, False, None
+
+    if not isinstance(event, dict):
+        return line, False, None
+
+    if event.get("type") == "result":
+        return None, True, event.get("result")
+
+    inner = event.get("event", {}) if event.get("type") == "stream_event" else event
+    inner_type = inner.get("type")
+    if inner_type == "content_block_delta" and inner.get("delta", {}).get("type") == "text_delta":
+        return inner["delta"].get("text", ""), False, None
+    if inner_type == "message_stop":
+        return None, True, None
+    return None, False, None
+
+
+def read_stream(proc: subprocess.Popen, prompt: str, validator: StreamValidator) -> str:
+    """
+    Feed the prompt to an already-started CLI process and validate its output as it streams.
+
+    Returns as soon as the body is complete (the process is reaped in the
+    background). Kills the process group and raises OutputSpecViolation on
+    the first violation.
+    """
+    try:
+        proc.stdin.write(prompt)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+
+    stderr_reader, stderr = _drain_stderr(proc)
+    final_result = None
+    complete = False
+    try:
+        for line in proc.stdout:
+            text, complete, result = _text_from_line(line)
+            if text:
+                validator.feed(text)
+            if result is not None:
+                final_result = result
+            if complete:
+                break
+    except OutputSpecViolation:
+        kill_process_group(proc)
+        raise
+
+    # Plain-text output has no completion event, so EOF + exit status decides
+    if not complete and proc.wait() != 0:
+        if stderr_reader:
+            stderr_reader.join(timeout=1)
+        raise RuntimeError(f"Claude CLI error: {''.join(stderr)}")
+
+    validator.finish()
+    threading.Thread(target=_drain_and_reap, args=(proc,), daemon=True).start()
+    return final_result if final_result is not None else validator.text
+
+
+def stream_claude(
+    prompt: str,
+    validator: StreamValidator,
+    timeout: float = 30,
+    command: List[str] = None
+) -> str:
+    """Run one streamed CLI call with a hard timeout."""
+    with span("process_spawn"):
+        proc = subprocess.Popen(
+            command or CLAUDE_STREAM_COMMAND,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+
+    timer = threading.Timer(timeout, kill_process_group, args=(proc,))
+    timer.start()
+    try:
+        with span("model_wait", streamed=True) as wait_span:
+            text = read_stream(proc, prompt, validator)
+            wait_span.set(bytes=len(text))
+    except Exception as e:
+        if not timer.is_alive():  # the timer killed the process; whatever broke is a symptom of that
+            raise TimeoutError(f"Claude CLI timed out after {timeout}s") from e
+        raise
+    finally:
+        timer.cancel()
+    return text
+
+
+def _drain_stderr(proc: subprocess.Popen) -> Tuple[Optional[threading.Thread], List[str]]:
+    """Read stderr on a thread so a chatty CLI can't fill the pipe and stall its stdout."""
+    chunks: List[str] = []
+    if proc.stderr is None:
+        return None, chunks
+    thread = threading.Thread(target=lambda: chunks.append(proc.stderr.read()), daemon=True)
+    thread.start()
+    return thread, chunks
+
+
+def _drain_and_reap(proc: subprocess.Popen):
+    proc.stdout.read()
+    proc.wait()
+
+
+def kill_process_group(proc: subprocess.Popen):
+    if proc.poll() is None:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
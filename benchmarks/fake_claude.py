@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Fake `claude` CLI for benchmarks - emulates model latency without spending quota.
+
+Reads the prompt on stdin, sleeps for a sampled latency and prints a post in
+the REQUIRED OUTPUT FORMAT. Supports `--output-format text` and
+`--output-format stream-json` (streamed text deltas, like the real CLI).
+
+Configured through environment variables:
+    FAKE_CLAUDE_LATENCY_MEDIAN   median latency in seconds (default 0.05)
+    FAKE_CLAUDE_LATENCY_SIGMA    lognormal sigma (default 0.5)
+    FAKE_CLAUDE_LENGTH_SIGMA     word-count spread as a fraction of the range (default 0.25)
+    FAKE_CLAUDE_MALFORMED_RATE   fraction of responses that are off-spec (default 0.0)
+    FAKE_CLAUDE_SEED             base random seed (mixed with the pid)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+
+WORDS = (
+    "Kamea Robert Chris Sarah Tria Randy Eli Amir Melanie board committee families rain "
+    "south field tarp shelter liability channels security report network mesh encrypted "
+    "volunteers storm library dorm tonight the a and of we they said watched counted"
+).split()
+
+LOCATIONS = ["general", "security", "faculty_commons", "strategy", "mesh_ops", "library"]
+
+
+def sample_body(rng: random.Random, low: int, high: int) -> str:
+    sigma = float(os.environ.get("FAKE_CLAUDE_LENGTH_SIGMA", "0.25"))
+    target = int(rng.gauss((low + high) / 2, (high - low) * sigma))
+    return " ".join(rng.choice(WORDS) for _ in range(max(target, 5)))
+
+
+def build_response(prompt: str, rng: random.Random) -> str:
+    post_type = re.search(r'Generate a (\w+) post', prompt)
+    length = re.search(r'Length: (\d+)-(\d+) words', prompt)
+    low, high = (int(length.group(1)), int(length.group(2))) if length else (50, 150)
+
+    malformed_rate = float(os.environ.get("FAKE_CLAUDE_MALFORMED_RATE", "0.0"))
+    if rng.random() < malformed_rate:
+        if rng.random() < 0.5:
+            # Ignores the format header entirely
+            return sample_body(rng, low, high)
+        # Header is fine, body runs far past the word limit
+        low, high = high * 2, high * 3
+
+    header = (
+        f"[{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}]\n"
+        f"network_location: campus.lan/boards/{rng.choice(LOCATIONS)}\n"
+        f"encryption: {rng.choice(['public', 'encrypted', 'partial'])}\n"
+        f"user: fake_{post_type.group(1) if post_type else 'social'}\n\n"
+    )
+    image = f"\n\n[image: Security cam footage, {rng.randint(0, 23):02d}:00]" if rng.random() < 0.5 else ""
+    return header + sample_body(rng, low, high) + image
+
+
+def main():
+    prompt = sys.stdin.read()
+    seed = int(os.environ.get("FAKE_CLAUDE_SEED", "0")) * 100003 + os.getpid()
+    rng = random.Random(seed)
+
+    median = float(os.environ.get("FAKE_CLAUDE_LATENCY_MEDIAN", "0.05"))
+    sigma = float(os.environ.get("FAKE_CLAUDE_LATENCY_SIGMA", "0.5"))
+    latency = rng.lognormvariate(0, sigma) * median
+
+    response = build_response(prompt, rng)
+
+    if "stream-json" not in sys.argv:
+        time.sleep(latency)
+        print(response)
+        return
+
+    # Spread the latency over the streamed chunks like a real token stream
+    chunks = re.findall(r'\S+\s*', response)
+    for chunk in chunks:
+        time.sleep(latency / max(len(chunks), 1))
+        event = {"type": "content_block_delta", "delta": {"type": "text_delta", "text": chunk}}
+        print(json.dumps({"type": "stream_event", "event": event}), flush=True)
+    print(json.dumps({"type": "stream_event", "event": {"type": "message_stop"}}), flush=True)
+    print(json.dumps({"type": "result", "result": response}), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark with a latency-emulating fake model.
+
+Puts benchmarks/fake_claude.py on PATH as `claude`, then drives the same
+stages as the phase0 scripts: codex parsing, agent creation, scene
+generation, post parsing, saving and manifest building. Reports posts/minute,
+per-stage p50/p95/p99 and peak RSS, and fails on regressions against
+benchmarks/baselines.json.
+
+Usage (from the repo root):
+    python benchmarks/run_pipeline_bench.py
+    python benchmarks/run_pipeline_bench.py --scenes 5 --latency-median 0.2 --malformed-rate 0.1
+    python benchmarks/run_pipeline_bench.py --update-baseline
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import contextlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from utils.novel_crafter_parser import NovelCrafterParser
+from agents.base.character_agent import CharacterAgent
+from agents.base.hedged_runner import HedgedRunner
+
+BASELINES_FILE = Path(__file__).parent / "baselines.json"
+CHARACTERS = ["Chris", "Sarah", "Tria", "Kamea", "Randy", "Eli", "Melanie", "Amir"]
+POST_TYPES = ["social", "blog"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pipeline benchmark with a fake claude CLI")
+    parser.add_argument("--scenes", type=int, default=3, help="Scenes to generate (each: every character x post type)")
+    parser.add_argument("--characters", type=int, default=len(CHARACTERS), help="How many characters to use")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent generation calls (1 = serial, like phase0)")
+    parser.add_argument("--latency-median", type=float, default=0.05, help="Fake model median latency (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Fake model lognormal latency sigma")
+    parser.add_argument("--length-sigma", type=float, default=0.25, help="Fake word-count spread (fraction of range)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of off-spec fake responses")
+    parser.add_argument("--stream", action="store_true", help="Use streaming generation with early abort")
+    parser.add_argument("--hedge", action="store_true", help="Use a shared HedgedRunner")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline-name", default="default", help="Key in baselines.json to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def install_fake_claude(bin_dir: Path, args) -> None:
+    """Expose fake_claude.py as `claude` on PATH and configure its distributions."""
+    fake = bin_dir / "claude"
+    fake.write_text(f"#!/bin/sh\nexec {sys.executable} {Path(__file__).parent.resolve() / 'fake_claude.py'} \"$@\"\n")
+    fake.chmod(0o755)
+
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+    os.environ["FAKE_CLAUDE_LATENCY_MEDIAN"] = str(args.latency_median)
+    os.environ["FAKE_CLAUDE_LATENCY_SIGMA"] = str(args.latency_sigma)
+    os.environ["FAKE_CLAUDE_LENGTH_SIGMA"] = str(args.length_sigma)
+    os.environ["FAKE_CLAUDE_MALFORMED_RATE"] = str(args.malformed_rate)
+    os.environ["FAKE_CLAUDE_SEED"] = str(args.seed)
+
+
+class StageTimer:
+    """Collects per-operation wall times for each pipeline stage."""
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextlib.contextmanager
+    def time(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(stage, []).append(time.perf_counter() - started)
+
+    def summary(self) -> dict:
+        result = {}
+        for stage, values in self.samples.items():
+            arr = np.array(values) * 1000
+            result[stage] = {
+                "count": len(values),
+                "p50_ms": round(float(np.percentile(arr, 50)), 3),
+                "p95_ms": round(float(np.percentile(arr, 95)), 3),
+                "p99_ms": round(float(np.percentile(arr, 99)), 3),
+                "total_ms": round(float(arr.sum()), 3),
+            }
+        return result
+
+
+def run_pipeline(args, work_dir: Path) -> dict:
+    timer = StageTimer()
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    # Codex parsing
+    with quiet, timer.time("codex_parse"):
+        parser = NovelCrafterParser(str(REPO_ROOT / "data" / "novel_export"))
+        parser.parse_all()
+        codex = parser.save_codex(str(work_dir / "character_codex.json"),
+                                  timeline_file=str(work_dir / "story_timeline.json"))
+    characters = codex["characters"]
+
+    # Agent creation
+    runner = HedgedRunner() if args.hedge else None
+    agents = {}
+    for name in CHARACTERS[:args.characters]:
+        with quiet, timer.time("agent_create"):
+            agents[name] = CharacterAgent(name, characters.get(name, {}), runner=runner, stream=args.stream)
+
+    # Time parsing separately from the model call it is nested in
+    for agent in agents.values():
+        parse = agent._parse_generated_post
+
+        def timed_parse(*a, _parse=parse, **kw):
+            with timer.time("parse"):
+                return _parse(*a, **kw)
+        agent._parse_generated_post = timed_parse
+
+    # Scene generation
+    cells = [
+        (scene, name, post_type)
+        for scene in range(args.scenes)
+        for name in agents
+        for post_type in POST_TYPES
+    ]
+
+    def generate(cell):
+        scene, name, post_type = cell
+        scenario = f"SCENE {scene}: Emergency Board Meeting. Kamea interrupts; Robert argues liability."
+        with timer.time("generate"):
+            return agents[name].generate_post(scenario, post_type=post_type, max_retries=2)
+
+    gen_started = time.perf_counter()
+    with quiet:
+        if args.workers > 1:
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                posts = list(pool.map(generate, cells))
+        else:
+            posts = [generate(cell) for cell in cells]
+    gen_elapsed = time.perf_counter() - gen_started
+    failures = sum(1 for p in posts if p is None)
+
+    # Saving
+    for name, agent in agents.items():
+        with quiet, timer.time("save"):
+            agent.save_posts_to_json(str(work_dir / "drafts" / f"{name}.json"))
+
+    # Manifest building
+    with timer.time("manifest"):
+        manifest = [
+            {
+                "title": f"[DRAFT] {post.character_name} - {post.post_type.upper()}",
+                "body": post.to_github_issue_body(),
+                "character": post.character_name,
+                "post_type": post.post_type
+            }
+            for post in posts if post
+        ]
+        with open(work_dir / "drafts" / "github_issues_manifest.json", 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+    completed = len(cells) - failures
+    peak_rss_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("update_baseline", "json", "baseline_name", "tolerance")},
+        "posts_requested": len(cells),
+        "posts_completed": completed,
+        "failures": failures,
+        "posts_per_minute": round(completed / gen_elapsed * 60, 2) if gen_elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+        "stages": timer.summary(),
+        "hedging": runner.stats if runner else None,
+    }
+
+
+def check_regressions(report: dict, baseline: dict, tolerance: float) -> list:
+    """Compare against a stored baseline; returns human-readable regressions."""
+    regressions = []
+
+    floor = baseline["posts_per_minute"] * (1 - tolerance)
+    if report["posts_per_minute"] < floor:
+        regressions.append(f"posts/minute {report['posts_per_minute']} < {floor:.2f}")
+
+    ceiling = baseline["peak_rss_mb"] * (1 + tolerance)
+    if report["peak_rss_mb"] > ceiling:
+        regressions.append(f"peak RSS {report['peak_rss_mb']}MB > {ceiling:.1f}MB")
+
+    for stage, stats in baseline["stages"].items():
+        current = report["stages"].get(stage)
+        if not current:
+            continue
+        # Absolute slack so millisecond-scale stages don't flap on scheduler noise
+        limit = stats["p95_ms"] * (1 + tolerance) + 5.0
+        if current["p95_ms"] > limit:
+            regressions.append(f"{stage} p95 {current['p95_ms']}ms > {limit:.2f}ms")
+
+    return regressions
+
+
+def print_report(report: dict):
+    print(f"\n{'='*70}")
+    print("Pipeline Benchmark (fake claude)")
+    print(f"{'='*70}")
+    print(f"Posts: {report['posts_completed']}/{report['posts_requested']} "
+          f"({report['failures']} failed)")
+    print(f"Throughput: {report['posts_per_minute']} posts/minute")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB")
+    if report["hedging"]:
+        print(f"Hedging: {report['hedging']}")
+    print(f"\n{'stage':15} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:15} {stats['count']:>6} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} {stats['p99_ms']:>10.2f}")
+    print(f"{'='*70}\n")
+
+
+def main(args):
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="mfx-bench-") as tmp:
+        work_dir = Path(tmp)
+        (work_dir / "bin").mkdir()
+        install_fake_claude(work_dir / "bin", args)
+        report = run_pipeline(args, work_dir)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    baselines = json.loads(BASELINES_FILE.read_text()) if BASELINES_FILE.exists() else {}
+
+    if args.update_baseline:
+        baselines[args.baseline_name] = report
+        BASELINES_FILE.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"✓ Stored baseline '{args.baseline_name}' in {BASELINES_FILE}")
+        return 0
+
+    baseline = baselines.get(args.baseline_name)
+    if not baseline:
+        print(f"No baseline '{args.baseline_name}' stored; run with --update-baseline to create one")
+        return 0
+
+    if baseline["config"] != report["config"]:
+        print(f"⚠ Config differs from baseline '{args.baseline_name}'; comparison may not be meaningful")
+
+    regressions = check_regressions(report, baseline, args.tolerance)
+    if regressions:
+        print("✗ Regressions against baseline:")
+        for regression in regressions:
+            print(f"  • {regression}")
+        return 1
+
+    print(f"✓ Within {args.tolerance:.0%} of baseline '{args.baseline_name}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Main generation loop (Phase 1+): event-driven, one story day at a time.
+
+Watches ./content for changes and only generates what changed:
+- a new or edited scene in content/scenes/ → every cell of that scene
+- a post moved to content/rejected/ (by review or the quality gate) → that
+  one (scene, character, post_type) cell again, up to --max-regenerations
+- a post moved to content/approved/ → the cell is done; once every cell of
+  the current story day is approved, the loop advances to the next day
+
+Scenes dated after the current story day wait. When nothing has changed for
+--idle seconds, the next day's scenes are prefetched so the generation slots
+stay busy while posts sit in review.
+
+Generation goes through the resident daemon (scripts/mfx_daemon.py) when it
+is running, otherwise through an in-process GenerationDaemon. Nothing new is
+submitted while the quota window has fewer calls left than the job needs.
+
+Usage:
+    python scripts/generate_daily.py                 # run until Ctrl-C
+    python scripts/generate_daily.py --once          # process pending changes, prefetch, exit
+    python scripts/generate_daily.py --day 2025-06-04 --poll
+"""
+
+import sys
+import json
+import time
+import signal
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.character_agent import ANCHOR_POST_TYPES
+from utils.content_watcher import ContentWatcher
+from utils.profiling import profiler
+from utils.mfx_client import DEFAULT_SOCKET, MfxClient, MfxError
+from utils.scenes import load_scene
+from utils.search_index import posts_in_file
+
+SCENES_DIR = Path("./content/scenes")
+APPROVED_DIR = Path("./content/approved")
+REJECTED_DIR = Path("./content/rejected")
+
+
+class LocalBackend:
+    """In-process stand-in for MfxClient when no daemon is running."""
+
+    def __init__(self, workers: int = 4, best_of: int = 1):
+        from scripts.mfx_daemon import GenerationDaemon
+        self.state = GenerationDaemon(workers=workers, best_of=best_of)
+
+    def request(self, command: str, timeout: Optional[float] = None, **params) -> Dict:
+        response = self.state.handle({"command": command, **params})
+        if not response.get("ok"):
+            raise MfxError(response.get("error", "unknown error"))
+        return response
+
+    def close(self):
+        self.state.close()
+
+
+class DailyState:
+    """Persisted loop state: story day, scene versions and per-cell review status."""
+
+    def __init__(self, path: str = "./data/daily_state.json"):
+        self.path = Path(path)
+        data = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                data = json.load(f)
+        self.story_day: Optional[str] = data.get("story_day")
+        self.scenes: Dict[str, Dict] = data.get("scenes", {})  # scene id -> {hash, generated_at}
+        self.cells: Dict[str, Dict] = data.get("cells", {})    # "scene|character|type" -> {status, regenerations}
+        self.reviewed: Dict[str, float] = data.get("reviewed", {})  # review file -> mtime when last read
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"story_day": self.story_day, "scenes": self.scenes, "cells": self.cells,
+                       "reviewed": self.reviewed}, f, indent=2)
+
+    @staticmethod
+    def cell_key(scene_id: str, character: str, post_type: str) -> str:
+        return f"{scene_id}|{character}|{post_type}"
+
+    def cell(self, scene_id: str, character: str, post_type: str) -> Dict:
+        return self.cells.setdefault(self.cell_key(scene_id, character, post_type),
+                                     {"status": "pending", "regenerations": 0})
+
+
+def scene_hash(scene: Dict) -> str:
+    fields = {k: v for k, v in scene.items() if not k.startswith("_")}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def scene_day(scene: Dict) -> Optional[str]:
+    return scene.get("date") or None
+
+
+class DailyLoop:
+    """Turns content/ changes into generation jobs and runs them."""
+
+    def __init__(self, backend, state: DailyState, max_regenerations: int = 1):
+        self.backend = backend
+        self.state = state
+        self.max_regenerations = max_regenerations
+        self.scenes: Dict[str, Dict] = {}
+        for path in sorted(SCENES_DIR.glob("*.json")):
+            scene = load_scene(str(path))
+            scene["_path"] = str(path)
+            self.scenes[scene["id"]] = scene
+        self.queue: Deque[Tuple] = deque()  # ("scene", scene_id) | ("cell", scene_id, character, post_type)
+        self.failed_scenes: Set[str] = set()  # not prefetched again until the scene file changes
+        self.generated = 0
+
+        if self.state.story_day is None:
+            days = sorted(filter(None, (scene_day(s) for s in self.scenes.values())))
+            self.state.story_day = days[0] if days else date.today().isoformat()
+
+    # --- change detection ---
+
+    def is_due(self, scene: Dict) -> bool:
+        day = scene_day(scene)
+        return day is None or day <= self.state.story_day
+
+    def next_day(self) -> str:
+        return (date.fromisoformat(self.state.story_day) + timedelta(days=1)).isoformat()
+
+    def enqueue(self, job: Tuple):
+        if job not in self.queue:
+            self.queue.append(job)
+
+    def scan_scenes(self):
+        """Queue every due scene that is new or edited since it was last generated."""
+        for scene_id, scene in sorted(self.scenes.items(), key=lambda item: scene_day(item[1]) or ""):
+            known = self.state.scenes.get(scene_id)
+            if self.is_due(scene) and (known is None or known["hash"] != scene_hash(scene)):
+                self.enqueue(("scene", scene_id))
+
+    def on_changes(self, paths: List[Path]):
+        for path in paths:
+            if SCENES_DIR.resolve() in path.resolve().parents:
+                self._scene_changed(path)
+            elif path.exists() and (APPROVED_DIR.resolve() in path.resolve().parents
+                                    or REJECTED_DIR.resolve() in path.resolve().parents):
+                self._review_changed(path)
+        self.scan_scenes()
+
+    def _scene_changed(self, path: Path):
+        stale = [sid for sid, scene in self.scenes.items() if scene.get("_path") == str(path)]
+        for scene_id in stale:
+            del self.scenes[scene_id]
+        if not path.exists():
+            print(f"  - Scene removed: {path.name}")
+            return
+        try:
+            scene = load_scene(str(path))
+        except (ValueError, OSError) as e:
+            print(f"⚠ Skipping unreadable scene {path.name}: {e}")
+            return
+        scene["_path"] = str(path)
+        self.scenes[scene["id"]] = scene
+        self.failed_scenes.discard(scene["id"])
+        print(f"↻ Scene changed: {scene['id']} ({scene_day(scene) or 'undated'})")
+
+    def _review_changed(self, path: Path):
+        approved = APPROVED_DIR.resolve() in path.resolve().parents
+        mtime = path.stat().st_mtime
+        if self.state.reviewed.get(str(path)) == mtime:
+            return  # already handled on a previous run
+        self.state.reviewed[str(path)] = mtime
+        try:
+            posts = posts_in_file(path)
+        except (ValueError, OSError, TypeError) as e:
+            print(f"⚠ Skipping unreadable review file {path.name}: {e}")
+            return
+        for post in posts:
+            scene_id = (post.metadata or {}).get("scene")
+            if not scene_id:
+                continue  # hand-written or pre-scene posts have no cell to track
+            cell = self.state.cell(scene_id, post.character_name, post.post_type)
+            if approved:
+                cell["status"] = "approved"
+            elif cell["status"] != "approved":
+                cell["status"] = "rejected"
+                if cell["regenerations"] < self.max_regenerations and scene_id in self.scenes:
+                    self.enqueue(("cell", scene_id, post.character_name, post.post_type))
+        if approved:
+            self.advance_day()
+
+    def advance_day(self):
+        """Move to the next story day once every cell of the current day is approved."""
+        while True:
+            today = [s for s in self.scenes.values() if scene_day(s) == self.state.story_day]
+            keys = [self.state.cell_key(s["id"], c, t)
+                    for s in today for c in s["character_directions"] for t in s["post_types"]]
+            if not keys or any(self.state.cells.get(k, {}).get("status") != "approved" for k in keys):
+                return
+            self.state.story_day = self.next_day()
+            print(f"✓ Story day complete → {self.state.story_day}")
+            self.scan_scenes()
+
+    # --- generation ---
+
+    def quota_allows(self, job: Tuple) -> bool:
+        status = self.backend.request("status", timeout=5)
+        return status["quota_remaining"]["calls"] >= self.job_size(job, best_of=status.get("best_of", 1))
+
+    def job_size(self, job: Tuple, best_of: int = 1) -> int:
+        """Model calls a job makes; anchor posts cost best_of calls each."""
+        if job[0] == "cell":
+            post_types = [job[3]]
+            characters = 1
+        else:
+            scene = self.scenes[job[1]]
+            post_types = scene["post_types"]
+            characters = len(scene["character_directions"])
+        return characters * sum(best_of if t in ANCHOR_POST_TYPES else 1 for t in post_types)
+
+    def run_job(self, job: Tuple, prefetch: bool = False) -> bool:
+        """Run one job; False if it was held back by the quota window."""
+        if job[1] not in self.scenes:
+            return True  # scene deleted while queued
+        if not self.quota_allows(job):
+            return False
+
+        scene = {k: v for k, v in self.scenes[job[1]].items() if not k.startswith("_")}
+        label = "Prefetching" if prefetch else "Generating"
+        started = time.perf_counter()
+        if job[0] == "scene":
+            print(f"\n{label} scene {scene['id']} ({self.job_size(job)} cells)...")
+            try:
+                result = self.backend.request("scene", scene=scene)
+            except MfxError as e:
+                self.failed_scenes.add(scene["id"])
+                print(f"  ✗ Scene {scene['id']} failed: {e}")
+                return True
+            posts, failures = result["posts"], result["failures"]
+            self.state.scenes[scene["id"]] = {"hash": scene_hash(scene), "generated_at": datetime.now().isoformat()}
+            for character in scene["character_directions"]:
+                for post_type in scene["post_types"]:
+                    self.state.cell(scene["id"], character, post_type)["status"] = "pending"  # new version to review
+        else:
+            _, scene_id, character, post_type = job
+            print(f"\nRegenerating {scene_id}: {character} ({post_type})...")
+            self.state.cell(scene_id, character, post_type)["regenerations"] += 1
+            try:
+                posts = [self.backend.request("generate", character=character, post_type=post_type,
+                                              scene=scene)["post"]]
+                failures = []
+            except MfxError as e:
+                posts, failures = [], [{"character": character, "post_type": post_type, "error": str(e)}]
+
+        for post in posts:
+            cell = self.state.cell(scene["id"], post["character_name"], post["post_type"])
+            if cell["status"] != "approved":
+                cell["status"] = "generated"
+        for failure in failures:
+            print(f"  ✗ {failure['character']} ({failure['post_type']}): {failure['error']}")
+
+        flushed = self.backend.request("flush")
+        self.state.save()
+        self.generated += len(posts)
+        print(f"✓ {len(posts)} posts in {time.perf_counter() - started:.1f}s "
+              f"({flushed['accepted']} to drafts, {flushed['rejected']} rejected)")
+        return True
+
+    def prefetch_job(self) -> Optional[Tuple]:
+        """The next ungenerated scene from the following story day, if any."""
+        upcoming = self.next_day()
+        for scene_id, scene in sorted(self.scenes.items()):
+            if scene_day(scene) == upcoming and scene_id not in self.state.scenes \
+                    and scene_id not in self.failed_scenes:
+                return ("scene", scene_id)
+        return None
+
+
+def connect(args):
+    """The running daemon if there is one, else an in-process generation backend."""
+    client = MfxClient(args.socket)
+    if not args.no_daemon and client.is_running():
+        print(f"✓ Using mfx daemon at {args.socket}")
+        return client
+    print("Starting in-process generation backend (no daemon running)...")
+    return LocalBackend(workers=args.workers, best_of=args.best_of)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--day", help="Current story day (YYYY-MM-DD); default: saved state or earliest scene")
+    parser.add_argument("--once", action="store_true", help="Process pending changes, prefetch the next day, then exit")
+    parser.add_argument("--idle", type=float, default=60.0, help="Seconds without changes before prefetching")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--max-regenerations", type=int, default=1,
+                        help="Times a rejected cell is regenerated before leaving it for a human")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--no-daemon", action="store_true", help="Always generate in-process")
+    parser.add_argument("--workers", type=int, default=4, help="In-process backend only")
+    parser.add_argument("--best-of", type=int, default=1, metavar="N", help="In-process backend only")
+    parser.add_argument("--state", default="./data/daily_state.json")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile CPU and allocations per stage into ./data/profiles/ (in-process backend)")
+    parser.add_argument("--profile-every", type=int, default=10, metavar="N")
+    return parser.parse_args()
+
+
+def main(args):
+    if args.profile:
+        profiler.configure(snapshot_every=args.profile_every)
+    state = DailyState(args.state)
+    if args.day:
+        state.story_day = args.day
+
+    watcher = ContentWatcher([str(SCENES_DIR), str(APPROVED_DIR), str(REJECTED_DIR)],
+                             poll_interval=args.poll_interval, force_polling=args.poll)
+    backend = connect(args)
+    loop = DailyLoop(backend, state, max_regenerations=args.max_regenerations)
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+
+    # Catch up on anything that changed while the loop was down
+    for review_dir in (APPROVED_DIR, REJECTED_DIR):
+        loop.on_changes(sorted(review_dir.glob("**/*.json")))
+    loop.advance_day()
+    loop.scan_scenes()
+
+    print(f"\nStory day {state.story_day} | {len(loop.scenes)} scenes | "
+          f"{len(loop.queue)} jobs queued | watching content/ ({watcher.mode})")
+
+    try:
+        while not stopping:
+            if loop.queue:
+                job = loop.queue[0]
+                if loop.run_job(job):
+                    loop.queue.popleft()
+                else:
+                    print(f"⏸ Quota window exhausted; {len(loop.queue)} jobs waiting")
+                    if args.once:
+                        break
+                    time.sleep(args.idle)
+                continue
+
+            changes = watcher.changes(timeout=0 if args.once else args.idle)
+            if changes:
+                loop.on_changes(changes)
+                continue
+
+            job = loop.prefetch_job()
+            if job and loop.run_job(job, prefetch=True):
+                continue
+            if job:
+                print("⏸ Quota window exhausted; prefetch waiting")
+            if args.once:
+                break
+            if job:
+                time.sleep(args.idle)
+    except KeyboardInterrupt:
+        print("\n⏸ Interrupted")
+    finally:
+        state.save()
+        watcher.close()
+        if isinstance(backend, LocalBackend):
+            backend.close()
+        if args.profile:
+            profiler.finish()
+            profiler.print_summary()
+
+    print(f"\n✓ {loop.generated} posts generated | story day {state.story_day} | "
+          f"{len(loop.queue)} jobs still queued")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Generate procedural surveillance camera and sensor-network posts.
+
+Readings for every device are generated with NumPy over a story-time
+window, shaped by the story timeline; anomalous report windows become
+"surveillance" drafts. Only --annotate N reports get a model-written
+system note.
+
+Usage:
+    python scripts/generate_surveillance.py --start "June 3, 2025, 12:00 PM" --hours 12
+    python scripts/generate_surveillance.py --hours 24 --interval 10 --dump-log data/surveillance.log
+    python scripts/generate_surveillance.py --annotate 3
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.character_agent import CharacterAgent
+from utils.search_index import SearchIndex
+from utils.story_timeline import StoryTimeline, parse_story_time
+from utils.surveillance_feed import SYSTEM_CHARACTER, SurveillanceFeed, annotate, save_feed_posts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--start", help="Story time to start at (default: midnight before the first timeline event)")
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--interval", type=int, default=60, help="Seconds between readings per device")
+    parser.add_argument("--report-minutes", type=int, default=60, help="Window covered by one report post")
+    parser.add_argument("--all-windows", action="store_true", help="Report every window, not just anomalous ones")
+    parser.add_argument("--annotate", type=int, default=0, metavar="N",
+                        help="Model-written system notes for the N most eventful reports")
+    parser.add_argument("--dump-log", metavar="PATH", help="Also write every raw log line to PATH")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--no-save", action="store_true", help="Print a summary without writing drafts")
+    return parser.parse_args()
+
+
+def main(args) -> int:
+    timeline = StoryTimeline.load()
+    if args.start:
+        start = parse_story_time(args.start)
+        if start is None:
+            print(f"✗ Could not parse story time: {args.start}")
+            return 1
+    elif timeline.events:
+        start = datetime.combine(timeline.events[0].when.date(), datetime.min.time())
+    else:
+        print("✗ No timeline events; pass --start")
+        return 1
+    end = start + timedelta(hours=args.hours)
+
+    feed = SurveillanceFeed(timeline, interval_seconds=args.interval, seed=args.seed)
+    started = time.perf_counter()
+    data = feed.readings(start, end)
+    generated = time.perf_counter() - started
+    readings = data["seconds"].size
+    print(f"✓ {readings:,} readings from {len(feed.devices)} devices "
+          f"({start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M}) in {generated * 1000:.0f}ms "
+          f"({readings / max(generated, 1e-9):,.0f}/s)")
+
+    if args.dump_log:
+        started = time.perf_counter()
+        Path(args.dump_log).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.dump_log, "w") as f:
+            for line in feed.log_lines(start, end, data):
+                f.write(line + "\n")
+        elapsed = time.perf_counter() - started
+        print(f"✓ Wrote {readings:,} log lines to {args.dump_log} ({readings / max(elapsed, 1e-9):,.0f} lines/s)")
+
+    posts = feed.posts(start, end, report_minutes=args.report_minutes,
+                       only_anomalous=not args.all_windows, data=data)
+    by_kind = {}
+    for post in posts:
+        by_kind[post.metadata["device_kind"]] = by_kind.get(post.metadata["device_kind"], 0) + 1
+    print(f"✓ {len(posts)} report posts ({', '.join(f'{n} {kind}' for kind, n in sorted(by_kind.items()))})")
+
+    if args.annotate and posts:
+        agent = CharacterAgent("Surveillance System", SYSTEM_CHARACTER, timeline=timeline)
+        print(f"✓ Annotated {annotate(posts, agent, args.annotate)} reports")
+
+    if args.no_save or not posts:
+        if posts:
+            print(f"\n{posts[0].content}")
+        return 0
+
+    files = save_feed_posts(posts)
+    search = SearchIndex()
+    for path in files:
+        search.index_file(path, "draft")
+    search.close()
+    for path in files:
+        print(f"✓ Saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+mfx: fast CLI front end for the resident generation daemon.
+
+Only stdlib modules are imported here; the codex, agents and indexes stay
+loaded in scripts/mfx_daemon.py, so commands return in model time.
+
+Usage:
+    python scripts/mfx.py start [--workers 4] [--stream] [--best-of 3]
+    python scripts/mfx.py generate Chris --type social --scenario "..."
+    python scripts/mfx.py generate Chris                  # reuse Chris's last scenario
+    python scripts/mfx.py scene content/scenes/rescue.json [--characters Chris,Tria] [--types social]
+    python scripts/mfx.py status
+    python scripts/mfx.py flush
+    python scripts/mfx.py stop
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.mfx_client import DEFAULT_SOCKET, MfxClient, MfxError
+from utils.scenes import load_scene
+
+
+def print_post(post):
+    quality = post.get("metadata", {}).get("quality", {})
+    duplicates = post.get("metadata", {}).get("near_duplicates")
+    print(f"\n{post['character_name']} | {post['post_type'].upper()} | {post['timestamp']} "
+          f"| score {post['score']:.2f} | {post['post_id']}")
+    print(f"Location: {post['location']} | Encryption: {post['encryption']}")
+    if duplicates:
+        print(f"⚠ Near-duplicate of {len(duplicates)} earlier post(s)")
+    print("-" * 70)
+    print(post["content"])
+    if quality:
+        print("-" * 70)
+        print(f"quality: {quality}")
+
+
+def start_daemon(args) -> int:
+    client = MfxClient(args.socket)
+    if client.is_running():
+        print(f"✓ Daemon already running on {args.socket}")
+        return 0
+
+    daemon_script = Path(__file__).parent / "mfx_daemon.py"
+    log_file = Path("./data/mfx_daemon.log")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, str(daemon_script), "--socket", args.socket, "--workers", str(args.workers)]
+    if args.stream:
+        command.append("--stream")
+    if args.best_of > 1:
+        command += ["--best-of", str(args.best_of)]
+
+    with open(log_file, 'a') as log:
+        subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                         start_new_session=True)
+
+    deadline = time.monotonic() + args.wait
+    while time.monotonic() < deadline:
+        if client.is_running():
+            print(f"✓ Daemon started on {args.socket} (log: {log_file})")
+            return 0
+        time.sleep(0.2)
+    print(f"✗ Daemon did not come up within {args.wait}s; see {log_file}")
+    return 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Talk to the resident generation daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Daemon Unix socket")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON responses")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start = commands.add_parser("start", help="Start the daemon in the background")
+    start.add_argument("--workers", type=int, default=4)
+    start.add_argument("--stream", action="store_true")
+    start.add_argument("--best-of", type=int, default=1, metavar="N", help="Candidates per anchor post")
+    start.add_argument("--wait", type=float, default=30.0, help="Seconds to wait for the daemon to come up")
+
+    generate = commands.add_parser("generate", help="Generate one post")
+    generate.add_argument("character")
+    generate.add_argument("--type", default="social", dest="post_type")
+    generate.add_argument("--scenario", default="", help="Scenario text (default: the character's last one)")
+    generate.add_argument("--scene", help="Scene file to build the scenario from")
+    generate.add_argument("--as-of", help="Story time (ISO, e.g. 2025-06-03T14:00) limiting what the character knows")
+
+    scene = commands.add_parser("scene", help="Generate all cells of a scene concurrently")
+    scene.add_argument("scene_file")
+    scene.add_argument("--characters", help="Comma-separated subset of characters")
+    scene.add_argument("--types", help="Comma-separated post types (default: the scene's)")
+
+    commands.add_parser("status", help="Show daemon state")
+    commands.add_parser("flush", help="Write pending posts to drafts")
+    commands.add_parser("stop", help="Flush and stop the daemon")
+    return parser.parse_args()
+
+
+def main(args) -> int:
+    if args.command == "start":
+        return start_daemon(args)
+
+    client = MfxClient(args.socket)
+    try:
+        if args.command == "generate":
+            scene = load_scene(args.scene) if args.scene else None
+            response = {"post": client.generate(args.character, args.post_type, args.scenario, scene, args.as_of)}
+        elif args.command == "scene":
+            response = client.scene(
+                load_scene(args.scene_file),
+                characters=args.characters.split(",") if args.characters else None,
+                post_types=args.types.split(",") if args.types else None,
+            )
+        elif args.command == "status":
+            response = client.status()
+        elif args.command == "flush":
+            response = client.flush()
+        else:
+            response = client.shutdown()
+    except MfxError as e:
+        print(f"✗ {e}")
+        if "not reachable" in str(e):
+            print("  Start it with: python scripts/mfx.py start")
+        return 1
+
+    if args.json:
+        print(json.dumps(response, indent=2, default=str))
+    elif args.command == "generate":
+        print_post(response["post"])
+    elif args.command == "scene":
+        for post in response["posts"]:
+            print_post(post)
+        for failure in response["failures"]:
+            print(f"✗ {failure['character']} {failure['post_type']}: {failure['error']}")
+        print(f"\n✓ Scene {response['scene']}: {len(response['posts'])} posts, {len(response['failures'])} failed")
+    elif args.command == "status":
+        print(f"Daemon pid {response['pid']} | up {response['uptime_seconds']}s | "
+              f"{response['in_flight']} in flight / {response['workers']} workers")
+        print(f"Generated: {response['generated']} | Failed: {response['failed']}")
+        print(f"Agents: {response['agents']}")
+        print(f"Unflushed: {response['unflushed']}")
+        print(f"Hedging: {response['hedging']}")
+        print(f"Quota remaining: {response['quota_remaining']}")
+    elif args.command == "flush":
+        print(f"✓ Flushed {response['accepted']} posts ({response['rejected']} rejected)")
+        for draft in response["drafts"]:
+            print(f"  {draft}")
+        if response["manifest"]:
+            print(f"  Manifest: {response['manifest']}")
+    else:
+        print("✓ Daemon stopping")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
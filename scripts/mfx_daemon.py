@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Resident generation daemon: keeps the codex, agents and caches warm.
+
+Every phase0 run re-imports modules, re-loads the codex and builds fresh
+CharacterAgent objects, so agent memory is lost between invocations. The
+daemon loads all of that once and serves requests from the `mfx` CLI
+(scripts/mfx.py) or MfxClient over a Unix socket, so an ad-hoc
+"one more Chris post" only costs model time.
+
+Held in memory:
+- character codex and one CharacterAgent per character (created on first use)
+- shared HedgedRunner, UsageLedger, NearDuplicateIndex, QualityScorer and ContinuityChecker
+- a worker pool bounding concurrent generations
+
+Posts stay in memory until `mfx flush` (or shutdown) writes them to drafts.
+
+Usage:
+    python scripts/mfx_daemon.py [--workers 4] [--stream] [--socket ./data/mfx.sock]
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.novel_crafter_parser import NovelCrafterParser
+from agents.base.character_agent import ANCHOR_POST_TYPES, CharacterAgent, Post
+from agents.base.hedged_runner import HedgedRunner, LatencyTracker
+from utils.quality_scorer import QualityScorer, save_rejected_posts
+from utils.near_duplicate_index import NearDuplicateIndex
+from utils.interaction_graph import InteractionGraph
+from utils.search_index import SearchIndex
+from utils.continuity_checker import ContinuityChecker
+from utils.usage_ledger import UsageLedger, QuotaWindow
+from utils.scenes import build_character_scenario, scene_time
+from utils.story_timeline import StoryTimeline
+from utils.mfx_client import DEFAULT_SOCKET
+
+
+def post_response(post: Post) -> Dict:
+    return {**post.to_dict(), "post_id": post.post_id}
+
+
+class GenerationDaemon:
+    """Warm state and command handlers for the resident daemon."""
+
+    def __init__(
+        self,
+        codex_path: str = "./data/character_codex.json",
+        workers: int = 4,
+        stream: bool = False,
+        max_hedges: int = 2,
+        best_of: int = 1
+    ):
+        self.codex = self._load_codex(codex_path)
+        self.characters: Dict[str, Dict] = self.codex["characters"]
+        self.timeline = StoryTimeline.load()
+        self.stream = stream
+        self.best_of = best_of  # candidates per anchor post
+
+        # max_concurrent caps every model call, including best-of-N candidates, at the pool size
+        self.runner = HedgedRunner(tracker=LatencyTracker.load(), max_hedges=max_hedges, max_concurrent=workers)
+        self.ledger = UsageLedger()
+        self.quota = QuotaWindow()
+        self.scorer = QualityScorer(known_names=list(self.characters.keys()))
+        self.continuity = ContinuityChecker(self.characters, self.timeline)
+        self.dup_index = NearDuplicateIndex.load()
+        self.dup_index.index_drafts()
+        self.interactions = InteractionGraph.load(characters=self.characters.keys())
+        self.interactions.index_drafts()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mfx-worker")
+        self.workers = workers
+
+        self.agents: Dict[str, CharacterAgent] = {}
+        self.last_scenario: Dict[str, tuple] = {}  # character -> (scenario, as_of)
+        self.unflushed: Dict[str, List[Post]] = {}
+        self.started_at = time.time()
+        self.generated = 0
+        self.failed = 0
+        self.in_flight = 0
+
+        self._lock = threading.Lock()  # guards agents/unflushed/counters and the indexes
+        self._agent_locks: Dict[str, threading.Lock] = {}  # one generation per agent at a time
+
+    @staticmethod
+    def _load_codex(codex_path: str) -> Dict:
+        if not Path(codex_path).exists():
+            print(f"No codex at {codex_path}; parsing Novel Crafter export...")
+            NovelCrafterParser("./data/novel_export").parse_all().save_codex(codex_path)
+        with open(codex_path) as f:
+            return json.load(f)
+
+    def agent(self, character: str) -> CharacterAgent:
+        """The resident agent for a character, created on first use."""
+        with self._lock:
+            if character not in self.agents:
+                if character not in self.characters:
+                    raise KeyError(f"Character '{character}' not found in codex")
+                self.agents[character] = CharacterAgent(
+                    character, self.characters[character],
+                    runner=self.runner, stream=self.stream, ledger=self.ledger,
+                    timeline=self.timeline
+                )
+                self._agent_locks[character] = threading.Lock()
+            return self.agents[character]
+
+    def _generate(self, character: str, post_type: str, scenario: str,
+                  as_of: Optional[datetime] = None, scene_id: Optional[str] = None) -> Optional[Post]:
+        agent = self.agent(character)
+
+        def on_post(post):
+            if scene_id:
+                post.metadata["scene"] = scene_id
+            with self._lock:
+                self.dup_index.add_post(post)
+                self.interactions.add_post(post)
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            with self._agent_locks[character]:
+                if self.best_of > 1 and post_type in ANCHOR_POST_TYPES:
+                    post = agent.generate_best_of(scenario=scenario, post_type=post_type, n=self.best_of,
+                                                  on_post=on_post, as_of=as_of, scorer=self.scorer)
+                else:
+                    post = agent.generate_post(scenario=scenario, post_type=post_type,
+                                               max_retries=2, on_post=on_post, as_of=as_of)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        with self._lock:
+            if post is None:
+                self.failed += 1
+                return None
+            self.scorer.score_posts([post], [scenario])
+            self.continuity.check_post(post)
+            self.last_scenario[character] = (scenario, as_of)
+            self.unflushed.setdefault(character, []).append(post)
+            self.generated += 1
+        return post
+
+    # Command handlers: each takes the request dict and returns the response body
+
+    def cmd_ping(self, request: Dict) -> Dict:
+        return {"pid": os.getpid()}
+
+    def cmd_generate(self, request: Dict) -> Dict:
+        character = request["character"]
+        post_type = request.get("post_type") or "social"
+        scenario = request.get("scenario")
+        scene_id = None
+        as_of = datetime.fromisoformat(request["as_of"]) if request.get("as_of") else None
+        if not scenario and request.get("scene"):
+            scenario = build_character_scenario(request["scene"], character, self.characters.get(character, {}))
+            as_of = as_of or scene_time(request["scene"])
+            scene_id = request["scene"].get("id")
+        if not scenario:
+            scenario, as_of = self.last_scenario.get(character, (None, as_of))
+        if not scenario:
+            raise ValueError(f"No scenario given and no previous scenario for {character}")
+
+        post = self.pool.submit(self._generate, character, post_type, scenario, as_of, scene_id).result()
+        if post is None:
+            raise RuntimeError(f"Generation failed for {character} ({post_type})")
+        return {"post": post_response(post)}
+
+    def cmd_scene(self, request: Dict) -> Dict:
+        """Fan every (character, post_type) cell of a scene out over the worker pool."""
+        scene = request["scene"]
+        characters = request.get("characters") or [
+            name for name in scene.get("character_directions", {}) if name in self.characters
+        ]
+        post_types = request.get("post_types") or scene.get("post_types") or ["social", "blog"]
+        as_of = scene_time(scene)
+
+        futures = {}
+        for character in characters:
+            scenario = build_character_scenario(scene, character, self.characters.get(character, {}))
+            for post_type in post_types:
+                futures[(character, post_type)] = self.pool.submit(
+                    self._generate, character, post_type, scenario, as_of, scene.get("id"))
+
+        posts, failures = [], []
+        for (character, post_type), future in futures.items():
+            try:
+                post = future.result()
+            except Exception as e:
+                failures.append({"character": character, "post_type": post_type, "error": str(e)})
+                continue
+            if post is None:
+                failures.append({"character": character, "post_type": post_type, "error": "generation failed"})
+            else:
+                posts.append(post_response(post))
+        return {"scene": scene.get("id") or scene.get("title"), "posts": posts, "failures": failures}
+
+    def cmd_status(self, request: Dict) -> Dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "workers": self.workers,
+                "best_of": self.best_of,
+                "in_flight": self.in_flight,
+                "generated": self.generated,
+                "failed": self.failed,
+                "agents": {name: len(agent.posts_generated) for name, agent in self.agents.items()},
+                "unflushed": {name: len(posts) for name, posts in self.unflushed.items() if posts},
+                "hedging": dict(self.runner.stats),
+                "quota_remaining": self.quota.remaining(self.ledger),
+            }
+
+    def cmd_flush(self, request: Dict) -> Dict:
+        """Write unflushed posts to drafts (rejects aside) plus an issues manifest."""
+        with self._lock:
+            pending, self.unflushed = self.unflushed, {}
+
+        accepted_posts = []
+        rejected_posts = []
+        files = []
+        for character, posts in pending.items():
+            accepted, rejected = self.scorer.partition(posts)
+            rejected_posts.extend(rejected)
+            if accepted:
+                files.append(self.agents[character].save_posts_to_json(posts=accepted))
+                accepted_posts.extend(accepted)
+        rejected_file = save_rejected_posts(rejected_posts)
+
+        manifest_file = None
+        if accepted_posts:
+            manifest_file = f"./content/drafts/github_issues_manifest_{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+            github_issues = [{
+                "title": f"[Draft] {post.character_name} - {post.post_type.upper()}",
+                "body": post.to_github_issue_body(),
+                "labels": ["draft", "ai-generated", "needs-review", post.character_name],
+                "character": post.character_name,
+                "post_type": post.post_type
+            } for post in accepted_posts]
+            with open(manifest_file, 'w') as f:
+                json.dump(github_issues, f, indent=2, default=str)
+
+        with self._lock:
+            self.dup_index.save()
+            self.interactions.save()
+        self.runner.tracker.save()
+
+        search = SearchIndex()
+        for path in files:
+            search.index_file(path, "draft")
+        if rejected_file:
+            search.index_file(rejected_file, "rejected")
+        search.close()
+
+        return {
+            "drafts": files,
+            "manifest": manifest_file,
+            "rejected_file": rejected_file,
+            "accepted": len(accepted_posts),
+            "rejected": len(rejected_posts),
+        }
+
+    def handle(self, request: Dict) -> Dict:
+        handler = getattr(self, f"cmd_{request.get('command')}", None)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {request.get('command')}"}
+        try:
+            return {"ok": True, **handler(request)}
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def close(self):
+        """Flush anything pending and stop the worker pool."""
+        self.pool.shutdown(wait=True)
+        if any(self.unflushed.values()):
+            print(f"✓ Flushed on shutdown: {self.cmd_flush({})}")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request line in, one JSON response line out."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {"ok": False, "error": f"Bad request: {e}"}
+        else:
+            if request.get("command") == "shutdown":
+                response = {"ok": True, "stopping": True}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                response = self.server.daemon_state.handle(request)
+        self.wfile.write((json.dumps(response, default=str) + "\n").encode())
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon_state: GenerationDaemon):
+        self.daemon_state = daemon_state
+        super().__init__(socket_path, RequestHandler)
+
+
+def claim_socket(socket_path: str) -> bool:
+    """Remove a stale socket file; False if a live daemon already owns it."""
+    if not os.path.exists(socket_path):
+        return True
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+            return False
+        except OSError:
+            os.unlink(socket_path)
+            return True
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--codex", default="./data/character_codex.json")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent generations")
+    parser.add_argument("--max-hedges", type=int, default=2)
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream model output and abort early on header/length violations")
+    parser.add_argument("--best-of", type=int, default=1, metavar="N",
+                        help="Generate N candidates per anchor post (blog/editorial) and keep the best")
+    return parser.parse_args()
+
+
+def main(args):
+    Path(args.socket).parent.mkdir(parents=True, exist_ok=True)
+    if not claim_socket(args.socket):
+        print(f"✗ A daemon is already listening on {args.socket}")
+        return 1
+
+    state = GenerationDaemon(args.codex, workers=args.workers, stream=args.stream,
+                             max_hedges=args.max_hedges, best_of=args.best_of)
+    server = DaemonServer(args.socket, state)
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"✓ mfx daemon (pid {os.getpid()}) listening on {args.socket} "
+          f"with {len(state.characters)} characters, {args.workers} workers")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        state.close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        print("✓ mfx daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -13,15 +13,57 @@ Interaction types:
 
 import sys
 import json
+import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.novel_crafter_parser import NovelCrafterParser
-from agents.base.character_agent import CharacterAgent
+from agents.base.character_agent import ANCHOR_POST_TYPES, CharacterAgent
+from agents.base.hedged_runner import HedgedRunner, LatencyTracker
+from utils.quality_scorer import QualityScorer, save_rejected_posts
+from utils.continuity_checker import ContinuityChecker
+from utils.near_duplicate_index import NearDuplicateIndex
+from utils.interaction_graph import InteractionGraph
+from utils.search_index import SearchIndex
+from utils.tracing import span, tracer
+from utils.profiling import profiler
+from utils.usage_ledger import UsageLedger, QuotaWindow, QuotaPlanner, PlannedCell
+from utils.run_journal import RunJournal
+from utils.story_timeline import StoryTimeline, parse_story_time
+
+SCRIPT_NAME = "phase0_expanded"
+SCENE_ID = "emergency_board_meeting_2025-06-03"
+SCENE_TIME = parse_story_time("June 3, 2025, 1:17 PM")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream model output and abort early on header/length violations")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record per-stage spans to ./data/traces/ (see scripts/trace_summary.py)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile CPU and allocations per stage into ./data/profiles/")
+    parser.add_argument("--profile-every", type=int, default=10, metavar="N",
+                        help="Take a tracemalloc snapshot every N posts (with --profile)")
+    parser.add_argument("--quota-calls", type=int, default=40,
+                        help="CLI calls allowed per quota window (default: 40)")
+    parser.add_argument("--quota-window-hours", type=float, default=5.0,
+                        help="Length of the rolling quota window in hours (default: 5)")
+    parser.add_argument("--best-of", type=int, default=1, metavar="N",
+                        help="Generate N candidates per anchor post (blog/editorial) and keep the best")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="Resume a journaled run (default: the latest), skipping completed posts")
+    return parser.parse_args()
+
+
+def main(args):
+    if args.trace:
+        tracer.configure()
+    if args.profile:
+        profiler.configure(snapshot_every=args.profile_every)
 
-
-def main():
     print("\n" + "="*70)
     print("PHASE 0 EXPANDED: Multi-Character Perspectives with Interactions")
     print("="*70 + "\n")
@@ -87,11 +129,18 @@ def main():
     print("Step 1: Creating character agents...")
     print("="*70 + "\n")
 
+    # One hedged runner shared by every agent: global hedge budget + latency stats
+    runner = HedgedRunner(tracker=LatencyTracker.load(), max_hedges=2, max_concurrent=4)
+    ledger = UsageLedger()
+    timeline = StoryTimeline.load()  # written by NovelCrafterParser.save_codex
+
     agents = {}
     for char_name in character_roster.keys():
         if char_name in characters:
             char_data = characters[char_name]
-            agent = CharacterAgent(char_name, char_data)
+            with span("agent_init", character=char_name):
+                agent = CharacterAgent(char_name, char_data, runner=runner, stream=args.stream, ledger=ledger,
+                                       timeline=timeline)
             agents[char_name] = agent
             status = "PRIMARY" if character_roster[char_name]["primary"] else "SECONDARY"
             print(f"✓ {char_name:15} ({status})")
@@ -214,15 +263,45 @@ You're 19 years old. This is your community. What do you DO?""",
 
     posts_by_character = {}
 
+    # Near-duplicate index over every draft produced so far
+    dup_index = NearDuplicateIndex.load()
+    dup_index.index_drafts()
+
+    # Who has actually mentioned whom so far (per scene/day buckets)
+    interactions = InteractionGraph.load(characters=character_roster.keys())
+    interactions.index_drafts()
+
+    # Write-ahead journal: every finished post is durable the moment it is parsed
+    journal = RunJournal.resume(SCRIPT_NAME, args.resume) if args.resume else RunJournal.start(SCRIPT_NAME)
+    if journal.completed_at:
+        print(f"✗ Run {journal.run_id} already completed at {journal.completed_at}; its drafts are saved")
+        sys.exit(1)
+    for (_, char_name, _), post in journal.posts():
+        if char_name in agents:
+            agents[char_name].restore_posts([post])
+            dup_index.add_post(post)
+            interactions.add_post(post)
+            posts_by_character.setdefault(char_name, []).append(post)
+    if len(journal):
+        print(f"↻ Resuming {journal.run_id}: {len(journal)} posts already completed")
+    print(f"Journal: {journal.path}")
+
+    # Build each character's scenario once, then lay out the scene matrix
+    scenarios = {}
     for char_name, info in character_roster.items():
         if char_name not in agents:
             continue
 
-        agent = agents[char_name]
         char_direction = character_prompts.get(char_name, "")
 
+        # Point secondary characters at roster members they haven't crossed paths with this week
+        if not info["primary"]:
+            fresh = interactions.not_interacted(char_name, candidates=character_roster.keys(),
+                                                as_of=SCENE_TIME.date())
+            info = {**info, "not_yet_interacted_with_this_week": fresh[:3]}
+
         # Build scenario with character-specific direction
-        char_scenario = f"""{scene_description}
+        scenarios[char_name] = f"""{scene_description}
 
 {char_direction}
 
@@ -235,27 +314,100 @@ what you observe, what you coordinate.
 
 This is the book being written in real-time."""
 
-        print(f"\n📍 {char_name}")
-        print(f"   Role: {info['role']}")
-        if info.get('cross_chars'):
-            print(f"   Interacts with: {', '.join(info['cross_chars'])}")
-
-        # Generate multiple post types
-        post_types = ["social", "blog"]
+    # Generate multiple post types; primary characters and anchor posts come first
+    post_types = ["social", "blog"]
+    cells = [
+        PlannedCell(
+            scene=SCENE_ID,
+            character=char_name,
+            post_type=post_type,
+            priority=(20 if character_roster[char_name]["primary"] else 10) + (1 if post_type == "blog" else 0),
+            calls_per_cell=args.best_of if post_type in ANCHOR_POST_TYPES else 1
+        )
+        for char_name in scenarios
+        for post_type in post_types
+        if not journal.is_done(SCENE_ID, char_name, post_type)
+    ]
+
+    # Fit the matrix into the remaining quota window; secondary posts are deferred first
+    planner = QuotaPlanner(ledger, QuotaWindow(hours=args.quota_window_hours, max_calls=args.quota_calls))
+    scheduled, deferred = planner.plan(cells)
+    planner.print_plan(scheduled, deferred)
+
+    completed = []
+    try:
+        for cell in scheduled:
+            char_name, post_type = cell.character, cell.post_type
+            info = character_roster[char_name]
+
+            print(f"\n📍 {char_name}")
+            print(f"   Role: {info['role']}")
+            if info.get('cross_chars'):
+                print(f"   Interacts with: {', '.join(info['cross_chars'])}")
+
+            def on_post(post, char_name=char_name, post_type=post_type):
+                post.metadata["scene"] = SCENE_ID
+                journal.record(SCENE_ID, char_name, post_type, post)
+                dup_index.add_post(post)
+                interactions.add_post(post)
 
-        for post_type in post_types:
             print(f"  → Generating {post_type}...", end="", flush=True)
-            post = agent.generate_post(
-                scenario=char_scenario,
-                post_type=post_type,
-                max_retries=2
-            )
+            if args.best_of > 1 and post_type in ANCHOR_POST_TYPES:
+                post = agents[char_name].generate_best_of(
+                    scenario=scenarios[char_name],
+                    post_type=post_type,
+                    n=args.best_of,
+                    on_post=on_post,
+                    as_of=SCENE_TIME
+                )
+            else:
+                post = agents[char_name].generate_post(
+                    scenario=scenarios[char_name],
+                    post_type=post_type,
+                    max_retries=2,
+                    on_post=on_post,
+                    as_of=SCENE_TIME
+                )
 
             if post:
                 posts_by_character.setdefault(char_name, []).append(post)
-                print(f" ✓")
+                completed.append(cell)
+                duplicates = post.metadata.get("near_duplicates")
+                print(f" ✓" + (f" (⚠ near-duplicate of {len(duplicates)})" if duplicates else ""))
             else:
                 print(f" ✗")
+    except KeyboardInterrupt:
+        print(f"\n\n⏸ Interrupted. {len(journal)} completed posts are journaled in {journal.path}")
+        print(f"  Resume with: python scripts/{SCRIPT_NAME}.py --resume {journal.run_id}")
+        sys.exit(130)
+
+    planner.clear_deferred(completed)
+    if deferred:
+        planner.save_deferred(deferred)
+        print(f"\n⏸ Deferred {len(deferred)} posts to {planner.deferred_path}")
+
+    dup_index.save()
+    interactions.save()
+    runner.tracker.save()
+    print(f"\nHedging: {runner.stats}")
+
+    # Score drafts locally and drop off-spec ones before the issue stage
+    scorer = QualityScorer(known_names=list(characters.keys()))
+    all_posts = [post for posts in posts_by_character.values() for post in posts]
+    scorer.score_posts(all_posts)
+
+    # Flag invented names and anachronisms for reviewers (kept, not rejected)
+    continuity = ContinuityChecker(characters, timeline)
+    continuity.check_posts(all_posts)
+    continuity.print_report(all_posts)
+
+    _, rejected = scorer.partition(all_posts)
+    save_rejected_posts(rejected)
+    rejected_ids = {id(post) for post in rejected}
+    posts_by_character = {
+        char_name: [post for post in posts if id(post) not in rejected_ids]
+        for char_name, posts in posts_by_character.items()
+    }
 
     # Save posts
     print("\n" + "="*70)
@@ -266,8 +418,10 @@ This is the book being written in real-time."""
     for char_name, agent in agents.items():
         if char_name in posts_by_character:
             agent.print_posts()
-            output_file = agent.save_posts_to_json()
-            print(f"✓ Saved: {output_file}\n")
+            if posts_by_character[char_name]:
+                # Only accepted posts; rejects are already in content/rejected/
+                output_file = agent.save_posts_to_json(posts=posts_by_character[char_name])
+                print(f"✓ Saved: {output_file}\n")
 
             # Create GitHub issue data
             for post in posts_by_character[char_name]:
@@ -286,6 +440,12 @@ This is the book being written in real-time."""
 
     print(f"✓ Saved manifest: {manifest_file}")
     print(f"  Total issues to create: {len(github_issues)}\n")
+    journal.complete()
+
+    # Keep the full-text index current (only new/changed files are read)
+    search = SearchIndex()
+    print(f"✓ Search index: +{search.index_content()} posts ({len(search)} total)")
+    search.close()
 
     # Summary
     print("="*70)
@@ -299,6 +459,14 @@ This is the book being written in real-time."""
             print(f"  {char_name:15} ({status:9}): {count} posts")
 
     print(f"\nTotal posts generated: {sum(len(p) for p in posts_by_character.values())}")
+    if args.trace:
+        print(f"\nTrace: {tracer.jsonl_path}")
+        print(f"Prometheus textfile: {tracer.export_prometheus()}")
+        print(f"Summary: python scripts/trace_summary.py {tracer.jsonl_path}")
+    if args.profile:
+        profiler.finish()
+        profiler.print_summary()
+
     print(f"\nNext steps:")
     print(f"1. Review posts in ./content/drafts/")
     print(f"2. Create GitHub issues from manifest")
@@ -307,4 +475,4 @@ This is the book being written in real-time."""
 
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
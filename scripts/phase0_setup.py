@@ -11,16 +11,52 @@ This script:
 
 import sys
 import json
+import argparse
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.novel_crafter_parser import NovelCrafterParser
-from agents.base.character_agent import CharacterAgent
+from agents.base.character_agent import ANCHOR_POST_TYPES, CharacterAgent
+from agents.base.hedged_runner import HedgedRunner, LatencyTracker
+from utils.quality_scorer import QualityScorer, save_rejected_posts
+from utils.continuity_checker import ContinuityChecker
+from utils.near_duplicate_index import NearDuplicateIndex
+from utils.search_index import SearchIndex
+from utils.tracing import span, tracer
+from utils.profiling import profiler
+from utils.usage_ledger import UsageLedger
+from utils.run_journal import RunJournal
+from utils.scenes import build_character_scenario
+from utils.story_timeline import parse_story_time
+
+SCRIPT_NAME = "phase0_setup"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream model output and abort early on header/length violations")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record per-stage spans to ./data/traces/ (see scripts/trace_summary.py)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile CPU and allocations per stage into ./data/profiles/")
+    parser.add_argument("--profile-every", type=int, default=10, metavar="N",
+                        help="Take a tracemalloc snapshot every N posts (with --profile)")
+    parser.add_argument("--best-of", type=int, default=1, metavar="N",
+                        help="Generate N candidates per anchor post (blog/editorial) and keep the best")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="Resume a journaled run (default: the latest), skipping completed posts")
+    return parser.parse_args()
+
+
+def main(args):
+    if args.trace:
+        tracer.configure()
+    if args.profile:
+        profiler.configure(snapshot_every=args.profile_every)
 
-
-def main():
     print("\n" + "="*70)
     print("PHASE 0: SETUP - Parse Novel Crafter & Create Character Agents")
     print("="*70 + "\n")
@@ -53,11 +89,17 @@ def main():
         "Kamea",     # Ideological resistance
     ]
 
+    # One hedged runner shared by every agent: global hedge budget + latency stats
+    runner = HedgedRunner(tracker=LatencyTracker.load(), max_hedges=2, max_concurrent=4)
+    ledger = UsageLedger()
+
     agents = {}
     for char_name in priority_characters:
         if char_name in characters:
             char_data = characters[char_name]
-            agent = CharacterAgent(char_name, char_data)
+            with span("agent_init", character=char_name):
+                agent = CharacterAgent(char_name, char_data, runner=runner, stream=args.stream, ledger=ledger,
+                                       timeline=parser.timeline)
             agents[char_name] = agent
             print(f"✓ Created agent for {char_name}")
         else:
@@ -144,61 +186,125 @@ What's your next move?
 
     posts_by_character = {}
 
+    # Near-duplicate index over every draft produced so far
+    dup_index = NearDuplicateIndex.load()
+    dup_index.index_drafts()
+
+    # Write-ahead journal: every finished post is durable the moment it is parsed
+    journal = RunJournal.resume(SCRIPT_NAME, args.resume) if args.resume else RunJournal.start(SCRIPT_NAME)
+    if journal.completed_at:
+        print(f"✗ Run {journal.run_id} already completed at {journal.completed_at}; its drafts are saved")
+        sys.exit(1)
+    for (_, char_name, _), post in journal.posts():
+        if char_name in agents:
+            agents[char_name].restore_posts([post])
+            dup_index.add_post(post)
+            posts_by_character.setdefault(char_name, []).append(post)
+    if len(journal):
+        print(f"↻ Resuming {journal.run_id}: {len(journal)} posts already completed")
+    print(f"Journal: {journal.path}")
+
     # For Phase 0, focus on the first scene: Emergency Board Meeting
     # Generate multiple perspectives on the SAME scene
     current_scene = scenes[0]
+    scene_time = parse_story_time(current_scene['time'])
 
     print(f"\n📍 SCENE: {current_scene['title']}")
     print(f"   Time: {current_scene['time']}")
     print(f"   Characters: {', '.join(current_scene['character_directions'].keys())}\n")
 
-    for char_name, agent in agents.items():
-        print(f"\nGenerating posts from {char_name}...")
-
-        # Build character-specific scenario
-        char_direction = current_scene['character_directions'].get(char_name, "")
-        char_scenario = f"""{current_scene['description']}
-
-{char_direction}
-
-{characters[char_name].get('voice_notes', '')}
-
-Remember: Report what you personally experienced. Name specific people, moments, decisions.
-This post is part of the permanent record of what happened."""
-
-        # Generate varied post types for this character's perspective on the scene
-        # Most posts are short (twitter-length), one longer anchor post per character per scene
-        post_specs = [
-            {"type": "social", "length": "short", "image": True},  # Tweet-length with optional image
-            {"type": "blog", "length": "long", "image": True},     # Anchor post with image description
-        ]
-
-        for post_spec in post_specs:
-            post_type = post_spec["type"]
-            print(f"  → Generating {post_type} post...")
-            post = agent.generate_post(
-                scenario=char_scenario,
-                post_type=post_type,
-                max_retries=2
-            )
-
-            if post:
-                posts_by_character.setdefault(char_name, []).append(post)
-                print(f"     ✓ Generated: {post.post_type.upper()}")
-                print(f"       Location: {post.location} | Encryption: {post.encryption}")
-                print(f"       Preview: {post.content[:80]}...")
-            else:
-                print(f"     ✗ Failed to generate {post_type}")
+    try:
+        for char_name, agent in agents.items():
+            print(f"\nGenerating posts from {char_name}...")
+
+            # Build character-specific scenario
+            char_scenario = build_character_scenario(current_scene, char_name, characters[char_name])
+
+            # Generate varied post types for this character's perspective on the scene
+            # Most posts are short (twitter-length), one longer anchor post per character per scene
+            post_specs = [
+                {"type": "social", "length": "short", "image": True},  # Tweet-length with optional image
+                {"type": "blog", "length": "long", "image": True},     # Anchor post with image description
+            ]
+
+            for post_spec in post_specs:
+                post_type = post_spec["type"]
+                if journal.is_done(current_scene['title'], char_name, post_type):
+                    print(f"  ↻ {post_type} already completed in {journal.run_id}")
+                    continue
+
+                def on_post(post, char_name=char_name, post_type=post_type):
+                    post.metadata["scene"] = current_scene['title']
+                    journal.record(current_scene['title'], char_name, post_type, post)
+                    dup_index.add_post(post)
+
+                print(f"  → Generating {post_type} post...")
+                if args.best_of > 1 and post_type in ANCHOR_POST_TYPES:
+                    post = agent.generate_best_of(
+                        scenario=char_scenario,
+                        post_type=post_type,
+                        n=args.best_of,
+                        on_post=on_post,
+                        as_of=scene_time
+                    )
+                else:
+                    post = agent.generate_post(
+                        scenario=char_scenario,
+                        post_type=post_type,
+                        max_retries=2,
+                        on_post=on_post,
+                        as_of=scene_time
+                    )
+
+                if post:
+                    posts_by_character.setdefault(char_name, []).append(post)
+                    duplicates = post.metadata.get("near_duplicates")
+                    print(f"     ✓ Generated: {post.post_type.upper()}")
+                    if duplicates:
+                        print(f"       ⚠ Near-duplicate of {len(duplicates)} earlier post(s)")
+                    print(f"       Location: {post.location} | Encryption: {post.encryption}")
+                    print(f"       Preview: {post.content[:80]}...")
+                else:
+                    print(f"     ✗ Failed to generate {post_type}")
+    except KeyboardInterrupt:
+        print(f"\n\n⏸ Interrupted. {len(journal)} completed posts are journaled in {journal.path}")
+        print(f"  Resume with: python scripts/{SCRIPT_NAME}.py --resume {journal.run_id}")
+        sys.exit(130)
+
+    dup_index.save()
+    runner.tracker.save()
+    print(f"\nHedging: {runner.stats}")
+
+    # Score drafts locally and drop off-spec ones before the issue stage
+    scorer = QualityScorer(known_names=list(characters.keys()))
+    all_posts = [post for posts in posts_by_character.values() for post in posts]
+    scorer.score_posts(all_posts)
+
+    # Flag invented names and anachronisms for reviewers (kept, not rejected)
+    continuity = ContinuityChecker(characters, parser.timeline)
+    continuity.check_posts(all_posts)
+    continuity.print_report(all_posts)
+
+    _, rejected = scorer.partition(all_posts)
+    save_rejected_posts(rejected)
+    rejected_ids = {id(post) for post in rejected}
+    posts_by_character = {
+        char_name: [post for post in posts if id(post) not in rejected_ids]
+        for char_name, posts in posts_by_character.items()
+    }
 
     # Step 4: Save and prepare for GitHub
     print("\n" + "="*70)
     print("Step 4: Saving posts and preparing GitHub issues...")
     print("="*70 + "\n")
 
-    # Save all posts
+    # Save accepted posts (rejects are already in content/rejected/)
     for char_name, agent in agents.items():
         agent.print_posts()
-        output_file = agent.save_posts_to_json()
+        accepted = posts_by_character.get(char_name, [])
+        if not accepted:
+            continue
+        output_file = agent.save_posts_to_json(posts=accepted)
         print(f"Saved to: {output_file}\n")
 
     # Create GitHub issues manifest
@@ -221,6 +327,12 @@ This post is part of the permanent record of what happened."""
 
     print(f"✓ Saved GitHub issues manifest: {manifest_file}")
     print(f"  Total issues to create: {len(github_issues)}")
+    journal.complete()
+
+    # Keep the full-text index current (only new/changed files are read)
+    search = SearchIndex()
+    print(f"✓ Search index: +{search.index_content()} posts ({len(search)} total)")
+    search.close()
 
     # Step 5: Summary
     print("\n" + "="*70)
@@ -230,6 +342,14 @@ This post is part of the permanent record of what happened."""
     for char_name, posts in posts_by_character.items():
         print(f"  {char_name}: {len(posts)} posts")
 
+    if args.trace:
+        print(f"\nTrace: {tracer.jsonl_path}")
+        print(f"Prometheus textfile: {tracer.export_prometheus()}")
+        print(f"Summary: python scripts/trace_summary.py {tracer.jsonl_path}")
+    if args.profile:
+        profiler.finish()
+        profiler.print_summary()
+
     print(f"\nNext steps:")
     print(f"1. Review posts in: ./content/drafts/")
     print(f"2. Create GitHub issues from: {manifest_file}")
@@ -238,4 +358,4 @@ This post is part of the permanent record of what happened."""
 
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Local stand-in servers for the publishing platforms.
+
+Speak just enough of each API for the adapters in utils/platform_adapters.py
+(Bluesky createSession/createRecord, the Lens relay's /publications) and
+record what was published, so the outbox and publisher can be exercised
+without accounts or network. Each server can add latency, fail a fraction
+of requests with 503 and enforce a rate limit with 429 + Retry-After.
+
+Usage:
+    python scripts/platform_standin.py                      # bluesky :8701, lens :8702
+    python scripts/platform_standin.py --latency 2 --failure-rate 0.2 --rate 1
+
+    curl http://127.0.0.1:8701/records                      # what was published
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+DEFAULT_PORTS = {"bluesky": 8701, "lens": 8702}
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, platform: str, port: int, latency: float = 0.0, failure_rate: float = 0.0,
+                 rate: float = 0.0):
+        self.platform = platform
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rate = rate  # requests/second before answering 429 (0 = unlimited)
+        self.records: Dict[str, Dict] = {}  # idempotency key / rkey -> record
+        self.requests = 0
+        self._last_request = 0.0
+        self._lock = threading.Lock()
+        super().__init__(("127.0.0.1", port), StandinHandler)
+
+    def admit(self) -> bool:
+        """False if this request exceeds the configured rate."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            if self.rate and now - self._last_request < 1.0 / self.rate:
+                return False
+            self._last_request = now
+            return True
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: Dict, headers: Dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/records":
+            self._reply(200, {"platform": self.server.platform, "records": list(self.server.records.values())})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path == "/xrpc/com.atproto.server.createSession":
+            self._reply(200, {"did": "did:plc:standin", "handle": payload.get("identifier"), "accessJwt": "standin"})
+            return
+        if not server.admit():
+            self._reply(429, {"error": "RateLimitExceeded"}, {"Retry-After": "1"})
+            return
+        time.sleep(server.latency * random.uniform(0.5, 1.5))
+        if random.random() < server.failure_rate:
+            self._reply(503, {"error": "Unavailable"})
+            return
+
+        if self.path == "/xrpc/com.atproto.repo.createRecord":
+            key = payload["rkey"]
+            uri = f"at://{payload['repo']}/{payload['collection']}/{key}"
+            with server._lock:
+                if key in server.records:
+                    self._reply(409, {"error": "RecordExists", "uri": uri})
+                    return
+                server.records[key] = {"uri": uri, **payload["record"]}
+            self._reply(200, {"uri": uri, "cid": key})
+        elif self.path == "/publications":
+            key = self.headers.get("Idempotency-Key") or str(len(server.records))
+            with server._lock:
+                record = server.records.setdefault(key, {"id": f"lens-{len(server.records):05d}", **payload})
+            self._reply(200, {"id": record["id"]})  # replays return the original publication
+        else:
+            self._reply(404, {"error": "not found"})
+
+
+def start_standins(platforms: List[str], latency: float = 0.0, failure_rate: float = 0.0,
+                   rate: float = 0.0) -> Dict[str, StandinServer]:
+    """Start stand-ins for the given platforms on background threads."""
+    servers = {}
+    for platform in platforms:
+        server = StandinServer(platform, DEFAULT_PORTS[platform], latency, failure_rate, rate)
+        threading.Thread(target=server.serve_forever, name=f"standin-{platform}", daemon=True).start()
+        servers[platform] = server
+    return servers
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--platforms", default=",".join(DEFAULT_PORTS))
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean seconds per publish")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of publishes answered with 503")
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests/second before answering 429")
+    return parser.parse_args()
+
+
+def main(args):
+    servers = start_standins(args.platforms.split(","), args.latency, args.failure_rate, args.rate)
+    for platform, server in servers.items():
+        print(f"✓ {platform} stand-in on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        for server in servers.values():
+            server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
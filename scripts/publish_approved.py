@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Publish approved posts to every platform through the outbox.
+
+Scans content/approved/ into the outbox (idempotent by post_id), then fans
+each post out to the platform adapters concurrently. Each platform has its
+own rate limit and retry schedule; a post lands in content/published/ once
+every platform has it.
+
+Usage:
+    python scripts/publish_approved.py                        # drain the outbox once
+    python scripts/publish_approved.py --platforms lens --watch
+    python scripts/publish_approved.py --standin --standin-failure-rate 0.3   # local test run (data/outbox_standin.db)
+    python scripts/publish_approved.py --stats
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.outbox import AsyncPublisher, Outbox
+from utils.platform_adapters import ADAPTERS
+from utils.search_index import SearchIndex
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--platforms", default=",".join(ADAPTERS), help="Comma-separated adapter names")
+    parser.add_argument("--approved-dir", default="./content/approved")
+    parser.add_argument("--watch", action="store_true", help="Keep running and pick up newly approved posts")
+    parser.add_argument("--poll", type=float, default=30.0, help="Seconds between approved/ scans with --watch")
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--retry-failed", action="store_true", help="Re-queue rows that ran out of attempts")
+    parser.add_argument("--stats", action="store_true", help="Print outbox state per platform and exit")
+    parser.add_argument("--standin", action="store_true", help="Publish to local stand-in servers")
+    parser.add_argument("--standin-latency", type=float, default=0.2)
+    parser.add_argument("--standin-failure-rate", type=float, default=0.0)
+    return parser.parse_args()
+
+
+def print_stats(outbox: Outbox):
+    for platform, states in sorted(outbox.stats().items()):
+        print(f"  {platform:10} " + ", ".join(f"{state} {count}" for state, count in sorted(states.items())))
+
+
+async def watch_approved(outbox: Outbox, adapters, approved_dir: str, poll: float):
+    while True:
+        await asyncio.sleep(poll)
+        added = outbox.enqueue_approved(adapters, approved_dir)
+        if added:
+            print(f"↻ Queued {added} new platform publishes")
+
+
+async def publish(publisher: AsyncPublisher, args):
+    if not args.watch:
+        await publisher.run(drain=True)
+        return
+    watcher = asyncio.create_task(watch_approved(publisher.outbox, publisher.adapters, args.approved_dir, args.poll))
+    try:
+        await publisher.run(drain=False, poll=min(args.poll, 5.0))
+    finally:
+        watcher.cancel()
+
+
+def main(args) -> int:
+    names = [name.strip() for name in args.platforms.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ADAPTERS]
+    if unknown:
+        print(f"✗ Unknown platform(s): {', '.join(unknown)} (available: {', '.join(ADAPTERS)})")
+        return 1
+
+    # Stand-in runs keep their own queue and archive so they never mark real posts published
+    outbox = Outbox("./data/outbox_standin.db" if args.standin else "./data/outbox.db")
+    if args.stats:
+        print_stats(outbox)
+        return 0
+
+    if args.standin:
+        from scripts.platform_standin import DEFAULT_PORTS, start_standins
+        start_standins(names, latency=args.standin_latency, failure_rate=args.standin_failure_rate)
+        adapters = {name: ADAPTERS[name](endpoint=f"http://127.0.0.1:{DEFAULT_PORTS[name]}") for name in names}
+        published_dir = tempfile.mkdtemp(prefix="published_standin_")
+        print(f"✓ Publishing to local stand-ins: {', '.join(names)} (archive: {published_dir})")
+    else:
+        adapters = {name: ADAPTERS[name]() for name in names}
+        published_dir = "./content/published"
+
+    if args.retry_failed:
+        print(f"↻ Re-queued {outbox.retry_failed()} failed publishes")
+    added = outbox.enqueue_approved(adapters, args.approved_dir)
+    print(f"Queued {added} new platform publishes")
+    print_stats(outbox)
+
+    publisher = AsyncPublisher(outbox, adapters, max_attempts=args.max_attempts, published_dir=published_dir)
+    started = time.perf_counter()
+    try:
+        asyncio.run(publish(publisher, args))
+    except KeyboardInterrupt:
+        print("\n⏸ Interrupted; in-flight publishes resume on the next run")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✓ {len(publisher.published)} posts fully published in {elapsed:.1f}s")
+    for name, counts in publisher.counts.items():
+        print(f"  {name:10} published {counts['published']}, retried {counts['retried']}, failed {counts['failed']}")
+    print_stats(outbox)
+
+    if publisher.published and not args.standin:
+        search = SearchIndex()
+        search.index_content()
+        search.close()
+    outbox.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
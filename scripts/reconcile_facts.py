@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Reconcile contradictory facts across draft posts about the same scene.
+
+Counts, times and names are extracted from every draft, conflicting claims
+are clustered per scene, and only the minority posts are regenerated with
+the agreed facts injected. Replacements are swapped into their draft files
+in place. Ties are reported but left alone until the scene file pins the
+fact; a scene file can also pin facts the vote would otherwise decide:
+
+    "facts": {"people": 43, "meeting ended": "19:32", "treasurer": "Robert Chen"}
+
+Usage:
+    python scripts/reconcile_facts.py --dry-run          # report only
+    python scripts/reconcile_facts.py
+    python scripts/reconcile_facts.py --scene rescue_in_the_woods --max-posts 3
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.character_agent import CharacterAgent
+from utils.fact_reconciliation import SCENE_LINE_PATTERN, FactIndex, reconcile, save_replacements
+from utils.quality_scorer import load_draft_posts
+from utils.scenes import load_scenes
+from utils.search_index import SearchIndex
+from utils.story_timeline import StoryTimeline
+from utils.usage_ledger import UsageLedger
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--drafts-dir", default="./content/drafts")
+    parser.add_argument("--scene", help="Only this scene (id, title or SCENE: line)")
+    parser.add_argument("--dry-run", action="store_true", help="Report conflicts without regenerating")
+    parser.add_argument("--max-attempts", type=int, default=2, help="Regenerations per post before keeping it")
+    parser.add_argument("--max-posts", type=int, help="Cap on posts regenerated this run")
+    return parser.parse_args()
+
+
+def scene_facts(scenes_dir: str = "./content/scenes"):
+    """Pinned facts from scene files, under every key a post may carry for that scene."""
+    canon = {}
+    for scene in load_scenes(scenes_dir):
+        if not scene.get("facts"):
+            continue
+        keys = [scene["id"], scene.get("title")]
+        match = SCENE_LINE_PATTERN.search(scene.get("description", ""))
+        if match:
+            keys.append(match.group(1).strip())
+        for key in filter(None, keys):
+            canon[key] = scene["facts"]
+    return canon
+
+
+def main(args) -> int:
+    index = FactIndex()
+    index.add_posts(load_draft_posts(args.drafts_dir))
+    conflicts = index.conflicts(args.scene, canon=scene_facts())
+    index.print_report(conflicts)
+    if args.dry_run or all(c.needs_canon for c in conflicts):
+        return 0
+
+    with open("./data/character_codex.json") as f:
+        characters = json.load(f)["characters"]
+    timeline = StoryTimeline.load()
+    ledger = UsageLedger()
+    agents = {}
+
+    def agent_for(name: str) -> Optional[CharacterAgent]:
+        if name not in characters:
+            return None
+        if name not in agents:
+            agents[name] = CharacterAgent(name, characters[name], ledger=ledger, timeline=timeline)
+        return agents[name]
+
+    print("\nRegenerating minority posts...")
+    replaced = reconcile(index, conflicts, agent_for, max_attempts=args.max_attempts, max_posts=args.max_posts)
+    if not replaced:
+        print("\n✗ No posts replaced")
+        return 1
+
+    files = save_replacements(replaced, args.drafts_dir)
+    search = SearchIndex()
+    for path in files:
+        search.index_file(path, "draft")
+    search.close()
+    print(f"\n✓ Replaced {len(replaced)} posts in {len(files)} draft files")
+    index.print_report(index.conflicts(args.scene, canon=scene_facts()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
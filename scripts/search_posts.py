@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Full-text search over every saved post (drafts, approved, published, rejected).
+
+Usage:
+    python scripts/search_posts.py "storm shelter"
+    python scripts/search_posts.py "Robert NEAR liability" --character Tria --state draft
+    python scripts/search_posts.py "report" --type social --facets
+    python scripts/search_posts.py --character Chris            # newest posts, no query
+    python scripts/search_posts.py --show <post_id>
+
+Query syntax is SQLite FTS5: phrases ("south field"), prefixes (shelt*),
+AND/OR/NOT, NEAR, and column filters (scenario: rescue).
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.search_index import FACETS, SearchIndex
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("query", nargs="?", default="", help="FTS5 query (omit to list by filters)")
+    parser.add_argument("--character")
+    parser.add_argument("--type", dest="post_type")
+    parser.add_argument("--location")
+    parser.add_argument("--encryption", choices=["public", "encrypted", "partial"])
+    parser.add_argument("--state", choices=["draft", "approved", "published", "rejected"])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--facets", action="store_true", help="Show counts per facet for the query")
+    parser.add_argument("--show", metavar="POST_ID", help="Print one post in full")
+    parser.add_argument("--no-refresh", action="store_true", help="Skip the incremental re-index of ./content")
+    return parser.parse_args()
+
+
+def main(args) -> int:
+    index = SearchIndex()
+    if not args.no_refresh:
+        started = time.perf_counter()
+        added = index.index_content()
+        if added:
+            print(f"↻ Indexed {added} new/changed posts in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    if args.show:
+        post = index.get(args.show)
+        if not post:
+            print(f"✗ No post {args.show}")
+            return 1
+        print(f"{post['character']} | {post['post_type']} | {post['state']} | {post['timestamp']} | {post['source']}")
+        print("-" * 70)
+        print(post["content"])
+        return 0
+
+    filters = {
+        "character": args.character, "post_type": args.post_type, "location": args.location,
+        "encryption": args.encryption, "state": args.state,
+    }
+    started = time.perf_counter()
+    try:
+        results = index.search(args.query, limit=args.limit, offset=args.offset, **filters)
+        facets = index.facets(args.query, **filters) if args.facets else None
+    except Exception as e:  # sqlite3.OperationalError on malformed FTS5 syntax
+        print(f"✗ Bad query: {e}")
+        return 1
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"\n{len(results)} results ({len(index)} posts indexed, {elapsed_ms:.1f}ms)\n")
+    for row in results:
+        print(f"{row['post_id']}  {row['character']:10} {row['post_type']:10} {row['state']:9} "
+              f"{row['encryption']:9} {row['timestamp']}  score {row['score'] or 0:.2f}")
+        print(f"    {' '.join(row['snippet'].split())}\n")
+
+    if facets:
+        for column in FACETS:
+            values = ", ".join(f"{value} ({count})" for value, count in facets[column].items())
+            print(f"{column:11} {values}")
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
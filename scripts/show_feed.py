@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Page through the in-world campus LAN feed in story-time order.
+
+The feed is materialized from every saved post (see utils/feed_materializer.py)
+and rebuilt only when content/ changed.
+
+Usage:
+    python scripts/show_feed.py                                   # first page, oldest first
+    python scripts/show_feed.py --board resistance --encryption encrypted
+    python scripts/show_feed.py --since "June 3, 2025, 12:00 PM" --until 2025-06-04 --newest-first
+    python scripts/show_feed.py --state approved --state published --limit 50 --cursor 50
+    python scripts/show_feed.py --counts                          # posts per board / encryption level
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.feed_materializer import Feed, FeedMaterializer, board_of
+from utils.story_timeline import parse_story_time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--board")
+    parser.add_argument("--encryption", choices=["public", "encrypted", "partial"])
+    parser.add_argument("--state", action="append", choices=["draft", "approved", "published"],
+                        help="Repeat for several states (default: all)")
+    parser.add_argument("--since", help="Story time window start, inclusive (ISO or scene time)")
+    parser.add_argument("--until", help="Story time window end, exclusive (ISO or scene time)")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--cursor", type=int, default=0, help="next_cursor printed by the previous page")
+    parser.add_argument("--newest-first", action="store_true")
+    parser.add_argument("--full", action="store_true", help="Print whole posts instead of one line each")
+    parser.add_argument("--counts", action="store_true", help="Show posts per board and encryption level")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if content/ is unchanged")
+    return parser.parse_args()
+
+
+def parse_time(text: str) -> Optional[datetime]:
+    """ISO date/time ("2025-06-03", "2025-06-03 14:00") or a scene time ("June 3, 2025, 2:00 PM")."""
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return parse_story_time(text)
+
+
+def main(args) -> int:
+    window = {}
+    for name, value in (("start", args.since), ("end", args.until)):
+        if value:
+            window[name] = parse_time(value)
+            if window[name] is None:
+                print(f"✗ Could not parse story time: {value}")
+                return 1
+
+    started = time.perf_counter()
+    stats = FeedMaterializer().build(force=args.rebuild)
+    if stats:
+        print(f"↻ Materialized {stats['posts']} posts from {stats['characters']} characters "
+              f"({stats['duplicates']} duplicates dropped) in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    feed = Feed()
+    if args.counts:
+        for column, counts in feed.counts().items():
+            print(f"{column:11} {', '.join(f'{value} ({n})' for value, n in counts.items())}")
+        feed.close()
+        return 0
+
+    started = time.perf_counter()
+    page = feed.query(board=args.board, encryption=args.encryption, states=args.state, limit=args.limit,
+                      cursor=args.cursor, newest_first=args.newest_first, **window)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"\n{page.total} posts in window ({len(feed)} in feed, {elapsed_ms:.1f}ms)\n")
+    for post, state in zip(page.posts, page.states):
+        print(f"{post.timestamp}  {board_of(post.location):16} {post.encryption:9} {state:9} "
+              f"{post.character_name:10} {post.post_type}")
+        if args.full:
+            print(f"{post.content}\n")
+        else:
+            print(f"    {' '.join(post.content.split())[:110]}\n")
+    if page.next_cursor is not None:
+        print(f"next: --cursor {page.next_cursor}")
+    feed.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
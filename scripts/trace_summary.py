@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Summarize a traced generation run: per-stage latency percentiles and histograms.
+
+Usage:
+    python scripts/trace_summary.py                         # latest run in ./data/traces/
+    python scripts/trace_summary.py data/traces/<run>.jsonl
+    python scripts/trace_summary.py --by character          # split stages per character
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.tracing import LATENCY_BUCKETS, load_spans
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def print_histogram(durations_ms, width: int = 40):
+    counts = []
+    lower = -1.0
+    for bucket in LATENCY_BUCKETS + (float("inf"),):
+        upper_ms = bucket * 1000
+        counts.append((lower, upper_ms, sum(1 for d in durations_ms if lower < d <= upper_ms)))
+        lower = upper_ms
+
+    # Trim empty buckets at both ends
+    nonzero = [i for i, (_, _, c) in enumerate(counts) if c]
+    if not nonzero:
+        return
+    peak = max(c for _, _, c in counts)
+    for low, high, count in counts[nonzero[0]:nonzero[-1] + 1]:
+        label = f"≤{high:.0f}ms" if high != float("inf") else f">{low:.0f}ms"
+        bar = "█" * max(int(count / peak * width), 1 if count else 0)
+        print(f"      {label:>10} | {bar} {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency summary for a traced run")
+    parser.add_argument("trace", nargs="?", help="Span JSONL file (default: newest in ./data/traces)")
+    parser.add_argument("--by", choices=["character", "post_type", "attempt"], help="Split stages by attribute")
+    parser.add_argument("--no-histogram", action="store_true")
+    args = parser.parse_args()
+
+    trace_file = args.trace
+    if not trace_file:
+        traces = sorted(Path("./data/traces").glob("*.jsonl"), key=lambda p: p.stat().st_mtime)
+        if not traces:
+            print("No traces found in ./data/traces (run a phase0 script with --trace)")
+            return 1
+        trace_file = str(traces[-1])
+
+    spans = load_spans(trace_file)
+    groups = {}
+    for span in spans:
+        key = span["name"] if not args.by else f"{span['name']} [{span.get(args.by, '-')}]"
+        groups.setdefault(key, []).append(span)
+
+    print(f"\n{'='*70}")
+    print(f"Trace Summary: {trace_file}")
+    print(f"{'='*70}")
+    print(f"Spans: {len(spans)}  |  Errors: {sum(1 for s in spans if s.get('error'))}\n")
+    print(f"{'stage':32} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'total s':>9} {'KB':>8}")
+
+    for key, stage_spans in sorted(groups.items(), key=lambda kv: -sum(s["duration_ms"] for s in kv[1])):
+        durations = sorted(s["duration_ms"] for s in stage_spans)
+        kilobytes = sum(s.get("bytes", 0) for s in stage_spans) / 1024
+        print(f"{key[:32]:32} {len(durations):>6} {percentile(durations, 0.5):>10.1f} "
+              f"{percentile(durations, 0.95):>10.1f} {percentile(durations, 0.99):>10.1f} "
+              f"{sum(durations) / 1000:>9.2f} {kilobytes:>8.1f}")
+        if not args.no_histogram:
+            print_histogram(durations)
+
+    print(f"{'='*70}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
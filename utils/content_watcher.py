@@ -0,0 +1,161 @@
+"""
+File change watcher for content/ directories.
+
+Uses Linux inotify through ctypes (no extra dependency) and falls back to
+mtime polling anywhere inotify is unavailable (macOS, some containers,
+network filesystems). Either way, callers just ask for the files that
+changed since the last call.
+"""
+
+import os
+import sys
+import ctypes
+import select
+import struct
+import ctypes.util
+from pathlib import Path
+from typing import Dict, List, Optional
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+class ContentWatcher:
+    """Reports changed files under a set of directories."""
+
+    def __init__(self, paths: List[str], suffixes=(".json",), poll_interval: float = 5.0,
+                 force_polling: bool = False):
+        self.paths = [Path(p) for p in paths]
+        self.suffixes = tuple(suffixes)
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._watches: Dict[int, Path] = {}
+        self._snapshot: Dict[Path, float] = {}
+
+        for path in self.paths:
+            path.mkdir(parents=True, exist_ok=True)
+
+        if not force_polling:
+            self._start_inotify()
+        if self._fd is None:
+            self._snapshot = self._scan()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._fd is not None else "polling"
+
+    def _start_inotify(self):
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        self._fd = fd
+        for path in self.paths:
+            for directory in [path] + [p for p in path.rglob("*") if p.is_dir()]:
+                self._add_watch(directory)
+
+    def _add_watch(self, directory: Path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def _matches(self, path: Path) -> bool:
+        return path.suffix in self.suffixes and not path.name.startswith(".")
+
+    def _scan(self) -> Dict[Path, float]:
+        snapshot = {}
+        for path in self.paths:
+            for file in path.rglob("*"):
+                if file.is_file() and self._matches(file):
+                    try:
+                        snapshot[file] = file.stat().st_mtime
+                    except FileNotFoundError:
+                        continue
+        return snapshot
+
+    def changes(self, timeout: float) -> List[Path]:
+        """
+        Block up to `timeout` seconds for changes.
+
+        Returns:
+            Changed, created or deleted files (deduplicated), or [] on timeout
+        """
+        if self._fd is not None:
+            return self._inotify_changes(timeout)
+        return self._poll_changes(timeout)
+
+    def _inotify_changes(self, timeout: float) -> List[Path]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+
+        changed = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._add_watch(path)
+                        changed.extend(p for p in path.rglob("*") if p.is_file() and self._matches(p))
+                    continue
+                if mask & IN_CREATE:
+                    continue  # wait for IN_CLOSE_WRITE so half-written files are skipped
+                if self._matches(path) and path not in changed:
+                    changed.append(path)
+        return changed
+
+    def _poll_changes(self, timeout: float) -> List[Path]:
+        waited = 0.0
+        while True:
+            snapshot = self._scan()
+            changed = [p for p, mtime in snapshot.items() if self._snapshot.get(p) != mtime]
+            changed += [p for p in self._snapshot if p not in snapshot]
+            self._snapshot = snapshot
+            if changed or waited >= timeout:
+                return changed
+            step = min(self.poll_interval, timeout - waited)
+            select.select([], [], [], step)
+            waited += step
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.content_watcher [DIR ...]
+    watched = sys.argv[1:] or ["./content/scenes", "./content/approved", "./content/rejected"]
+    watcher = ContentWatcher(watched)
+    print(f"Watching {', '.join(watched)} ({watcher.mode}); Ctrl-C to stop")
+    try:
+        while True:
+            for path in watcher.changes(timeout=60):
+                print(f"  ↻ {path}")
+    except KeyboardInterrupt:
+        watcher.close()
@@ -0,0 +1,273 @@
+"""
+Continuity checker: unknown entities and anachronisms in generated drafts.
+
+Every codex name, connection, known place, event title and story-event keyword
+into one Aho-Corasick automaton, so a batch of posts is scanned in time linear
+in its text (plus matches), however large the codex grows. Two kinds of flags
+are written to post.metadata["continuity"] before review:
+
+- unknown_entities: capitalized names the codex has never heard of
+  ("Dean Morrison", "Robert Chen")
+- anachronisms: references to story events that happen after the post's
+  story time, or that the character could not have known about yet
+
+Usage (from the repo root):
+    python -m utils.continuity_checker            # check every saved draft
+"""
+
+import re
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agents.base.character_agent import Post
+from utils.story_timeline import StoryEvent, StoryTimeline, MENTION_PATTERN
+
+# Places and institutions that exist in the novel
+KNOWN_PLACES = [
+    "Akima", "Akima University", "Student Housing Block A", "Student Union", "Students Union",
+    "library", "south field", "north entrance", "gym", "server room", "commons",
+    "board room", "campus", "dorms", "woods",
+]
+
+# Capitalized words that are not names: openers, days, months, titles, network terms
+COMMON_CAPITALIZED = {
+    "i", "a", "an", "the", "this", "that", "these", "those", "we", "our", "you", "your", "they",
+    "he", "she", "it", "my", "his", "her", "their", "if", "when", "while", "but", "and", "or",
+    "so", "then", "now", "no", "not", "yes", "just", "still", "what", "why", "how", "who",
+    "where", "there", "here", "every", "everyone", "some", "all", "one", "two", "three",
+    "tonight", "today", "tomorrow", "yesterday", "monday", "tuesday", "wednesday", "thursday",
+    "friday", "saturday", "sunday", "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december", "am", "pm", "ok",
+    "board", "committee", "security", "network", "update", "urgent", "breaking", "note",
+    "location", "encryption", "image", "post", "dean", "professor", "president", "dr",
+    "mr", "ms", "mrs", "university", "campus", "lan", "mesh", "storm", "treasurer",
+}
+
+NAME_RUN_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:[ '-][A-Z][a-z]+)*\b")
+SENTENCE_START_PATTERN = re.compile(r"(?:^|[.!?:\n]\s*|[\"“(]\s*)$")
+HASHTAG_PATTERN = re.compile(r"#(\w{4,})")
+EMOJI_PATTERN = re.compile(r"[^\w\s'&:-]")
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher: one pass over the text finds every pattern."""
+
+    def __init__(self, case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, object]]] = [[]]  # (pattern length, payload)
+        self._built = False
+
+    def add(self, pattern: str, payload: object):
+        if not pattern:
+            return
+        if not self.case_sensitive:
+            pattern = pattern.lower()
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append((len(pattern), payload))
+        self._built = False
+
+    def build(self):
+        """Compute failure links breadth-first and merge output sets."""
+        queue = deque(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+        self._built = True
+        return self
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """Yield (start, end, payload) for every pattern occurrence."""
+        if not self._built:
+            self.build()
+        if not self.case_sensitive:
+            text = text.lower()
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, payload in self._outputs[node]:
+                yield index + 1 - length, index + 1, payload
+
+
+def is_word_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not (before.isalnum() or before == "_") and not (after.isalnum() or after == "_")
+
+
+def event_keywords(event: StoryEvent) -> List[str]:
+    """Phrases that identify an event: its hashtags and its (emoji-free) title."""
+    keywords = ["#" + tag for tag in HASHTAG_PATTERN.findall(event.summary)]
+    title = " ".join(EMOJI_PATTERN.sub(" ", event.title).split())
+    if len(title.split()) >= 3:
+        keywords.append(title)
+    return keywords
+
+
+def title_words(title: str) -> List[str]:
+    """Capitalized words of an event or scene title, emoji and punctuation stripped."""
+    return [word for word in re.findall(r"[A-Za-z]+", title) if word[0].isupper()]
+
+
+def post_story_time(post: Post) -> Optional[datetime]:
+    """The story time a post was written at: the as_of it was generated for, else its timestamp."""
+    as_of = (post.metadata or {}).get("as_of")
+    if as_of:
+        return datetime.fromisoformat(as_of)
+    try:
+        return datetime.strptime(post.timestamp, "%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return None
+
+
+class ContinuityChecker:
+    """Flags unknown entities and anachronistic event references in posts."""
+
+    def __init__(
+        self,
+        characters: Dict[str, Dict],
+        timeline: Optional[StoryTimeline] = None,
+        extra_names: Iterable[str] = (),
+        places: Iterable[str] = KNOWN_PLACES,
+        event_terms: Optional[Dict[str, List[str]]] = None  # event_id -> extra keywords
+    ):
+        self.timeline = timeline or StoryTimeline()
+        self.automaton = AhoCorasick()
+
+        names = set(extra_names)
+        for name, data in characters.items():
+            names.add(name)
+            names.update(data.get("connections") or [])
+        for event in self.timeline.events:
+            names.add(event.author)
+            names.update(event.characters)
+            names.update(MENTION_PATTERN.findall(event.summary))
+            names.update(NAME_RUN_PATTERN.findall(event.summary))
+
+        for name in names:
+            self._add_entity(name, ("name", name))
+            for part in name.split():
+                self._add_entity(part, ("name", name))
+        for place in places:
+            self._add_entity(place, ("place", place))
+        for event in self.timeline.events:
+            for part in title_words(event.title):
+                self._add_entity(part, ("title", event.title))
+
+        event_terms = event_terms or {}
+        for position, event in enumerate(self.timeline.events):
+            for keyword in event_keywords(event) + event_terms.get(event.event_id, []):
+                self.automaton.add(keyword, ("event", position))
+
+        self.automaton.build()
+
+    def _add_entity(self, term: str, payload: Tuple[str, str]):
+        if len(term) >= 2:
+            self.automaton.add(term, payload)
+
+    def check_post(self, post: Post) -> Dict:
+        """Scan one post, write post.metadata['continuity'] and return it."""
+        text = post.content
+        story_time = post_story_time(post)
+        known_events = None
+        if story_time is not None:
+            known_events = {id(e) for e in self.timeline.events_before(story_time, post.character_name)}
+
+        known = bytearray(len(text))  # 1 where a known name/place/event was matched
+        anachronisms = {}
+        for start, end, (kind, value) in self.automaton.finditer(text):
+            if not (is_word_boundary(text, start, end) or text[start] == "#"):
+                continue
+            known[start:end] = b"\x01" * (end - start)
+            if kind != "event":
+                continue
+
+            event = self.timeline.events[value]
+            if story_time is None or id(event) in known_events:
+                continue
+            reason = "happens later" if event.when >= story_time else "not known to this character yet"
+            anachronisms[event.event_id] = {
+                "event": event.event_id,
+                "matched": text[start:end],
+                "event_time": event.when.isoformat(),
+                "reason": reason,
+            }
+
+        # The post's own scene title ("Emergency Board Meeting - ...") is in-world, not an invented name
+        scene_words = {word.lower() for word in title_words((post.metadata or {}).get("scene") or "")}
+
+        def is_unknown(match: re.Match, token: re.Match) -> bool:
+            return (token.group().lower() not in COMMON_CAPITALIZED | scene_words
+                    and not all(known[match.start() + token.start():match.start() + token.end()]))
+
+        unknown = []
+        for match in NAME_RUN_PATTERN.finditer(text):
+            tokens = list(re.finditer(r"[A-Za-z]+", match.group()))
+            # A capitalized word opening a sentence is usually not a name ("Heard Kamea"),
+            # so only the rest of the run decides; a flagged run is still reported whole
+            if SENTENCE_START_PATTERN.search(text[max(match.start() - 3, 0):match.start()]):
+                tokens = tokens[1:]
+            if not any(is_unknown(match, t) for t in tokens):
+                continue
+            if match.group() not in unknown:
+                unknown.append(match.group())
+
+        result = {
+            "unknown_entities": unknown,
+            "anachronisms": list(anachronisms.values()),
+            "story_time": story_time.isoformat() if story_time else None,
+            "ok": not unknown and not anachronisms,
+        }
+        if post.metadata is None:
+            post.metadata = {}
+        post.metadata["continuity"] = result
+        return result
+
+    def check_posts(self, posts: List[Post]) -> List[Dict]:
+        return [self.check_post(post) for post in posts]
+
+    @staticmethod
+    def print_report(posts: List[Post]):
+        flagged = [p for p in posts if not (p.metadata or {}).get("continuity", {}).get("ok", True)]
+        print(f"\nContinuity: {len(posts) - len(flagged)} clean | {len(flagged)} flagged")
+        for post in flagged:
+            continuity = post.metadata["continuity"]
+            print(f"  ⚠ {post.character_name:10} {post.post_type:10} {post.post_id}")
+            if continuity["unknown_entities"]:
+                print(f"      unknown: {', '.join(continuity['unknown_entities'])}")
+            for item in continuity["anachronisms"]:
+                print(f"      anachronism: '{item['matched']}' → {item['event']} ({item['reason']})")
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.continuity_checker
+    import json
+    from utils.quality_scorer import load_draft_posts
+
+    with open("./data/character_codex.json") as f:
+        codex = json.load(f)
+    checker = ContinuityChecker(codex["characters"], StoryTimeline.load())
+    posts = load_draft_posts()
+    checker.check_posts(posts)
+    checker.print_report(posts)
@@ -0,0 +1,499 @@
+"""
+Cross-post fact reconciliation for posts about the same scene.
+
+Characters generated in parallel each improvise the concrete details of a
+scene, so one post counts eleven people under the tarp and another
+forty-three. FactIndex extracts claims from every post and files them by
+scene and slot:
+
+- count: a number attached to a population noun ("eleven people",
+  "Three families", "three of them are kids")
+- time: a clock time attached to a scene event ("Meeting adjourned 19:32",
+  "Kamea showed up at 19:15")
+- name / role: who holds a role ("Robert Chen, our treasurer", "Dean
+  Morrison"), filed as role -> name for single-holder roles and as
+  person -> role for everyone
+
+Claims in one slot are clustered by value ("Robert" and "Robert Chen"
+agree). The cluster backed by the most posts is the agreed fact; a scene
+file's "facts" override it, and ties go to the earliest post, since that is
+the one readers see first. Only the posts outside the agreed cluster are
+regenerated, with the agreed facts injected into their scenario.
+
+Usage (from the repo root):
+    python -m utils.fact_reconciliation            # report conflicts in saved drafts
+"""
+
+import re
+import json
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from agents.base.character_agent import POST_SPECS, CharacterAgent, Post
+from utils.continuity_checker import COMMON_CAPITALIZED, post_story_time
+
+UNITS = {
+    "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+NUMBER = (
+    rf"(?:\d{{1,4}}|a dozen|(?:{'|'.join(TENS)})(?:[- ](?:one|{'|'.join(list(UNITS)[:8])}))?"
+    rf"|{'|'.join(sorted(UNITS, key=len, reverse=True))})"
+)
+
+# Population nouns and the slot they count; durations are left out on purpose
+# ("two hours" is usually one character's own wait, not a scene fact)
+COUNT_NOUNS = {
+    "people": "people", "persons": "people", "refugees": "people",
+    "families": "families",
+    "kids": "children", "children": "children",
+    "tents": "tents", "tarps": "tarps",
+    "students": "students", "volunteers": "volunteers",
+    "guards": "guards", "officers": "guards",
+}
+FILLER_STOPWORDS = {"of", "and", "or", "the", "a", "an", "in", "on", "to", "for", "from", "at", "with", "by", "more"}
+
+COUNT_PATTERN = re.compile(
+    rf"\b(?P<number>{NUMBER})(?:\s+(?P<filler>[a-z]+))?\s+(?P<noun>{'|'.join(COUNT_NOUNS)})\b", re.IGNORECASE)
+OF_THEM_PATTERN = re.compile(
+    rf"\b(?P<number>{NUMBER}) of (?:them|those) (?:are|were) (?P<noun>{'|'.join(COUNT_NOUNS)})\b", re.IGNORECASE)
+
+TIME_PATTERN = re.compile(
+    r"\b(?:(?P<hour>[01]?\d|2[0-3]):(?P<minute>[0-5]\d)(?:\s*(?P<meridiem>[ap])\.?m\b\.?)?"
+    r"|(?P<hour12>1[0-2]|[1-9])\s*(?P<meridiem12>[ap])\.?m\b\.?)",
+    re.IGNORECASE
+)
+MEETING_PATTERN = re.compile(r"\b(?:meeting|session|hearing)\b", re.IGNORECASE)
+# (pattern, slot, whether the slot belongs to the person doing it, what else the sentence must mention)
+TIME_EVENTS = [
+    (re.compile(r"\b(?:adjourned|called to order|convened)\b", re.IGNORECASE), None, False, None),
+    (re.compile(r"\b(?:ended|wrapped up|broke up)\b", re.IGNORECASE), "meeting ended", False, MEETING_PATTERN),
+    (re.compile(r"\b(?:started|began)\b", re.IGNORECASE), "meeting started", False, MEETING_PATTERN),
+    (re.compile(r"\b(?:showed up|walked in|arrived|came in|burst in)\b", re.IGNORECASE), "arrived", True, None),
+    (re.compile(r"\bcurfew\b", re.IGNORECASE), "curfew", False, None),
+    (re.compile(r"\b(?:power|lights) (?:went|cut) out\b", re.IGNORECASE), "power out", False, None),
+]
+MEETING_VERBS = {"adjourned": "meeting ended", "called to order": "meeting started", "convened": "meeting started"}
+
+ROLES = {
+    "treasurer": "treasurer", "dean": "dean", "provost": "provost",
+    "president": "president", "chancellor": "chancellor", "professor": "professor", "prof.": "professor",
+    "security chief": "security chief", "chief of security": "security chief", "head of security": "security chief",
+}
+# "<Name> from the <office>"
+OFFICES = {"treasury": "treasurer", "provost's office": "provost", "dean's office": "dean"}
+# Roles with one holder, so two different names for them is a contradiction
+SINGLE_HOLDER_ROLES = {"treasurer", "dean", "provost", "president", "chancellor", "security chief"}
+
+NAME = r"[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?"
+ROLE = "|".join(re.escape(r) for r in sorted(ROLES, key=len, reverse=True))
+TITLE_PATTERN = re.compile(rf"\b(?P<role>(?i:{ROLE}))\s+(?P<name>{NAME})")
+APPOSITIVE_PATTERN = re.compile(
+    rf"\b(?P<name>{NAME})\s*(?:,|\(|—|–|-)\s*(?:(?:our|the|board|university)\s+)?(?P<role>{ROLE})\b")
+FROM_PATTERN = re.compile(rf"\b(?P<name>{NAME}) from (?:the )?(?P<role>treasury|provost['’]s office|dean['’]s office)\b")
+
+NAME_RUN_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b")
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+(?:[.!?]+|$)")
+SCENE_LINE_PATTERN = re.compile(r"SCENE:\s*(.+)")
+
+
+@dataclass
+class Claim:
+    """One concrete detail a post asserts about its scene."""
+    kind: str      # "count" | "time" | "name" | "role"
+    slot: str      # what it is about: "families", "meeting ended", "treasurer", "Morrison"
+    value: object  # int for counts, "HH:MM" for times, a name or role otherwise
+    text: str      # the matched span
+    post_id: str
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.kind, self.slot
+
+
+def same_value(kind: str, a, b) -> bool:
+    """Whether two claim values agree; a partial name agrees with the full one."""
+    if kind == "name":
+        a_tokens, b_tokens = set(a.split()), set(b.split())
+        return a_tokens <= b_tokens or b_tokens <= a_tokens
+    return a == b
+
+
+@dataclass
+class Conflict:
+    """Disagreeing claims in one slot of one scene, and which value wins."""
+    scene: str
+    kind: str
+    slot: str
+    clusters: List[Dict]   # [{"value", "post_ids", "texts"}], agreed cluster first
+    agreed: object
+    resolved_by: str       # "canon" | "majority" | "first_post"
+    minority: List[str] = field(default_factory=list)
+
+    @property
+    def fact(self) -> str:
+        """The agreed fact as a line for the regeneration prompt."""
+        others = [str(c["value"]) for c in self.clusters if not same_value(self.kind, c["value"], self.agreed)]
+        if self.kind == "count":
+            return f"Number of {self.slot}: {self.agreed} (not {' or '.join(others)})"
+        if self.kind == "time":
+            return f"Time {self.slot}: {self.agreed} (not {' or '.join(others)})"
+        if self.kind == "name":
+            return f"The {self.slot} is {self.agreed} (not {' or '.join(others)})"
+        return f"{self.slot} is the {self.agreed} (not the {' or the '.join(others)})"
+
+    @property
+    def needs_canon(self) -> bool:
+        """A tie the vote cannot settle: reported, but nothing is regenerated until the scene pins the fact."""
+        return self.resolved_by == "first_post"
+
+    def agrees(self, claim: Claim) -> bool:
+        return claim.key != (self.kind, self.slot) or same_value(self.kind, claim.value, self.agreed)
+
+    def to_dict(self) -> Dict:
+        return {"scene": self.scene, "kind": self.kind, "slot": self.slot, "agreed": self.agreed,
+                "resolved_by": self.resolved_by, "clusters": self.clusters, "minority": self.minority}
+
+
+def parse_number(text: str) -> int:
+    text = text.lower()
+    if text.isdigit():
+        return int(text)
+    if text == "a dozen":
+        return 12
+    parts = re.split(r"[- ]", text)
+    if parts[0] not in TENS:
+        return UNITS[parts[0]]
+    return TENS[parts[0]] + ({"one": 1, **UNITS}.get(parts[1], 0) if len(parts) > 1 else 0)
+
+
+def parse_clock(match: re.Match) -> str:
+    if match.group("hour12"):
+        hour, minute, meridiem = int(match.group("hour12")), 0, match.group("meridiem12")
+    else:
+        hour, minute, meridiem = int(match.group("hour")), int(match.group("minute")), match.group("meridiem")
+    if meridiem and meridiem.lower() == "p" and hour < 12:
+        hour += 12
+    elif meridiem and meridiem.lower() == "a" and hour == 12:
+        hour = 0
+    return f"{hour:02d}:{minute:02d}"
+
+
+def clean_name(name: str) -> Optional[str]:
+    """Drop leading sentence words ("Then Robert" -> "Robert"); None if nothing name-like is left."""
+    tokens = name.split()
+    while tokens and tokens[0].lower() in COMMON_CAPITALIZED | set(ROLES):
+        tokens.pop(0)
+    return " ".join(tokens) or None
+
+
+def scene_of(post: Post) -> Optional[str]:
+    """The scene a post belongs to: its metadata scene, else the SCENE: line of its scenario."""
+    metadata = post.metadata or {}
+    if metadata.get("scene"):
+        return metadata["scene"]
+    match = SCENE_LINE_PATTERN.search(metadata.get("scenario") or "")
+    return match.group(1).strip() if match else None
+
+
+def _subject(sentence: str, before: int, author: str) -> Optional[str]:
+    """The person doing something in a sentence: the last name before `before` ("I" is the author)."""
+    subject = None
+    for match in NAME_RUN_PATTERN.finditer(sentence[:before]):
+        subject = clean_name(match.group()) or subject
+    if re.search(r"\bI\b", sentence[:before]) and subject is None:
+        subject = author
+    return subject.split()[0] if subject else None
+
+
+def extract_claims(post: Post) -> List[Claim]:
+    """Every count, time and name/role claim in a post (duplicates within the post removed)."""
+    text = post.content
+    claims: Dict[Tuple, Claim] = {}
+
+    def add(kind: str, slot: str, value, span: str):
+        claims.setdefault((kind, slot, value), Claim(kind, slot, value, span, post.post_id))
+
+    for match in COUNT_PATTERN.finditer(text):
+        filler = (match.group("filler") or "").lower()
+        if filler in FILLER_STOPWORDS or filler in COUNT_NOUNS:
+            continue
+        add("count", COUNT_NOUNS[match.group("noun").lower()], parse_number(match.group("number")), match.group())
+    for match in OF_THEM_PATTERN.finditer(text):
+        add("count", COUNT_NOUNS[match.group("noun").lower()], parse_number(match.group("number")), match.group())
+
+    for sentence in SENTENCE_PATTERN.finditer(text):
+        sentence = sentence.group()
+        events = [(m.start(), slot or MEETING_VERBS[m.group().lower()], personal)
+                  for pattern, slot, personal, context in TIME_EVENTS
+                  if context is None or context.search(sentence)
+                  for m in pattern.finditer(sentence)]
+        if not events:
+            continue
+        for match in TIME_PATTERN.finditer(sentence):
+            position, slot, personal = min(events, key=lambda e: abs(e[0] - match.start()))
+            if personal:
+                subject = _subject(sentence, position, post.character_name)
+                if subject is None:
+                    continue
+                slot = f"{subject} {slot}"
+            add("time", slot, parse_clock(match), sentence.strip())
+
+    for pattern in (TITLE_PATTERN, APPOSITIVE_PATTERN, FROM_PATTERN):
+        for match in pattern.finditer(text):
+            name = clean_name(match.group("name"))
+            if not name:
+                continue
+            surface = match.group("role").lower().replace("’", "'")
+            role = ROLES[surface] if surface in ROLES else OFFICES[surface]
+            if role in SINGLE_HOLDER_ROLES:
+                add("name", role, name, match.group())
+            add("role", name, role, match.group())
+
+    return list(claims.values())
+
+
+def _post_order(post: Post) -> Tuple:
+    """Reader order: story time, then post type (social goes out before the blog)."""
+    specs = list(POST_SPECS)
+    return (post_story_time(post) or datetime.max,
+            specs.index(post.post_type) if post.post_type in specs else len(specs), post.post_id)
+
+
+def _canon_value(kind: str, value):
+    if kind == "count":
+        return value if isinstance(value, int) else parse_number(str(value))
+    if kind == "time":
+        match = TIME_PATTERN.fullmatch(str(value).strip())
+        return parse_clock(match) if match else value
+    return value
+
+
+class FactIndex:
+    """Claims from every indexed post, by scene and (kind, slot)."""
+
+    def __init__(self):
+        self.posts: Dict[str, Post] = {}
+        self.scenes: Dict[str, str] = {}  # post_id -> scene
+        self.claims: Dict[str, Dict[Tuple[str, str], List[Claim]]] = {}
+
+    def add_post(self, post: Post) -> List[Claim]:
+        """Index one post's claims (posts without a scene are skipped)."""
+        scene = scene_of(post)
+        if scene is None or post.post_id in self.posts:
+            return []
+        self.posts[post.post_id] = post
+        self.scenes[post.post_id] = scene
+        claims = extract_claims(post)
+        slots = self.claims.setdefault(scene, {})
+        for claim in claims:
+            slots.setdefault(claim.key, []).append(claim)
+        return claims
+
+    def add_posts(self, posts: Iterable[Post]) -> int:
+        return sum(len(self.add_post(post)) for post in posts)
+
+    def remove_post(self, post_id: str):
+        scene = self.scenes.pop(post_id, None)
+        self.posts.pop(post_id, None)
+        if scene is None:
+            return
+        for key, claims in list(self.claims[scene].items()):
+            claims[:] = [c for c in claims if c.post_id != post_id]
+            if not claims:
+                del self.claims[scene][key]
+
+    def replace(self, old: Post, new: Post):
+        self.remove_post(old.post_id)
+        self.add_post(new)
+
+    def conflicts(self, scene: Optional[str] = None, canon: Optional[Dict[str, Dict]] = None) -> List[Conflict]:
+        """
+        Cluster each slot's claims and pick the agreed value.
+
+        Args:
+            scene: Only this scene (default: all)
+            canon: {scene: {slot: value}} facts that win regardless of votes (scene-file "facts")
+
+        Returns:
+            Conflicts with more than one value cluster, in scene order
+        """
+        conflicts = []
+        for scene_id in ([scene] if scene else sorted(self.claims)):
+            scene_canon = {k.lower(): v for k, v in ((canon or {}).get(scene_id) or {}).items()}
+            for (kind, slot), claims in sorted(self.claims.get(scene_id, {}).items()):
+                conflict = self._resolve(scene_id, kind, slot, claims, scene_canon.get(slot.lower()))
+                if conflict:
+                    conflicts.append(conflict)
+        return conflicts
+
+    def _resolve(self, scene: str, kind: str, slot: str, claims: List[Claim], canon) -> Optional[Conflict]:
+        clusters: List[Dict] = []
+        for claim in sorted(claims, key=lambda c: -len(str(c.value))):  # full names first
+            cluster = next((c for c in clusters if same_value(kind, c["value"], claim.value)), None)
+            if cluster is None:
+                cluster = {"value": claim.value, "post_ids": [], "texts": []}
+                clusters.append(cluster)
+            if claim.post_id not in cluster["post_ids"]:
+                cluster["post_ids"].append(claim.post_id)
+            cluster["texts"].append(claim.text)
+        if len(clusters) < 2 and canon is None:
+            return None
+
+        def first_seen(cluster: Dict) -> Tuple:
+            return min(_post_order(self.posts[post_id]) for post_id in cluster["post_ids"])
+
+        clusters.sort(key=lambda c: (-len(c["post_ids"]), first_seen(c)))
+        if canon is not None:
+            agreed, resolved_by = _canon_value(kind, canon), "canon"
+            clusters.sort(key=lambda c: not same_value(kind, c["value"], agreed))
+        else:
+            agreed = clusters[0]["value"]
+            resolved_by = "majority" if len(clusters[0]["post_ids"]) > len(clusters[1]["post_ids"]) else "first_post"
+
+        minority = []
+        for cluster in clusters:
+            if not same_value(kind, cluster["value"], agreed):
+                minority += [p for p in cluster["post_ids"] if p not in minority]
+        if not minority:
+            return None
+        return Conflict(scene, kind, slot, clusters, agreed, resolved_by, minority)
+
+    def print_report(self, conflicts: List[Conflict]):
+        minority = {post_id for c in conflicts if not c.needs_canon for post_id in c.minority}
+        ties = sum(1 for c in conflicts if c.needs_canon)
+        print(f"\nFacts: {len(self.posts)} posts in {len(self.claims)} scenes | "
+              f"{len(conflicts)} conflicts ({ties} ties) | {len(minority)} posts to regenerate")
+        for conflict in conflicts:
+            if conflict.needs_canon:
+                print(f"  ⏸ {conflict.scene[:40]:40} {conflict.kind:5} {conflict.slot}: "
+                      f"tie, pin it in the scene's \"facts\" to reconcile")
+            else:
+                print(f"  ⚠ {conflict.scene[:40]:40} {conflict.kind:5} {conflict.slot}: "
+                      f"{conflict.agreed} ({conflict.resolved_by})")
+            for cluster in conflict.clusters:
+                authors = ", ".join(f"{self.posts[p].character_name}/{self.posts[p].post_type}"
+                                    for p in cluster["post_ids"])
+                mark = "✓" if same_value(conflict.kind, cluster["value"], conflict.agreed) else "✗"
+                if conflict.needs_canon:
+                    mark = "·"
+                print(f"      {mark} {cluster['value']!s:14} {authors}")
+
+
+def facts_block(conflicts: List[Conflict]) -> str:
+    lines = "\n".join(f"- {conflict.fact}" for conflict in conflicts)
+    return f"""ESTABLISHED FACTS (other posts about this scene already state these; your post must agree):
+{lines}"""
+
+
+def reconcile(
+    index: FactIndex,
+    conflicts: List[Conflict],
+    agent_for: Callable[[str], Optional[CharacterAgent]],
+    max_attempts: int = 2,
+    max_posts: Optional[int] = None
+) -> List[Tuple[Post, Post]]:
+    """
+    Regenerate the minority posts of each conflict with the agreed facts injected.
+
+    A regenerated post replaces the original only if none of its own claims
+    contradict the agreed facts; otherwise the original is kept. Ties
+    (needs_canon) are skipped: a 1-1-1 split has no agreed value to inject.
+
+    Args:
+        index: FactIndex the conflicts came from (updated with replacements)
+        conflicts: From index.conflicts()
+        agent_for: Character name -> CharacterAgent (None skips that character's posts)
+        max_attempts: Regenerations per post before keeping the original
+        max_posts: Cap on posts regenerated (None = all minority posts)
+
+    Returns:
+        (original, replacement) pairs
+    """
+    by_post: Dict[str, List[Conflict]] = {}
+    for conflict in conflicts:
+        if conflict.needs_canon:
+            continue
+        for post_id in conflict.minority:
+            by_post.setdefault(post_id, []).append(conflict)
+    targets = sorted(by_post, key=lambda p: _post_order(index.posts[p]))[:max_posts]
+
+    replaced = []
+    for post_id in targets:
+        post, post_conflicts = index.posts[post_id], by_post[post_id]
+        metadata = post.metadata or {}
+        scenario = metadata.get("scenario")
+        if not scenario:
+            print(f"  ⚠ {post.character_name} ({post.post_type}): no scenario recorded, skipping")
+            continue
+        agent = agent_for(post.character_name)
+        if agent is None:
+            print(f"  ⚠ {post.character_name} ({post.post_type}): no agent for this character, skipping")
+            continue
+        as_of = datetime.fromisoformat(metadata["as_of"]) if metadata.get("as_of") else None
+        prompt = f"{scenario}\n\n{facts_block(post_conflicts)}"
+
+        replacement = None
+        for attempt in range(max_attempts):
+            candidate = agent.generate_post(
+                scenario=prompt, post_type=post.post_type, max_retries=2, as_of=as_of)
+            if candidate is None:
+                continue
+            wrong = [c for c in extract_claims(candidate) if not all(k.agrees(c) for k in post_conflicts)]
+            if not wrong:
+                replacement = candidate
+                break
+            print(f"  ↻ {post.character_name} ({post.post_type}) attempt {attempt + 1} still says: "
+                  f"{', '.join(c.text[:40] for c in wrong)}")
+        if replacement is None:
+            print(f"  ✗ {post.character_name} ({post.post_type}): kept original")
+            continue
+
+        replacement.metadata.update({
+            **{k: v for k, v in metadata.items() if k not in replacement.metadata},
+            "scenario": scenario,
+            "reconciled": {"replaces": post_id, "facts": [c.fact for c in post_conflicts]},
+        })
+        index.replace(post, replacement)
+        replaced.append((post, replacement))
+        print(f"  ✓ {post.character_name} ({post.post_type}) regenerated with "
+              f"{len(post_conflicts)} agreed fact{'s' if len(post_conflicts) != 1 else ''}")
+    return replaced
+
+
+def save_replacements(replaced: List[Tuple[Post, Post]], drafts_dir: str = "./content/drafts") -> List[str]:
+    """Swap replaced posts in place in the draft files that hold them; returns the files rewritten."""
+    by_id = {old.post_id: new for old, new in replaced}
+    files = []
+    for path in sorted(Path(drafts_dir).glob("*.json")):
+        with open(path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or "posts" not in data:
+            continue
+        changed = False
+        for i, record in enumerate(data["posts"]):
+            post = Post(**{k: v for k, v in record.items() if k in Post.__dataclass_fields__})
+            if post.post_id in by_id:
+                data["posts"][i] = by_id[post.post_id].to_dict()
+                changed = True
+        if changed:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2, default=str)
+            files.append(str(path))
+    return files
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.fact_reconciliation
+    from utils.quality_scorer import load_draft_posts
+
+    index = FactIndex()
+    index.add_posts(load_draft_posts())
+    index.print_report(index.conflicts())
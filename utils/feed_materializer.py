@@ -0,0 +1,341 @@
+"""
+Chronological campus LAN feed over every saved post.
+
+Posts live in per-character files under content/, so the in-world feed is
+materialized once instead of loading and sorting everything per request:
+
+1. Spill: each source file's posts are appended to one run file per
+   character ("<minute>\\t<post_id>\\t<state rank>\\t<board>\\t<encryption>\\t<json>"
+   lines).
+2. Sort: each character's run is sorted on its own (one character in
+   memory at a time).
+3. Merge: heapq.merge over the sorted runs (a k-way merge, in passes of at
+   most `fan_in` runs) streams one chronological feed.jsonl. A post saved
+   in several states (draft, then approved) is kept once, in its latest
+   state.
+
+Alongside feed.jsonl, feed.npz holds byte offsets, story minutes and
+board/encryption/state codes per line, plus per-board and per-encryption
+row indexes. Feed.query() bisects a time window in the chosen index and
+seeks only the lines on the requested page.
+
+Index files: ./data/indexes/feed.jsonl, ./data/indexes/feed.npz
+
+Usage (from the repo root):
+    python -m utils.feed_materializer             # rebuild if content changed, print feed stats
+"""
+
+import json
+import heapq
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.base.character_agent import Post
+from utils.continuity_checker import post_story_time
+from utils.search_index import STATE_RANK, STATES, posts_in_file
+
+FEED_STATES = ("draft", "approved", "published")
+RANK_STATES = {rank: state for state, rank in STATE_RANK.items()}
+STORY_EPOCH = datetime(1970, 1, 1)
+
+
+def story_minute(post: Post) -> Optional[int]:
+    story_time = post_story_time(post)
+    return None if story_time is None else int((story_time - STORY_EPOCH).total_seconds() // 60)
+
+
+def board_of(location: Optional[str]) -> str:
+    """Board name from a post location ("campus.lan/boards/resistance" or "resistance")."""
+    return (location or "general").rstrip("/").rsplit("/", 1)[-1] or "general"
+
+
+def _merge(runs: Sequence[Path], output: Path):
+    files = [open(run) for run in runs]
+    try:
+        with open(output, "w") as out:
+            out.writelines(heapq.merge(*files))  # fixed-width minute prefix: line order is time order
+    finally:
+        for f in files:
+            f.close()
+
+
+@dataclass
+class FeedPage:
+    """One page of a feed query."""
+    posts: List[Post]
+    states: List[str]
+    total: int                    # posts in the filtered window
+    next_cursor: Optional[int]    # pass back as `cursor` for the next page (None = last page)
+
+
+class FeedMaterializer:
+    """Builds feed.jsonl + feed.npz from content/ by a per-character k-way merge."""
+
+    def __init__(
+        self,
+        content_dir: str = "./content",
+        index_dir: str = "./data/indexes",
+        states: Iterable[str] = FEED_STATES,
+        fan_in: int = 256
+    ):
+        self.content_dir = Path(content_dir)
+        self.feed_path = Path(index_dir) / "feed.jsonl"
+        self.index_path = Path(index_dir) / "feed.npz"
+        self.states = tuple(states)
+        self.fan_in = fan_in
+
+    def sources(self) -> Dict[str, float]:
+        """{path: mtime} of every saved post file (rejected ones too, so a rejection hides the draft)."""
+        return {
+            str(path): path.stat().st_mtime
+            for subdir in STATES for path in sorted((self.content_dir / subdir).glob("**/*.json"))
+        }
+
+    def is_current(self, sources: Optional[Dict[str, float]] = None) -> bool:
+        if not (self.index_path.exists() and self.feed_path.exists()):
+            return False
+        with np.load(self.index_path) as data:
+            built = json.loads(str(data["sources"]))
+            built_states = [str(s) for s in data["feed_states"]]
+        return built == (sources or self.sources()) and built_states == list(self.states)
+
+    def build(self, force: bool = False) -> Optional[Dict]:
+        """
+        Rebuild the feed if any source file changed.
+
+        Args:
+            force: Rebuild even if the sources are unchanged
+
+        Returns:
+            Build stats, or None if the feed was already current
+        """
+        sources = self.sources()
+        if not force and self.is_current(sources):
+            return None
+        self.feed_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix="feed_", dir=self.feed_path.parent) as tmp:
+            tmp = Path(tmp)
+            runs, skipped = self._spill(sources, tmp)
+            for run in runs:
+                with open(run) as f:
+                    lines = f.readlines()
+                lines.sort()
+                with open(run, "w") as f:
+                    f.writelines(lines)
+            merged = self._merge_all(runs, tmp)
+            stats = self._write_feed(merged, sources)
+        stats.update(characters=len(runs), skipped_untimed=skipped)
+        return stats
+
+    def _spill(self, sources: Dict[str, float], tmp: Path) -> Tuple[List[Path], int]:
+        """Append every post to its character's run file; returns (runs, posts without a story time)."""
+        runs: Dict[str, Path] = {}
+        skipped = 0
+        for path in sources:
+            state = STATES[Path(path).relative_to(self.content_dir).parts[0]]
+            by_character: Dict[str, List[str]] = {}
+            for post in posts_in_file(Path(path)):
+                minute = story_minute(post)
+                if minute is None:
+                    skipped += 1
+                    continue
+                line = json.dumps(vars(post), default=str)  # Post is flat: same dict as to_dict(), no deep copy
+                board = board_of(post.location).replace("\t", " ")
+                encryption = (post.encryption or "public").lower().replace("\t", " ")
+                by_character.setdefault(post.character_name, []).append(
+                    f"{minute:012d}\t{post.post_id}\t{STATE_RANK[state]}\t{board}\t{encryption}\t{line}\n")
+            for character, lines in by_character.items():
+                run = runs.setdefault(character, tmp / f"run_{len(runs):06d}.txt")
+                with open(run, "a") as f:
+                    f.writelines(lines)
+        return list(runs.values()), skipped
+
+    def _merge_all(self, runs: List[Path], tmp: Path) -> Path:
+        """Merge sorted runs in passes of at most fan_in files; returns the single merged run."""
+        generation = 0
+        while len(runs) > 1 or not runs:
+            if not runs:
+                empty = tmp / "empty.txt"
+                empty.touch()
+                return empty
+            merged = []
+            for start in range(0, len(runs), self.fan_in):
+                output = tmp / f"merge_{generation}_{start // self.fan_in:06d}.txt"
+                _merge(runs[start:start + self.fan_in], output)
+                merged.append(output)
+            runs = merged
+            generation += 1
+        return runs[0]
+
+    def _write_feed(self, merged: Path, sources: Dict[str, float]) -> Dict:
+        """Stream the merged run into feed.jsonl, keeping each post once, and save the indexes."""
+        offsets, minutes, boards, encryptions, states, post_ids = [0], [], [], [], [], []
+        board_codes: Dict[str, int] = {}
+        encryption_codes: Dict[str, int] = {}
+        duplicates = 0
+
+        def groups() -> Iterator[List[str]]:
+            """[minute, post_id, rank, board, encryption, json] per post: the last line of each duplicate run has the top rank."""
+            nonlocal duplicates
+            previous = None
+            with open(merged) as f:
+                for line in f:
+                    fields = line.rstrip("\n").split("\t", 5)
+                    if previous and previous[:2] == fields[:2]:
+                        duplicates += 1
+                    elif previous:
+                        yield previous
+                    previous = fields
+            if previous:
+                yield previous
+
+        tmp_feed = self.feed_path.with_suffix(".jsonl.tmp")
+        with open(tmp_feed, "wb") as out:
+            for minute, post_id, rank, board, encryption, line in groups():
+                state = RANK_STATES[int(rank)]
+                if state not in self.states:
+                    continue
+                data = line.encode() + b"\n"
+                out.write(data)
+                offsets.append(offsets[-1] + len(data))
+                minutes.append(int(minute))
+                post_ids.append(post_id)
+                states.append(STATE_RANK[state])
+                boards.append(board_codes.setdefault(board, len(board_codes)))
+                encryptions.append(encryption_codes.setdefault(encryption, len(encryption_codes)))
+        tmp_feed.replace(self.feed_path)
+
+        board_array = np.array(boards, dtype=np.int32)
+        encryption_array = np.array(encryptions, dtype=np.int32)
+        row_indexes = {f"board_{code}": np.flatnonzero(board_array == code).astype(np.int32)
+                       for code in board_codes.values()}
+        row_indexes.update({f"encryption_{code}": np.flatnonzero(encryption_array == code).astype(np.int32)
+                            for code in encryption_codes.values()})
+        np.savez(
+            self.index_path,
+            offsets=np.array(offsets, dtype=np.int64),
+            minutes=np.array(minutes, dtype=np.int64),
+            post_ids=np.array(post_ids, dtype=str),
+            states=np.array(states, dtype=np.int8),
+            boards=board_array,
+            encryptions=encryption_array,
+            board_names=np.array(list(board_codes), dtype=str),
+            encryption_names=np.array(list(encryption_codes), dtype=str),
+            feed_states=np.array(self.states, dtype=str),
+            sources=np.array(json.dumps(sources)),
+            **row_indexes
+        )
+        return {"posts": len(minutes), "duplicates": duplicates, "boards": len(board_codes),
+                "bytes": offsets[-1]}
+
+
+class Feed:
+    """Paginated, time-windowed reads from a materialized feed."""
+
+    def __init__(self, index_dir: str = "./data/indexes"):
+        self.feed_path = Path(index_dir) / "feed.jsonl"
+        self._index = np.load(Path(index_dir) / "feed.npz")
+        self.offsets = self._index["offsets"]
+        self.minutes = self._index["minutes"]
+        self.states = self._index["states"]
+        self.board_names = [str(b) for b in self._index["board_names"]]
+        self.encryption_names = [str(e) for e in self._index["encryption_names"]]
+        self._rows: Dict[str, np.ndarray] = {}
+        self._file = open(self.feed_path, "rb")
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def _index_rows(self, kind: str, names: List[str], value: str) -> np.ndarray:
+        """Rows of one board or encryption level (loaded from feed.npz on first use)."""
+        key = f"{kind}_{names.index(value)}" if value in names else None
+        if key is None:
+            return np.zeros(0, dtype=np.int32)
+        if key not in self._rows:
+            self._rows[key] = self._index[key]
+        return self._rows[key]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Posts per board and per encryption level."""
+        return {
+            "board": {name: len(self._index_rows("board", self.board_names, name)) for name in self.board_names},
+            "encryption": {name: len(self._index_rows("encryption", self.encryption_names, name))
+                           for name in self.encryption_names},
+        }
+
+    def _read(self, row: int) -> Post:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        self._file.seek(start)
+        record = json.loads(self._file.read(end - start))
+        return Post(**{k: v for k, v in record.items() if k in Post.__dataclass_fields__})
+
+    def query(
+        self,
+        board: Optional[str] = None,
+        encryption: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        states: Optional[Iterable[str]] = None,
+        limit: int = 20,
+        cursor: int = 0,
+        newest_first: bool = False
+    ) -> FeedPage:
+        """
+        One page of the feed, filtered by board, encryption level, state and story-time window.
+
+        Args:
+            board: Board name ("general", "resistance", ...)
+            encryption: "public" | "encrypted" | "partial"
+            start: Window start (inclusive)
+            end: Window end (exclusive)
+            states: Approval states to include (default: all in the feed)
+            limit: Page size
+            cursor: Position in the filtered window (from the previous page's next_cursor)
+            newest_first: Reverse-chronological order
+
+        Returns:
+            FeedPage
+        """
+        rows: Optional[np.ndarray] = None
+        if board is not None:
+            rows = self._index_rows("board", self.board_names, board)
+        if encryption is not None:
+            level_rows = self._index_rows("encryption", self.encryption_names, encryption)
+            rows = level_rows if rows is None else np.intersect1d(rows, level_rows, assume_unique=True)
+        if states is not None:
+            codes = [STATE_RANK[s] for s in states]
+            rows = np.flatnonzero(np.isin(self.states, codes)) if rows is None else \
+                rows[np.isin(self.states[rows], codes)]
+
+        times = self.minutes if rows is None else self.minutes[rows]
+        lo = int(np.searchsorted(times, (start - STORY_EPOCH).total_seconds() // 60, "left")) if start else 0
+        hi = int(np.searchsorted(times, (end - STORY_EPOCH).total_seconds() // 60, "left")) if end else len(times)
+        window = range(lo, max(lo, hi)) if rows is None else rows[lo:max(lo, hi)]
+        if newest_first:
+            window = window[::-1]
+
+        page = window[cursor:cursor + limit]
+        posts = [self._read(int(row)) for row in page]
+        next_cursor = cursor + limit if cursor + limit < len(window) else None
+        return FeedPage(posts, [RANK_STATES[int(self.states[row])] for row in page], len(window), next_cursor)
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.feed_materializer
+    stats = FeedMaterializer().build()
+    print(f"✓ Rebuilt feed: {stats}" if stats else "✓ Feed is current")
+    feed = Feed()
+    print(f"{len(feed)} posts | boards: {feed.counts()['board']} | encryption: {feed.counts()['encryption']}")
+    for post in feed.query(limit=5).posts:
+        print(f"  {post.timestamp}  {board_of(post.location):12} {post.encryption:9} {post.character_name}")
+    feed.close()
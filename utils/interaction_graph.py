@@ -0,0 +1,230 @@
+"""
+Character interaction graph built from mentions in generated posts.
+
+Every post adds its author's mentions of other characters ("@Kamea", "Randy")
+to a sparse character x character count matrix for its (scene, day) bucket.
+Posts are indexed once, by post_id, so updating after a run only touches the
+new posts. Summing the buckets in a window answers questions like "who has
+Kamea not interacted with this week" without rescanning the corpus.
+
+Index file: ./data/indexes/interactions.npz (bucket triplets + names + ids)
+"""
+
+import json
+from pathlib import Path
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from agents.base.character_agent import Post
+from utils.continuity_checker import AhoCorasick, is_word_boundary, post_story_time
+
+Bucket = Tuple[str, str]  # (scene, ISO day)
+UNSCENED = "-"
+
+
+class InteractionGraph:
+    """
+    Incremental mention index: one sparse matrix per (scene, day) bucket.
+
+    Row = author, column = mentioned character. Interactions are counted in
+    both directions when querying (A mentioning B and B mentioning A both
+    count as A and B interacting).
+    """
+
+    def __init__(self, characters: Iterable[str]):
+        self.characters: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self.buckets: Dict[Bucket, sparse.dok_matrix] = {}
+        self.post_ids: Set[str] = set()
+        self._automaton: Optional[AhoCorasick] = None
+        for name in characters:
+            self._add_character(name)
+
+    def _add_character(self, name: str) -> int:
+        if name not in self._positions:
+            self._positions[name] = len(self.characters)
+            self.characters.append(name)
+            size = len(self.characters)
+            for matrix in self.buckets.values():
+                matrix.resize((size, size))
+            self._automaton = None  # rebuilt lazily with the new name
+        return self._positions[name]
+
+    def _matcher(self) -> AhoCorasick:
+        if self._automaton is None:
+            automaton = AhoCorasick()
+            for name in self.characters:
+                automaton.add(name, name)
+                automaton.add("@" + name.replace(" ", ""), name)
+            self._automaton = automaton.build()
+        return self._automaton
+
+    def mentions(self, text: str, author: Optional[str] = None) -> Dict[str, int]:
+        """Characters mentioned in text (excluding the author), with counts."""
+        hits = sorted((start, -end, name) for start, end, name in self._matcher().finditer(text)
+                      if is_word_boundary(text, start, end))
+        counts: Dict[str, int] = {}
+        covered = -1
+        for start, neg_end, name in hits:
+            # Overlapping hits ("@Kamea" and "Kamea") count once; the longest one wins
+            if start < covered:
+                continue
+            covered = -neg_end
+            if name != author:
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    @staticmethod
+    def bucket_of(post: Post) -> Bucket:
+        metadata = post.metadata or {}
+        story_time = post_story_time(post)
+        day = story_time.date().isoformat() if story_time else post.timestamp[:10]
+        return metadata.get("scene") or UNSCENED, day
+
+    def add_post(self, post: Post) -> Dict[str, int]:
+        """Index one post's mentions (no-op if already indexed)."""
+        if post.post_id in self.post_ids:
+            return {}
+        self.post_ids.add(post.post_id)
+
+        author = self._add_character(post.character_name)
+        mentioned = self.mentions(post.content, post.character_name)
+        if not mentioned:
+            return mentioned
+
+        bucket = self.bucket_of(post)
+        size = len(self.characters)
+        matrix = self.buckets.setdefault(bucket, sparse.dok_matrix((size, size), dtype=np.int32))
+        for name, count in mentioned.items():
+            matrix[author, self._positions[name]] += count
+        return mentioned
+
+    def index_drafts(self, drafts_dir: str = "./content/drafts") -> int:
+        """Add any posts from saved draft files that are not indexed yet."""
+        added = 0
+        for draft_file in sorted(Path(drafts_dir).glob("*.json")):
+            with open(draft_file) as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or "posts" not in data:
+                continue  # issue manifests
+            for post_data in data["posts"]:
+                post = Post(**post_data)
+                if post.post_id not in self.post_ids:
+                    self.add_post(post)
+                    added += 1
+        return added
+
+    def matrix(
+        self,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        scene: Optional[str] = None
+    ) -> sparse.csr_matrix:
+        """Directed mention counts summed over the buckets in [since, until] (and scene)."""
+        size = len(self.characters)
+        total = sparse.csr_matrix((size, size), dtype=np.int32)
+        for (bucket_scene, day), matrix in self.buckets.items():
+            if scene is not None and bucket_scene != scene:
+                continue
+            if since is not None and day < since.isoformat():
+                continue
+            if until is not None and day > until.isoformat():
+                continue
+            total = total + matrix.tocsr()
+        return total
+
+    def latest_day(self) -> Optional[date]:
+        days = [day for _, day in self.buckets]
+        return date.fromisoformat(max(days)) if days else None
+
+    def week_window(self, as_of: Optional[date] = None, days: int = 7) -> Tuple[Optional[date], Optional[date]]:
+        """The `days`-long window ending at as_of (default: the latest indexed day)."""
+        as_of = as_of or self.latest_day()
+        if as_of is None:
+            return None, None
+        return as_of - timedelta(days=days - 1), as_of
+
+    def interactions(self, character: str, since: Optional[date] = None,
+                     until: Optional[date] = None) -> Dict[str, int]:
+        """Undirected interaction counts between a character and everyone else."""
+        if character not in self._positions:
+            return {}
+        i = self._positions[character]
+        counts = self.matrix(since, until)
+        both = np.asarray(counts.getrow(i).todense()).ravel() + np.asarray(counts.getcol(i).todense()).ravel()
+        return {self.characters[j]: int(both[j]) for j in np.flatnonzero(both) if j != i}
+
+    def not_interacted(
+        self,
+        character: str,
+        candidates: Optional[Iterable[str]] = None,
+        as_of: Optional[date] = None,
+        days: int = 7
+    ) -> List[str]:
+        """Characters (default: everyone indexed) with no interaction with `character` in the window."""
+        since, until = self.week_window(as_of, days)
+        seen = self.interactions(character, since, until) if since else {}
+        pool = candidates if candidates is not None else self.characters
+        return [name for name in pool if name != character and name not in seen]
+
+    def top_pairs(self, n: int = 10, since: Optional[date] = None,
+                  until: Optional[date] = None) -> List[Tuple[str, str, int]]:
+        counts = self.matrix(since, until)
+        undirected = sparse.triu(counts + counts.T, k=1).tocoo()
+        pairs = sorted(zip(undirected.row, undirected.col, undirected.data), key=lambda p: -p[2])
+        return [(self.characters[a], self.characters[b], int(c)) for a, b, c in pairs[:n]]
+
+    def save(self, path: str = "./data/indexes/interactions.npz"):
+        """Persist bucket triplets, names and indexed post ids."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        keys = list(self.buckets)
+        triplets = []
+        for b, key in enumerate(keys):
+            coo = self.buckets[key].tocoo()
+            triplets.extend(zip([b] * coo.nnz, coo.row, coo.col, coo.data))
+        np.savez_compressed(
+            path,
+            characters=np.array(self.characters, dtype=str),
+            bucket_keys=np.array(keys, dtype=str).reshape(-1, 2),
+            triplets=np.array(triplets, dtype=np.int64).reshape(-1, 4),
+            post_ids=np.array(sorted(self.post_ids), dtype=str)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str = "./data/indexes/interactions.npz",
+             characters: Iterable[str] = ()) -> "InteractionGraph":
+        """Load a saved graph (plus any new characters), or an empty one if none exists."""
+        if not Path(path).exists():
+            return cls(characters)
+
+        data = np.load(path)
+        graph = cls(str(name) for name in data["characters"])
+        for name in characters:
+            graph._add_character(name)
+
+        size = len(graph.characters)
+        keys = [(str(scene), str(day)) for scene, day in data["bucket_keys"]]
+        for key in keys:
+            graph.buckets[key] = sparse.dok_matrix((size, size), dtype=np.int32)
+        for b, row, col, count in data["triplets"]:
+            graph.buckets[keys[b]][row, col] = count
+        graph.post_ids = {str(pid) for pid in data["post_ids"]}
+        return graph
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.interaction_graph [CHARACTER]
+    import sys
+
+    graph = InteractionGraph.load()
+    graph.index_drafts()
+    since, until = graph.week_window()
+    print(f"{len(graph.post_ids)} posts | {len(graph.buckets)} (scene, day) buckets | window {since} → {until}")
+    for a, b, count in graph.top_pairs(since=since, until=until):
+        print(f"  {a:15} ↔ {b:15} {count}")
+    if len(sys.argv) > 1:
+        print(f"\n{sys.argv[1]} has not interacted this week with: {', '.join(graph.not_interacted(sys.argv[1]))}")
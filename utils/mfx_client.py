@@ -0,0 +1,81 @@
+"""
+Client for the resident generation daemon (scripts/mfx_daemon.py).
+
+Stdlib only, so the `mfx` CLI starts instantly: all the heavy imports
+(codex, agents, numpy, indexes) live in the daemon process.
+
+Protocol: one JSON object per line over a Unix socket.
+    request:  {"command": "generate", "character": "Chris", "post_type": "social", ...}
+    response: {"ok": true, ...} or {"ok": false, "error": "..."}
+"""
+
+import os
+import json
+import socket
+from typing import Dict, List, Optional
+
+DEFAULT_SOCKET = os.environ.get("MFX_SOCKET", "./data/mfx.sock")
+
+
+class MfxError(RuntimeError):
+    """Raised when the daemon is unreachable or a command fails."""
+
+
+class MfxClient:
+    """Thin request/response client for the generation daemon."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: Optional[float] = 600):
+        self.socket_path = socket_path
+        self.timeout = timeout  # generation can take several model calls
+
+    def is_running(self) -> bool:
+        try:
+            self.request("ping", timeout=2)
+            return True
+        except MfxError:
+            return False
+
+    def request(self, command: str, timeout: Optional[float] = None, **params) -> Dict:
+        """Send one command and wait for its response."""
+        payload = json.dumps({"command": command, **params}) + "\n"
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout if timeout is not None else self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(payload.encode())
+                with sock.makefile("r") as reader:
+                    line = reader.readline()
+        except (OSError, socket.timeout) as e:
+            raise MfxError(f"daemon not reachable at {self.socket_path}: {e}") from e
+
+        if not line:
+            raise MfxError("daemon closed the connection without a response")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise MfxError(response.get("error", "unknown error"))
+        return response
+
+    def generate(self, character: str, post_type: str = "social", scenario: str = "",
+                 scene: Optional[Dict] = None, as_of: Optional[str] = None) -> Dict:
+        """
+        Generate one post; returns the post dict (with score/metadata).
+        With neither scenario nor scene, the character's last scenario is reused.
+        `as_of` (ISO story time) defaults to the scene's time.
+        """
+        return self.request("generate", character=character, post_type=post_type,
+                            scenario=scenario, scene=scene, as_of=as_of)["post"]
+
+    def scene(self, scene: Dict, characters: Optional[List[str]] = None,
+              post_types: Optional[List[str]] = None) -> Dict:
+        """Generate every (character, post_type) cell of a scene concurrently."""
+        return self.request("scene", scene=scene, characters=characters, post_types=post_types)
+
+    def status(self) -> Dict:
+        return self.request("status", timeout=5)
+
+    def flush(self) -> Dict:
+        """Write unsaved posts to drafts and persist indexes/latency stats."""
+        return self.request("flush")
+
+    def shutdown(self) -> Dict:
+        return self.request("shutdown", timeout=30)
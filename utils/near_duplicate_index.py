@@ -0,0 +1,235 @@
+"""
+MinHash + LSH near-duplicate index over the draft store.
+
+Characters writing about the same scene tend to repeat the same quotes and
+numbers. This index keeps one MinHash signature per post and buckets them by
+LSH bands, so a new post is only compared against posts that share a band
+instead of the whole corpus.
+
+Index file: ./data/indexes/near_duplicates.npz (signatures + ids + edges)
+"""
+
+import re
+import json
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from agents.base.character_agent import Post
+
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index.
+
+    With the defaults (128 permutations, 32 bands of 4 rows) two posts with
+    Jaccard similarity ~0.5 collide in at least one band ~87% of the time,
+    while posts under ~0.2 almost never do. Candidates are then verified with
+    the signature-estimated Jaccard against `threshold`.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        threshold: float = 0.5,
+        seed: int = 1
+    ):
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**31 - 1, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 2**31 - 1, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        self.post_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._signatures: List[np.ndarray] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._parents: List[int] = []  # union-find over post positions
+        self.edges: List[Tuple[int, int, float]] = []
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    def __contains__(self, post_id: str):
+        return post_id in self._positions
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text's word shingles."""
+        tokens = WORD_PATTERN.findall(text.lower())
+        n = self.shingle_size
+        shingles = {" ".join(tokens[i:i + n]) for i in range(max(len(tokens) - n + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+        # (a * x + b) mod p for every permutation/shingle pair, then the per-permutation minimum
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def add(self, post_id: str, text: str) -> List[Tuple[str, float]]:
+        """
+        Index a post and return earlier posts it near-duplicates.
+
+        Args:
+            post_id: Stable ID (Post.post_id)
+            text: Post content
+
+        Returns:
+            List of (earlier_post_id, estimated_jaccard), most similar first
+        """
+        if post_id in self._positions:
+            return self.duplicates_of(post_id)
+
+        sig = self.signature(text)
+        position = len(self.post_ids)
+
+        candidates = set()
+        band_keys = [sig[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+        for band, key in enumerate(band_keys):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        matches = []
+        if candidates:
+            candidate_list = sorted(candidates)
+            others = np.stack([self._signatures[c] for c in candidate_list])
+            similarity = (others == sig).mean(axis=1)
+            matches = [(c, float(s)) for c, s in zip(candidate_list, similarity) if s >= self.threshold]
+
+        self.post_ids.append(post_id)
+        self._positions[post_id] = position
+        self._signatures.append(sig)
+        self._parents.append(position)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(position)
+
+        for other, similarity in matches:
+            self.edges.append((other, position, similarity))
+            self._union(other, position)
+
+        matches.sort(key=lambda m: -m[1])
+        return [(self.post_ids[other], similarity) for other, similarity in matches]
+
+    def add_post(self, post: Post) -> List[Tuple[str, float]]:
+        """Index a Post and record its near-duplicates in post.metadata."""
+        duplicates = self.add(post.post_id, post.content)
+        if duplicates:
+            post.metadata = post.metadata or {}
+            post.metadata["near_duplicates"] = [
+                {"post_id": other_id, "similarity": round(similarity, 3)} for other_id, similarity in duplicates
+            ]
+        return duplicates
+
+    def duplicates_of(self, post_id: str) -> List[Tuple[str, float]]:
+        """Return recorded near-duplicates of an already indexed post."""
+        position = self._positions[post_id]
+        found = [
+            (b if a == position else a, s)
+            for a, b, s in self.edges if position in (a, b)
+        ]
+        found.sort(key=lambda m: -m[1])
+        return [(self.post_ids[other], s) for other, s in found]
+
+    def cluster(self, post_id: str) -> List[str]:
+        """All posts transitively linked to post_id by near-duplicate edges."""
+        root = self._find(self._positions[post_id])
+        return [pid for i, pid in enumerate(self.post_ids) if self._find(i) == root]
+
+    def clusters(self, min_size: int = 2) -> List[List[str]]:
+        """Duplicate clusters, largest first."""
+        groups: Dict[int, List[str]] = {}
+        for i, pid in enumerate(self.post_ids):
+            groups.setdefault(self._find(i), []).append(pid)
+        result = [ids for ids in groups.values() if len(ids) >= min_size]
+        result.sort(key=len, reverse=True)
+        return result
+
+    def index_drafts(self, drafts_dir: str = "./content/drafts") -> int:
+        """Add any posts from saved draft files that are not indexed yet."""
+        added = 0
+        for draft_file in sorted(Path(drafts_dir).glob("*.json")):
+            with open(draft_file) as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or "posts" not in data:
+                continue  # issue manifests
+            for post_data in data["posts"]:
+                post = Post(**post_data)
+                if post.post_id not in self._positions:
+                    self.add(post.post_id, post.content)
+                    added += 1
+        return added
+
+    def save(self, path: str = "./data/indexes/near_duplicates.npz"):
+        """Persist signatures, ids and duplicate edges (LSH buckets are rebuilt on load)."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        signatures = np.stack(self._signatures) if self._signatures else np.zeros((0, self.num_perm), np.uint32)
+        edges = np.array(self.edges, dtype=float).reshape(-1, 3)
+        np.savez_compressed(
+            path,
+            signatures=signatures,
+            post_ids=np.array(self.post_ids, dtype=str),
+            edges=edges,
+            params=np.array([self.num_perm, self.bands, self.shingle_size, self.seed]),
+            threshold=np.array(self.threshold)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str = "./data/indexes/near_duplicates.npz") -> "NearDuplicateIndex":
+        """Load an index saved with save(), or return an empty one if none exists."""
+        if not Path(path).exists():
+            return cls()
+
+        data = np.load(path)
+        num_perm, bands, shingle_size, seed = (int(v) for v in data["params"])
+        index = cls(num_perm, bands, shingle_size, float(data["threshold"]), seed)
+
+        for position, (post_id, sig) in enumerate(zip(data["post_ids"], data["signatures"])):
+            index.post_ids.append(str(post_id))
+            index._positions[str(post_id)] = position
+            index._signatures.append(sig)
+            index._parents.append(position)
+            for band in range(index.bands):
+                key = sig[band * index.rows:(band + 1) * index.rows].tobytes()
+                index._buckets[band].setdefault(key, []).append(position)
+
+        for a, b, similarity in data["edges"]:
+            index.edges.append((int(a), int(b), float(similarity)))
+            index._union(int(a), int(b))
+
+        return index
+
+    def _find(self, i: int) -> int:
+        while self._parents[i] != i:
+            self._parents[i] = self._parents[self._parents[i]]
+            i = self._parents[i]
+        return i
+
+    def _union(self, a: int, b: int):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parents[max(root_a, root_b)] = min(root_a, root_b)
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.near_duplicate_index
+    index = NearDuplicateIndex.load()
+    added = index.index_drafts()
+    index.save()
+    print(f"Indexed {added} new posts ({len(index)} total)")
+    for cluster in index.clusters():
+        print(f"  • cluster of {len(cluster)}: {', '.join(cluster)}")
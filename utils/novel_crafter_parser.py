@@ -5,14 +5,21 @@ Reads from /data/novel_export/ (copied from Novel Crafter export)
 Creates character_codex.json, story_timeline.json with canonical constraints.
 """
 
+import sys
 import json
 import re
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass, asdict
 import yaml
 
+# Keep `python utils/novel_crafter_parser.py` working alongside package-style imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.tracing import span
+from utils.story_timeline import StoryTimeline, is_story_entry, parse_export_entry
+
 
 @dataclass
 class Character:
@@ -42,13 +49,19 @@ class NovelCrafterParser:
         self.export_dir = Path(novel_export_dir)
         self.characters: Dict[str, Character] = {}
         self.story_events: List[Dict] = []
+        self.story_entries: List[Tuple[str, str]] = []  # (title, body) of in-world posts in the export
+        self.timeline = StoryTimeline()
         self.locations: Dict[str, Dict] = {}
 
     def parse_all(self):
         """Parse all files from novel export."""
-        self._parse_character_files()
-        self._extract_timeline_events()
-        self._build_relationship_map()
+        with span("codex_parse_characters") as parse_span:
+            self._parse_character_files()
+            parse_span.set(characters=len(self.characters))
+        with span("codex_timeline"):
+            self._extract_timeline_events()
+        with span("codex_relationships"):
+            self._build_relationship_map()
         return self
 
     def _parse_character_files(self):
@@ -61,7 +74,7 @@ class NovelCrafterParser:
             print(f"No characters directory found at {characters_dir}")
             return
 
-        for char_dir in characters_dir.iterdir():
+        for char_dir in sorted(characters_dir.iterdir()):
             if not char_dir.is_dir():
                 continue
 
@@ -71,7 +84,12 @@ class NovelCrafterParser:
 
             try:
                 character = self._parse_character_md(entry_file)
-                if character:
+                body = re.split(r'^---\s*$', entry_file.read_text(), flags=re.MULTILINE)[-1]
+                if character and is_story_entry(body):
+                    # In-world posts are exported as codex entries; they feed the timeline
+                    self.story_entries.append((character.name, body))
+                    print(f"✓ Story post: {character.name}")
+                elif character:
                     self.characters[character.name] = character
                     print(f"✓ Parsed: {character.name}")
             except Exception as e:
@@ -149,6 +167,13 @@ class NovelCrafterParser:
                 if match:
                     data['age'] = int(match.group(1))
 
+        # Inline "**Connections:** Frank (peer), Tria (trusted source)" lines
+        if not data['connections']:
+            match = re.search(r'\*\*Connections:\*\*\s*(.+)', body)
+            if match:
+                names = re.sub(r'\([^)]*\)', '', match.group(1))
+                data['connections'] = re.findall(r'(?:^|,)\s*([A-Z][\w.]*(?:\s+[A-Z][\w.]*)*)', names)
+
         # Extract fields from frontmatter with fallbacks
         if frontmatter.get('fields'):
             fields = frontmatter['fields']
@@ -158,18 +183,15 @@ class NovelCrafterParser:
         return data
 
     def _extract_timeline_events(self):
-        """Extract story events and timeline from chats/scenes."""
-        # This would parse chat/scene files for timeline
-        # For now, create placeholder with key date
-        self.story_events = [
-            {
-                'date': '2025-06-03',
-                'time': '15:30',
-                'event': 'Storm approaching, community divided on refugee protection',
-                'key_characters': ['Chris', 'Sarah', 'Tria', 'Kamea', 'Randy'],
-                'significance': 'Major conflict point'
-            }
-        ]
+        """Build the dated story timeline from in-world posts and fill knowledge scopes."""
+        known_names = list(self.characters.keys())
+        events = [parse_export_entry(body, title, known_names) for title, body in self.story_entries]
+        connections = {name: char.connections or [] for name, char in self.characters.items()}
+        self.timeline = StoryTimeline((e for e in events if e), connections)
+        self.story_events = self.timeline.to_dicts()
+
+        for name, char in self.characters.items():
+            char.knowledge_scope = self.timeline.knowledge_scope(name)
 
     def _build_relationship_map(self):
         """Build graph of character relationships."""
@@ -205,8 +227,9 @@ class NovelCrafterParser:
 
         return allegiances
 
-    def save_codex(self, output_file: str = "./data/character_codex.json"):
-        """Save parsed character codex to JSON."""
+    def save_codex(self, output_file: str = "./data/character_codex.json",
+                   timeline_file: str = "./data/story_timeline.json"):
+        """Save parsed character codex and story timeline to JSON."""
         codex = {
             'characters': {name: char.to_dict() for name, char in self.characters.items()},
             'story_events': self.story_events,
@@ -215,10 +238,14 @@ class NovelCrafterParser:
         }
 
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, 'w') as f:
+        with span("codex_save") as save_span, open(output_file, 'w') as f:
             json.dump(codex, f, indent=2, default=str)
+            save_span.set(bytes=f.tell())
+
+        self.timeline.save(timeline_file)
 
         print(f"\n✓ Saved character codex to {output_file}")
+        print(f"✓ Saved story timeline ({len(self.timeline.events)} events) to {timeline_file}")
         return codex
 
     def print_summary(self):
@@ -234,7 +261,7 @@ class NovelCrafterParser:
 
         print(f"\nStory Events: {len(self.story_events)}")
         for event in self.story_events:
-            print(f"  • {event['date']} - {event['event']}")
+            print(f"  • {event['when']} - {event['author']}: {event['title']}")
 
         print(f"{'='*60}\n")
 
@@ -0,0 +1,255 @@
+"""
+Publishing outbox: approved posts fanned out to every platform.
+
+The outbox is a SQLite table with one row per (post_id, platform). Enqueuing
+is idempotent (post_id is the key), so re-scanning content/approved/ never
+double-queues a post. AsyncPublisher runs one worker per platform, each with
+its own token bucket, in-flight limit and retry schedule, so a slow or
+rate-limited platform only delays its own rows. Once a post is published on
+every platform it was queued for, it is written to content/published/.
+
+Row states: pending -> in_flight -> published | failed (after max attempts)
+
+Outbox file: ./data/outbox.db
+"""
+
+import json
+import time
+import random
+import asyncio
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from agents.base.character_agent import Post
+from utils.platform_adapters import PlatformAdapter, PublishError, TokenBucket
+from utils.search_index import posts_in_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    post_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    post TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    remote_id TEXT,
+    queued_at REAL NOT NULL,
+    published_at REAL,
+    PRIMARY KEY (post_id, platform)
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox(platform, state, next_attempt_at);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+"""
+
+
+class Outbox:
+    """Durable per-platform publish queue keyed by post_id."""
+
+    def __init__(self, path: str = "./data/outbox.db"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, posts: Iterable[Post], adapters: Dict[str, PlatformAdapter]) -> int:
+        """Queue each post for every platform that accepts it; already-queued pairs are skipped."""
+        now = time.time()
+        rows = [
+            (post.post_id, name, json.dumps(post.to_dict(), default=str), now)
+            for post in posts for name, adapter in adapters.items() if adapter.accepts(post)
+        ]
+        with self.db:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO outbox (post_id, platform, post, queued_at) VALUES (?, ?, ?, ?)", rows)
+            return self.db.total_changes - before
+
+    def enqueue_approved(self, adapters: Dict[str, PlatformAdapter],
+                         approved_dir: str = "./content/approved") -> int:
+        """Queue posts from approved files that are new or changed since the last scan."""
+        added = 0
+        for path in sorted(Path(approved_dir).glob("**/*.json")):
+            mtime = path.stat().st_mtime
+            known = self.db.execute("SELECT mtime FROM files WHERE path = ?", (str(path),)).fetchone()
+            if known and known["mtime"] >= mtime:
+                continue
+            added += self.enqueue(posts_in_file(path), adapters)
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO files (path, mtime) VALUES (?, ?)", (str(path), mtime))
+        return added
+
+    def recover(self) -> int:
+        """Return rows left in_flight by a crash to pending (the idempotency key makes the retry safe)."""
+        with self.db:
+            return self.db.execute("UPDATE outbox SET state = 'pending' WHERE state = 'in_flight'").rowcount
+
+    def claim(self, platform: str, limit: int, now: Optional[float] = None) -> List[sqlite3.Row]:
+        """Due pending rows for a platform, marked in_flight."""
+        now = time.time() if now is None else now
+        rows = self.db.execute("""
+            SELECT * FROM outbox WHERE platform = ? AND state = 'pending' AND next_attempt_at <= ?
+            ORDER BY next_attempt_at, queued_at LIMIT ?
+        """, (platform, now, limit)).fetchall()
+        with self.db:
+            self.db.executemany("UPDATE outbox SET state = 'in_flight' WHERE post_id = ? AND platform = ?",
+                                [(row["post_id"], platform) for row in rows])
+        return rows
+
+    def next_due(self, platform: str) -> Optional[float]:
+        """When the platform's next pending row becomes due (None if nothing is pending)."""
+        row = self.db.execute("SELECT MIN(next_attempt_at) AS t FROM outbox WHERE platform = ? AND state = 'pending'",
+                              (platform,)).fetchone()
+        return row["t"]
+
+    def mark_published(self, post_id: str, platform: str, remote_id: str):
+        with self.db:
+            self.db.execute("""
+                UPDATE outbox SET state = 'published', remote_id = ?, published_at = ?,
+                                  attempts = attempts + 1, last_error = NULL
+                WHERE post_id = ? AND platform = ?
+            """, (remote_id, time.time(), post_id, platform))
+
+    def mark_failed(self, post_id: str, platform: str, error: str, retry_at: Optional[float]):
+        """Record a failed attempt: back to pending until retry_at, or failed for good if None."""
+        with self.db:
+            self.db.execute("""
+                UPDATE outbox SET state = ?, next_attempt_at = ?, attempts = attempts + 1, last_error = ?
+                WHERE post_id = ? AND platform = ?
+            """, ("pending" if retry_at else "failed", retry_at or 0, error, post_id, platform))
+
+    def retry_failed(self, platform: Optional[str] = None) -> int:
+        """Give dead rows a fresh set of attempts."""
+        sql = "UPDATE outbox SET state = 'pending', attempts = 0, next_attempt_at = 0 WHERE state = 'failed'"
+        with self.db:
+            if platform:
+                return self.db.execute(sql + " AND platform = ?", (platform,)).rowcount
+            return self.db.execute(sql).rowcount
+
+    def remote_ids(self, post_id: str) -> Optional[Dict[str, str]]:
+        """{platform: remote_id} once the post is published everywhere it was queued, else None."""
+        rows = self.db.execute("SELECT platform, state, remote_id FROM outbox WHERE post_id = ?",
+                               (post_id,)).fetchall()
+        if not rows or any(row["state"] != "published" for row in rows):
+            return None
+        return {row["platform"]: row["remote_id"] for row in rows}
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        result: Dict[str, Dict[str, int]] = {}
+        for row in self.db.execute("SELECT platform, state, COUNT(*) AS n FROM outbox GROUP BY platform, state"):
+            result.setdefault(row["platform"], {})[row["state"]] = row["n"]
+        return result
+
+
+class AsyncPublisher:
+    """
+    Drains the outbox: one worker per platform, each rate limited by its own
+    token bucket and bounded to the adapter's max_in_flight requests.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        adapters: Dict[str, PlatformAdapter],
+        max_attempts: int = 5,
+        base_backoff: float = 2.0,
+        published_dir: str = "./content/published"
+    ):
+        self.outbox = outbox
+        self.adapters = adapters
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.published_dir = Path(published_dir)
+        self.buckets = {name: TokenBucket(a.rate, a.burst) for name, a in adapters.items()}
+        self.published: List[Post] = []
+        self.counts = {name: {"published": 0, "retried": 0, "failed": 0} for name in adapters}
+
+    def backoff(self, attempts: int, error: PublishError) -> float:
+        if error.retry_after:
+            return error.retry_after
+        return self.base_backoff * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+
+    async def _publish_one(self, name: str, row: sqlite3.Row, slots: asyncio.Semaphore):
+        adapter = self.adapters[name]
+        post = Post(**{k: v for k, v in json.loads(row["post"]).items() if k in Post.__dataclass_fields__})
+        try:
+            await self.buckets[name].acquire()
+            remote_id = await adapter.publish(post, idempotency_key=row["post_id"])
+        except Exception as e:
+            # Anything else (e.g. an unparseable 200 body) is retried too; the idempotency key keeps that safe
+            if not isinstance(e, PublishError):
+                e = PublishError(f"{type(e).__name__}: {e}")
+            attempts = row["attempts"] + 1
+            if e.retry_after:
+                self.buckets[name].pause(e.retry_after)
+            if e.retryable and attempts < self.max_attempts:
+                self.outbox.mark_failed(row["post_id"], name, str(e), time.time() + self.backoff(attempts, e))
+                self.counts[name]["retried"] += 1
+                print(f"  ↻ {name}: {post.character_name} ({post.post_type}) attempt {attempts} failed: {e}")
+            else:
+                self.outbox.mark_failed(row["post_id"], name, str(e), None)
+                self.counts[name]["failed"] += 1
+                print(f"  ✗ {name}: {post.character_name} ({post.post_type}) gave up: {e}")
+            return
+        finally:
+            slots.release()
+
+        self.outbox.mark_published(row["post_id"], name, remote_id)
+        self.counts[name]["published"] += 1
+        print(f"  ✓ {name}: {post.character_name} ({post.post_type}) → {remote_id}")
+        remote_ids = self.outbox.remote_ids(row["post_id"])
+        if remote_ids:
+            self._archive(post, remote_ids)
+
+    def _archive(self, post: Post, remote_ids: Dict[str, str]):
+        """Write a post published on all its platforms to content/published/."""
+        self.published_dir.mkdir(parents=True, exist_ok=True)
+        post.metadata = {**(post.metadata or {}),
+                         "published": {"at": datetime.now().isoformat(), "remote_ids": remote_ids}}
+        path = self.published_dir / f"{post.character_name}_{post.post_id}.json"
+        with open(path, "w") as f:
+            json.dump(post.to_dict(), f, indent=2, default=str)
+        self.published.append(post)
+
+    async def _platform_worker(self, name: str, drain: bool, poll: float):
+        adapter = self.adapters[name]
+        slots = asyncio.Semaphore(adapter.max_in_flight)
+        tasks = set()
+        while True:
+            await slots.acquire()
+            rows = self.outbox.claim(name, limit=1)
+            if rows:
+                task = asyncio.create_task(self._publish_one(name, rows[0], slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                continue
+            slots.release()
+
+            if tasks:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            due = self.outbox.next_due(name)
+            if due is None and drain:
+                return
+            wait = poll if due is None else max(0.0, min(poll, due - time.time()))
+            await asyncio.sleep(wait)
+
+    async def run(self, drain: bool = True, poll: float = 5.0):
+        """
+        Publish until every platform's queue is empty (drain) or forever.
+
+        Args:
+            drain: Return once nothing is pending (retries included)
+            poll: Seconds between outbox checks while idle
+        """
+        self.outbox.recover()
+        await asyncio.gather(*(self._platform_worker(name, drain, poll) for name in self.adapters))
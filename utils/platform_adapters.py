@@ -0,0 +1,186 @@
+"""
+Platform adapters for publishing approved posts.
+
+Each adapter turns a Post into one platform API call and reports the remote
+id. Adapters are looked up by name in ADAPTERS, so adding a platform means
+adding a class and a registry entry. Every adapter carries its own rate
+limit (a TokenBucket owned by the publisher) and is given the post_id as an
+idempotency key, so a retry after a timeout never double-posts.
+
+Endpoints come from the environment and default to the local stand-ins in
+scripts/platform_standin.py:
+    BLUESKY_ENDPOINT, BLUESKY_HANDLE, BLUESKY_APP_PASSWORD
+    LENS_ENDPOINT, LENS_API_KEY
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from agents.base.character_agent import Post
+
+
+class PublishError(RuntimeError):
+    """A failed publish; `retryable` errors are retried with backoff."""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for a while (the platform said 429)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def http_json(url: str, payload: Dict, headers: Optional[Dict] = None, timeout: float = 30) -> Tuple[int, Dict]:
+    """POST JSON and return (status, body); maps HTTP failures to PublishError."""
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), method="POST",
+        headers={"Content-Type": "application/json", **(headers or {})}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            return response.status, json.loads(body) if body else {}
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode(errors="replace")[:200]
+        if e.code == 409:
+            return e.code, json.loads(detail) if detail.startswith("{") else {}
+        if e.code == 429:
+            retry_after = float(e.headers.get("Retry-After") or 5)
+            raise PublishError(f"rate limited: {detail}", retry_after=retry_after) from e
+        raise PublishError(f"HTTP {e.code}: {detail}", retryable=e.code >= 500) from e
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        raise PublishError(f"unreachable: {e}") from e
+
+
+class PlatformAdapter:
+    """Base adapter. Subclasses implement publish_sync(); it runs off the event loop."""
+
+    name = "platform"
+    rate = 1.0           # sustained requests per second
+    burst = 1            # token bucket capacity
+    max_in_flight = 2    # concurrent requests to this platform
+    post_types = None    # post types this platform accepts (None = all)
+
+    def accepts(self, post: Post) -> bool:
+        return self.post_types is None or post.post_type in self.post_types
+
+    async def publish(self, post: Post, idempotency_key: str) -> str:
+        """Publish and return the remote id; raises PublishError."""
+        return await asyncio.to_thread(self.publish_sync, post, idempotency_key)
+
+    def publish_sync(self, post: Post, idempotency_key: str) -> str:
+        raise NotImplementedError
+
+
+class BlueskyAdapter(PlatformAdapter):
+    """
+    AT Protocol createRecord. The record key is derived from the post_id, so
+    a repeated publish collides (409) instead of creating a second post.
+    """
+
+    name = "bluesky"
+    rate = 0.5
+    burst = 3
+    post_types = ("social",)  # 300-grapheme limit; blogs and editorials go elsewhere
+    max_chars = 300
+
+    def __init__(self, endpoint: str = None, handle: str = None, password: str = None):
+        self.endpoint = (endpoint or os.environ.get("BLUESKY_ENDPOINT", "http://127.0.0.1:8701")).rstrip("/")
+        self.handle = handle or os.environ.get("BLUESKY_HANDLE", "monkeyflower.test")
+        self.password = password or os.environ.get("BLUESKY_APP_PASSWORD", "standin")
+        self._session: Optional[Dict] = None
+
+    def _login(self) -> Dict:
+        if self._session is None:
+            _, self._session = http_json(f"{self.endpoint}/xrpc/com.atproto.server.createSession",
+                                         {"identifier": self.handle, "password": self.password})
+        return self._session
+
+    def publish_sync(self, post: Post, idempotency_key: str) -> str:
+        session = self._login()
+        text = post.content if len(post.content) <= self.max_chars else post.content[:self.max_chars - 1] + "…"
+        rkey = hashlib.sha256(idempotency_key.encode()).hexdigest()[:13]
+        status, body = http_json(
+            f"{self.endpoint}/xrpc/com.atproto.repo.createRecord",
+            {
+                "repo": session.get("did", self.handle),
+                "collection": "app.bsky.feed.post",
+                "rkey": rkey,
+                "record": {
+                    "$type": "app.bsky.feed.post",
+                    "text": text,
+                    "createdAt": datetime.now(timezone.utc).isoformat(),
+                },
+            },
+            headers={"Authorization": f"Bearer {session.get('accessJwt', '')}"},
+        )
+        return body.get("uri") or f"at://{session.get('did', self.handle)}/app.bsky.feed.post/{rkey}"
+
+
+class LensAdapter(PlatformAdapter):
+    """
+    Lens publication through a JSON relay endpoint (signing and on-chain
+    submission happen behind it). Dedups on the Idempotency-Key header.
+    """
+
+    name = "lens"
+    rate = 0.2
+    burst = 2
+
+    def __init__(self, endpoint: str = None, api_key: str = None):
+        self.endpoint = (endpoint or os.environ.get("LENS_ENDPOINT", "http://127.0.0.1:8702")).rstrip("/")
+        self.api_key = api_key or os.environ.get("LENS_API_KEY", "standin")
+
+    def publish_sync(self, post: Post, idempotency_key: str) -> str:
+        status, body = http_json(
+            f"{self.endpoint}/publications",
+            {
+                "content": post.content,
+                "author": post.character_name,
+                "post_type": post.post_type,
+                "tags": [post.character_name, post.post_type, post.location],
+            },
+            headers={"Authorization": f"Bearer {self.api_key}", "Idempotency-Key": idempotency_key},
+        )
+        return body.get("id", idempotency_key)
+
+
+ADAPTERS = {
+    "bluesky": BlueskyAdapter,
+    "lens": LensAdapter,
+}
@@ -0,0 +1,282 @@
+"""
+Built-in profiling mode for generation runs (`--profile`).
+
+Piggybacks on the tracing spans: each span name maps to a pipeline stage
+(codex parsing, agent construction, generation, parsing, persistence), and
+while profiling is on, entering a span switches the thread's cProfile
+collector to that stage, so every stage gets its own exclusive profile.
+Entry points that already use spans are profiled without changes.
+
+Alongside the per-stage CPU profiles:
+- a sampling thread records collapsed stacks from every thread, prefixed
+  with the stage each thread was in (feed to flamegraph.pl / speedscope)
+- tracemalloc snapshots are taken every N posts and diffed against the
+  previous snapshot, plus a final first→last diff, to surface growth such as
+  an unbounded `posts_generated`
+
+Profiling is off until configure() is called.
+
+Outputs (./data/profiles/<run_id>/):
+    <stage>.pstats, <stage>.txt   cProfile stats per stage (binary + top functions)
+    stacks.collapsed              "stage;thread;frame;...;frame count" lines
+    allocations.txt               top allocation diffs between snapshots
+"""
+
+import io
+import sys
+import pstats
+import cProfile
+import threading
+import tracemalloc
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Span name -> profiled stage (spans not listed stay in their parent's stage)
+STAGES = {
+    "codex_parse_characters": "codex_parsing",
+    "codex_timeline": "codex_parsing",
+    "codex_relationships": "codex_parsing",
+    "agent_init": "agent_construction",
+    "generate_post": "generation",
+    "best_of": "generation",
+    "parse": "parsing",
+    "json_write": "persistence",
+    "codex_save": "persistence",
+}
+
+# Frames from these files are noise in allocation diffs
+ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+# Threads outside any stage whose innermost frame is in one of these are just waiting
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "thread.py")
+
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """Per-stage cProfile, stack sampling and tracemalloc snapshots for one run."""
+
+    def __init__(self):
+        self.enabled = False
+        self.run_id = None
+        self.output_dir: Optional[Path] = None
+        self.snapshot_every = 10
+        self.sample_interval = 0.01
+        self.top = 25
+
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._local = threading.local()
+        self._thread_stage: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._posts = 0
+        self._first_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._allocation_report: List[str] = []
+
+    def configure(self, run_id: str = None, profile_dir: str = "./data/profiles",
+                  snapshot_every: int = 10, sample_interval: float = 0.01):
+        """Start profiling: stage profilers, the stack sampler and tracemalloc."""
+        from utils.tracing import tracer
+
+        self.run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.output_dir = Path(profile_dir) / self.run_id
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = max(1, snapshot_every)
+        self.sample_interval = sample_interval
+        self.enabled = True
+
+        tracemalloc.start(1)  # diffs group by allocating line; deeper tracebacks make snapshots slow
+        self._take_snapshot("start")
+        tracer.stage_hook = self.stage
+
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="mfx-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    # --- CPU: per-stage cProfile ---
+
+    def _stage_stack(self) -> List[str]:
+        if not hasattr(self._local, "stages"):
+            self._local.stages = []
+        return self._local.stages
+
+    def _switch(self, stage: Optional[str], thread_id: int, previous: Optional[str]):
+        if previous is not None:
+            self._profiles[(previous, thread_id)].disable()
+        if stage is None:
+            self._thread_stage.pop(thread_id, None)
+            return
+        self._thread_stage[thread_id] = stage
+        with self._lock:
+            profile = self._profiles.setdefault((stage, thread_id), cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:
+            pass  # another profiler owns this interpreter; sampled stacks still cover the stage
+
+    @contextlib.contextmanager
+    def stage(self, span_name: str):
+        """Attribute CPU time on this thread to the span's stage until it exits."""
+        stage = STAGES.get(span_name)
+        if not self.enabled or stage is None:
+            yield
+            return
+
+        stages = self._stage_stack()
+        previous = stages[-1] if stages else None
+        if stage == previous:
+            yield
+            return
+
+        thread_id = threading.get_ident()
+        self._switch(stage, thread_id, previous)
+        stages.append(stage)
+        try:
+            yield
+        finally:
+            stages.pop()
+            if self.enabled:
+                self._profiles[(stage, thread_id)].disable()
+                self._switch(previous, thread_id, None)
+
+    # --- CPU: sampled collapsed stacks ---
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.sample_interval):
+            names.update((t.ident, t.name) for t in threading.enumerate())
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stage = self._thread_stage.get(thread_id)
+                if stage is None:
+                    stage = "idle" if Path(frame.f_code.co_filename).name in IDLE_FILES else "other"
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                key = ";".join([stage, names.get(thread_id, str(thread_id))] + labels[::-1])
+                self._stacks[key] += 1
+
+    # --- Memory: tracemalloc snapshots every N posts ---
+
+    def post_generated(self, count: int = 1):
+        """Count finished posts; snapshot and diff allocations every `snapshot_every`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            before = self._posts
+            self._posts += count
+            due = self._posts // self.snapshot_every > before // self.snapshot_every
+        if due:
+            self._take_snapshot(f"after {self._posts} posts")
+
+    def _take_snapshot(self, label: str):
+        thread_id = threading.get_ident()
+        stage = self._thread_stage.get(thread_id)
+        self._thread_stage[thread_id] = "profiler"  # keep snapshot overhead out of the caller's stage
+        try:
+            self._record_snapshot(label)
+        finally:
+            if stage is None:
+                self._thread_stage.pop(thread_id, None)
+            else:
+                self._thread_stage[thread_id] = stage
+
+    def _record_snapshot(self, label: str):
+        snapshot = tracemalloc.take_snapshot().filter_traces(ALLOCATION_FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            previous, self._last_snapshot = self._last_snapshot, snapshot
+            if self._first_snapshot is None:
+                self._first_snapshot = snapshot
+            header = f"== {label}: traced {current / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB)"
+            self._allocation_report.append(header)
+            if previous is not None:
+                self._allocation_report.extend(self._diff_lines(previous, snapshot))
+            self._allocation_report.append("")
+
+    def _diff_lines(self, older: tracemalloc.Snapshot, newer: tracemalloc.Snapshot) -> List[str]:
+        stats = newer.compare_to(older, "lineno")
+        growing = [s for s in stats if s.size_diff > 0][:self.top]
+        return [f"  {s.size_diff / 1024:+10.1f} KiB {s.count_diff:+7d} blocks  {s.traceback[0]}" for s in growing]
+
+    # --- Output ---
+
+    def finish(self) -> Optional[Path]:
+        """Stop profiling and write stats, collapsed stacks and the allocation report."""
+        if not self.enabled:
+            return None
+        from utils.tracing import tracer
+
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        tracer.stage_hook = None
+        for profile in self._profiles.values():
+            profile.disable()
+        self.enabled = False
+
+        self._take_snapshot(f"end ({self._posts} posts)")
+        with self._lock:
+            self._allocation_report.append("== first → last snapshot")
+            self._allocation_report.extend(self._diff_lines(self._first_snapshot, self._last_snapshot))
+        tracemalloc.stop()
+
+        by_stage: Dict[str, List[cProfile.Profile]] = {}
+        for (stage, _), profile in self._profiles.items():
+            by_stage.setdefault(stage, []).append(profile)
+        for stage, profiles in by_stage.items():
+            stats = None
+            for profile in profiles:
+                try:
+                    stats = pstats.Stats(profile) if stats is None else stats.add(profile)
+                except TypeError:
+                    continue  # profiler that never saw a call
+            if stats is None:
+                continue
+            stats.dump_stats(self.output_dir / f"{stage}.pstats")
+            text = io.StringIO()
+            stats.stream = text
+            stats.sort_stats("cumulative").print_stats(self.top)
+            (self.output_dir / f"{stage}.txt").write_text(text.getvalue())
+
+        (self.output_dir / "stacks.collapsed").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items()))
+        )
+        (self.output_dir / "allocations.txt").write_text("\n".join(self._allocation_report) + "\n")
+        return self.output_dir
+
+    def print_summary(self):
+        """Samples per stage, and where the output files are."""
+        per_stage = Counter()
+        for stack, count in self._stacks.items():
+            per_stage[stack.split(";", 1)[0]] += count
+        total = sum(per_stage.values()) or 1
+        print(f"\nProfile: {self.output_dir}")
+        for stage, count in per_stage.most_common():
+            print(f"  {stage:20} {count:6d} samples ({count / total:.0%})")
+        print(f"  Flamegraph: flamegraph.pl {self.output_dir / 'stacks.collapsed'} > flame.svg")
+        print(f"  Stage stats: python -m pstats {self.output_dir / 'generation.pstats'}")
+        print(f"  Allocation growth: {self.output_dir / 'allocations.txt'}")
+
+
+# Process-wide profiler, enabled by the scripts' --profile flag
+profiler = Profiler()
@@ -0,0 +1,223 @@
+"""
+Local batch quality scorer for generated posts.
+
+Scores many posts at once with NumPy so obviously off-spec drafts can be
+rejected before they reach GitHub issues or publishing. No model calls.
+
+Components (each in [0, 1]):
+- length:     word count vs. the post_type range in POST_SPECS
+- density:    named people, places and times per 100 words
+- header:     REQUIRED OUTPUT FORMAT header fields present in the response
+- similarity: hashed bag-of-words cosine between post and scenario
+"""
+
+import re
+import json
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.base.character_agent import POST_SPECS, Post
+
+
+HEADER_FIELDS = ("timestamp", "network_location", "encryption", "user")
+
+# Places that show up across the novel and generated drafts
+PLACE_WORDS = {
+    "campus", "field", "library", "hall", "building", "room", "office", "woods",
+    "dorm", "dorms", "shelter", "server", "lounge", "commons", "gate", "entrance",
+    "perimeter", "block", "deck", "boards", "tarp", "tarps", "akima",
+}
+
+TIME_PATTERN = re.compile(
+    r'\b\d{1,2}:\d{2}\b|\b\d{1,2}\s?(?:am|pm)\b|\b(?:tonight|midnight|noon|morning|'
+    r'afternoon|evening|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
+    re.IGNORECASE
+)
+CAPITALIZED_PATTERN = re.compile(r'(?<![.!?]\s)(?<!^)\b[A-Z][a-z]{2,}\b', re.MULTILINE)
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def parse_word_range(length_spec: str) -> Tuple[int, int]:
+    """Turn a POST_SPECS length string like '50-150 words (...)' into (50, 150)."""
+    match = re.search(r'(\d+)\s*-\s*(\d+)', length_spec)
+    if not match:
+        return (50, 300)
+    return (int(match.group(1)), int(match.group(2)))
+
+
+WORD_RANGES = {post_type: parse_word_range(spec["length"]) for post_type, spec in POST_SPECS.items()}
+
+
+class QualityScorer:
+    """
+    Vectorized scorer that writes results back to Post.score.
+
+    Posts scoring below `reject_below` are considered off-spec and should not
+    be turned into GitHub issues.
+    """
+
+    def __init__(
+        self,
+        known_names: Optional[List[str]] = None,
+        reject_below: float = 0.5,
+        weights: Optional[Dict[str, float]] = None,
+        hash_dims: int = 4096,
+        density_target: float = 4.0,
+        similarity_target: float = 0.3
+    ):
+        self.known_names = {n.lower() for n in (known_names or [])}
+        self.reject_below = reject_below
+        self.weights = weights or {"length": 0.35, "density": 0.25, "header": 0.2, "similarity": 0.2}
+        self.hash_dims = hash_dims
+        self.density_target = density_target  # entities per 100 words that counts as "dense"
+        self.similarity_target = similarity_target  # cosine that counts as "on scenario"
+
+    def score_posts(self, posts: List[Post], scenarios: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Score a batch of posts and write the result to each Post.score.
+
+        Args:
+            posts: Posts to score
+            scenarios: Scenario text per post (defaults to post.metadata["scenario"])
+
+        Returns:
+            Array of final scores, one per post
+        """
+        if not posts:
+            return np.zeros(0)
+
+        if scenarios is None:
+            scenarios = [(p.metadata or {}).get("scenario", "") for p in posts]
+
+        components = {
+            "length": self._length_scores(posts),
+            "density": self._density_scores(posts),
+            "header": self._header_scores(posts),
+            "similarity": self._similarity_scores([p.content for p in posts], scenarios),
+        }
+
+        total_weight = sum(self.weights.values())
+        scores = sum(self.weights[name] * values for name, values in components.items()) / total_weight
+
+        for i, post in enumerate(posts):
+            post.score = round(float(scores[i]), 4)
+            post.metadata = post.metadata or {}
+            post.metadata["quality"] = {name: round(float(values[i]), 4) for name, values in components.items()}
+
+        return scores
+
+    def partition(self, posts: List[Post]) -> Tuple[List[Post], List[Post]]:
+        """Split already-scored posts into (accepted, rejected)."""
+        accepted, rejected = [], []
+        for post in posts:
+            (accepted if post.score >= self.reject_below else rejected).append(post)
+        return accepted, rejected
+
+    def _length_scores(self, posts: List[Post]) -> np.ndarray:
+        words = np.array([len(p.content.split()) for p in posts], dtype=float)
+        ranges = np.array([WORD_RANGES.get(p.post_type, WORD_RANGES["social"]) for p in posts], dtype=float)
+        low, high = ranges[:, 0], ranges[:, 1]
+
+        # Full marks inside the range, linear falloff to 0 one range-width outside it
+        distance = np.maximum(low - words, 0) + np.maximum(words - high, 0)
+        return np.clip(1.0 - distance / (high - low), 0.0, 1.0)
+
+    def _density_scores(self, posts: List[Post]) -> np.ndarray:
+        counts = np.zeros((len(posts), 3))
+        words = np.zeros(len(posts))
+
+        for i, post in enumerate(posts):
+            text = post.content
+            tokens = WORD_PATTERN.findall(text.lower())
+            words[i] = len(tokens)
+
+            capitalized = {w.lower() for w in CAPITALIZED_PATTERN.findall(text)}
+            counts[i, 0] = len(capitalized & self.known_names) + len(capitalized - self.known_names - PLACE_WORDS)
+            counts[i, 1] = sum(1 for t in tokens if t in PLACE_WORDS)
+            counts[i, 2] = len(TIME_PATTERN.findall(text))
+
+        per_100_words = counts.sum(axis=1) / np.maximum(words, 1) * 100
+        # People, places and times each matter; every missing category costs a sixth
+        coverage = (counts > 0).mean(axis=1)
+        return np.clip(per_100_words / self.density_target, 0.0, 1.0) * (0.5 + 0.5 * coverage)
+
+    def _header_scores(self, posts: List[Post]) -> np.ndarray:
+        found = np.zeros((len(posts), len(HEADER_FIELDS)))
+        for i, post in enumerate(posts):
+            fields = (post.metadata or {}).get("format_header")
+            if fields is None:
+                # Older drafts predate header tracking; check the stored content instead
+                fields = [
+                    name for name, pattern in (
+                        ("timestamp", r'\[\d{2}:\d{2}\]'),
+                        ("network_location", r'campus\.lan/boards/'),
+                        ("encryption", r'encryption:'),
+                        ("user", r'^user:'),
+                    ) if re.search(pattern, post.content, re.MULTILINE | re.IGNORECASE)
+                ]
+            for j, name in enumerate(HEADER_FIELDS):
+                found[i, j] = name in fields
+        return found.mean(axis=1)
+
+    def _similarity_scores(self, texts: List[str], scenarios: List[str]) -> np.ndarray:
+        post_vecs = self._hash_vectors(texts)
+        scenario_vecs = self._hash_vectors(scenarios)
+        cosine = np.einsum("ij,ij->i", post_vecs, scenario_vecs)
+        return np.clip(cosine / self.similarity_target, 0.0, 1.0)
+
+    def _hash_vectors(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized hashed term-frequency vectors, one row per text."""
+        matrix = np.zeros((len(texts), self.hash_dims), dtype=np.float32)
+        for i, text in enumerate(texts):
+            tokens = [t for t in WORD_PATTERN.findall((text or "").lower()) if len(t) > 3]
+            if tokens:
+                buckets = [zlib.crc32(t.encode()) % self.hash_dims for t in tokens]
+                np.add.at(matrix[i], buckets, 1.0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+
+def save_rejected_posts(posts: List[Post], output_dir: str = "./content/rejected") -> Optional[str]:
+    """Write automatically rejected posts (with their quality breakdown) for later inspection."""
+    if not posts:
+        return None
+
+    output_file = Path(output_dir) / f"quality_rejected_{datetime.now().isoformat()}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_file, 'w') as f:
+        json.dump({
+            "rejected_at": datetime.now().isoformat(),
+            "reason": "quality_score",
+            "posts": [p.to_dict() for p in posts],
+            "total_posts": len(posts)
+        }, f, indent=2, default=str)
+
+    print(f"✗ Rejected {len(posts)} off-spec posts → {output_file}")
+    return str(output_file)
+
+
+def load_draft_posts(drafts_dir: str = "./content/drafts") -> List[Post]:
+    """Load every post from saved per-character draft files."""
+    posts = []
+    for draft_file in sorted(Path(drafts_dir).glob("*.json")):
+        with open(draft_file) as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or "posts" not in data:
+            continue  # issue manifests
+        posts.extend(Post(**p) for p in data["posts"])
+    return posts
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.quality_scorer
+    posts = load_draft_posts()
+    scorer = QualityScorer(known_names=[p.character_name for p in posts])
+    scores = scorer.score_posts(posts)
+    for post, score in sorted(zip(posts, scores), key=lambda x: x[1]):
+        flag = "✗" if score < scorer.reject_below else "✓"
+        print(f"{flag} {score:.2f}  {post.character_name:10} {post.post_type:10} {post.metadata['quality']}")
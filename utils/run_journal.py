@@ -0,0 +1,119 @@
+"""
+Write-ahead run journal for resumable generation runs.
+
+Every completed (run, scene, character, post_type) cell is appended and
+fsync'd the moment its post is parsed, so a crash or Ctrl-C only loses the
+calls that were in flight. `--resume` replays the journal: completed cells
+are skipped and their posts are restored before drafts and the manifest are
+rebuilt. A finished run ends with a completion entry and is never resumed,
+since its drafts were already saved.
+
+Journal files: ./content/journal/<script>-<timestamp>.jsonl
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from agents.base.character_agent import Post
+
+Cell = Tuple[str, str, str]  # (scene, character, post_type)
+
+
+class RunJournal:
+    """Append-only, fsync-per-entry log of completed generation cells."""
+
+    def __init__(self, run_id: str, journal_dir: str = "./content/journal"):
+        self.run_id = run_id
+        self.path = Path(journal_dir) / f"{run_id}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._entries: Dict[Cell, Dict] = {}
+        self.completed_at: Optional[str] = None  # set once the run saved its drafts
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash mid-write
+                    if entry.get("event") == "run_completed":
+                        self.completed_at = entry["completed_at"]
+                        continue
+                    self._entries[(entry["scene"], entry["character"], entry["post_type"])] = entry
+
+    @classmethod
+    def start(cls, script: str, journal_dir: str = "./content/journal") -> "RunJournal":
+        """Begin a fresh run journal for a script."""
+        run_id = f"{script}-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        suffix = 1
+        while (Path(journal_dir) / f"{run_id}.jsonl").exists():  # another run started this second
+            suffix += 1
+            run_id = f"{script}-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{suffix}"
+        return cls(run_id, journal_dir)
+
+    @classmethod
+    def resume(cls, script: str, run_id: str = "latest", journal_dir: str = "./content/journal") -> "RunJournal":
+        """Reopen a run journal by id, or the newest one for this script."""
+        if run_id != "latest":
+            return cls(run_id, journal_dir)
+
+        journals = sorted(Path(journal_dir).glob(f"{script}-*.jsonl"), key=lambda path: path.stem)
+        if not journals:
+            print(f"No journal for {script} in {journal_dir}; starting a fresh run")
+            return cls.start(script, journal_dir)
+        latest = cls(journals[-1].stem, journal_dir)
+        if latest.completed_at:
+            print(f"Latest run {latest.run_id} already completed; starting a fresh run")
+            return cls.start(script, journal_dir)
+        return latest
+
+    def record(self, scene: str, character: str, post_type: str, post: Post):
+        """Durably record one completed cell."""
+        entry = {
+            "run_id": self.run_id,
+            "scene": scene,
+            "character": character,
+            "post_type": post_type,
+            "completed_at": datetime.now().isoformat(),
+            "post": post.to_dict(),
+        }
+        with self._lock:
+            self._append(entry)
+            self._entries[(scene, character, post_type)] = entry
+
+    def complete(self):
+        """Mark the run finished once its drafts are saved, so it is never resumed and re-saved."""
+        entry = {"run_id": self.run_id, "event": "run_completed", "completed_at": datetime.now().isoformat()}
+        with self._lock:
+            self._append(entry)
+            self.completed_at = entry["completed_at"]
+
+    def _append(self, entry: Dict):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def is_done(self, scene: str, character: str, post_type: str) -> bool:
+        return (scene, character, post_type) in self._entries
+
+    def completed_cells(self) -> Set[Cell]:
+        return set(self._entries)
+
+    def posts(self) -> List[Tuple[Cell, Post]]:
+        """Completed posts in journal order."""
+        return [(cell, Post(**entry["post"])) for cell, entry in self._entries.items()]
+
+    def posts_by_character(self) -> Dict[str, List[Post]]:
+        grouped: Dict[str, List[Post]] = {}
+        for (_, character, _), post in self.posts():
+            grouped.setdefault(character, []).append(post)
+        return grouped
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,58 @@
+"""
+Scene definitions shared by the generation daemon and scheduled loops.
+
+A scene file (./content/scenes/<id>.json) uses the same shape as the scenes
+in phase0_setup.py, plus an id and optional post types:
+
+    {
+      "id": "rescue_in_the_woods",
+      "title": "Rescue in the Woods",
+      "time": "June 3, 2025, 3:00 PM",
+      "date": "2025-06-03",
+      "description": "SCENE: ...",
+      "character_directions": {"Chris": "...", "Tria": "..."},
+      "post_types": ["social", "blog"]
+    }
+"""
+
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils.story_timeline import parse_story_time
+
+DEFAULT_POST_TYPES = ["social", "blog"]
+
+
+def load_scene(path: str) -> Dict:
+    """Load a scene file, filling in id and post_types defaults."""
+    path = Path(path)
+    with open(path) as f:
+        scene = json.load(f)
+    scene.setdefault("id", path.stem)
+    scene.setdefault("post_types", list(DEFAULT_POST_TYPES))
+    scene.setdefault("character_directions", {})
+    return scene
+
+
+def load_scenes(scenes_dir: str = "./content/scenes") -> List[Dict]:
+    return [load_scene(p) for p in sorted(Path(scenes_dir).glob("*.json"))]
+
+
+def scene_time(scene: Dict) -> Optional[datetime]:
+    """Story time the scene starts at (its `time` field), if parseable."""
+    return parse_story_time(scene.get("time", ""))
+
+
+def build_character_scenario(scene: Dict, char_name: str, character_data: Dict) -> str:
+    """Character-specific scenario text, as built in phase0_setup.py."""
+    char_direction = scene.get("character_directions", {}).get(char_name, "")
+    return f"""{scene['description']}
+
+{char_direction}
+
+{character_data.get('voice_notes', '')}
+
+Remember: Report what you personally experienced. Name specific people, moments, decisions.
+This post is part of the permanent record of what happened."""
@@ -0,0 +1,221 @@
+"""
+SQLite FTS5 search over drafts, approved, published and rejected posts.
+
+Posts are upserted by post_id into a `posts` table with an external-content
+FTS5 index over content and scenario. Source files are tracked by mtime, so
+re-indexing after a save only reads the files that changed. Queries return
+bm25-ranked results with highlighted snippets, plus facet counts on
+character, post_type, location, encryption and approval state.
+
+Index file: ./data/indexes/search.db
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from agents.base.character_agent import Post
+
+# content/ subdirectory -> approval state
+STATES = {
+    "drafts": "draft",
+    "approved": "approved",
+    "published": "published",
+    "rejected": "rejected",
+}
+# Later states win when the same post is saved more than once
+STATE_RANK = {"draft": 0, "rejected": 1, "approved": 2, "published": 3}
+FACETS = ("character", "post_type", "location", "encryption", "state")
+
+
+def _rank_sql(column: str) -> str:
+    return f"CASE {column} " + " ".join(f"WHEN '{s}' THEN {r}" for s, r in STATE_RANK.items()) + " ELSE -1 END"
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    rowid INTEGER PRIMARY KEY,
+    post_id TEXT UNIQUE NOT NULL,
+    character TEXT,
+    post_type TEXT,
+    location TEXT,
+    encryption TEXT,
+    state TEXT,
+    timestamp TEXT,
+    score REAL,
+    source TEXT,
+    content TEXT,
+    scenario TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_character ON posts(character);
+CREATE INDEX IF NOT EXISTS posts_state ON posts(state);
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    content, scenario, content='posts', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts(rowid, content, scenario) VALUES (new.rowid, new.content, new.scenario);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, content, scenario) VALUES ('delete', old.rowid, old.content, old.scenario);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, content, scenario) VALUES ('delete', old.rowid, old.content, old.scenario);
+    INSERT INTO posts_fts(rowid, content, scenario) VALUES (new.rowid, new.content, new.scenario);
+END;
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+"""
+
+
+def posts_in_file(path: Path) -> List[Post]:
+    """Posts in a saved file: per-character draft files, rejected batches, or single posts."""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "posts" in data:
+        records = data["posts"]
+    elif isinstance(data, dict) and "content" in data and "character_name" in data:
+        records = [data]
+    elif isinstance(data, list) and all(isinstance(r, dict) and "character_name" in r for r in data):
+        records = data
+    else:
+        return []  # issue manifests and other artifacts
+    return [Post(**{k: v for k, v in r.items() if k in Post.__dataclass_fields__}) for r in records]
+
+
+class SearchIndex:
+    """Incremental full-text index of every saved post."""
+
+    def __init__(self, path: str = "./data/indexes/search.db"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def add_posts(self, posts: Iterable[Post], state: str = "draft", source: str = "") -> int:
+        """Upsert posts by post_id; a copy in a lower state than the indexed row is ignored."""
+        rows = [(
+            post.post_id, post.character_name, post.post_type, post.location, post.encryption,
+            "approved" if post.approved and state == "draft" else state,
+            post.timestamp, post.score, source, post.content,
+            (post.metadata or {}).get("scenario", ""),
+        ) for post in posts]
+        with self.db:
+            self.db.executemany(f"""
+                INSERT INTO posts (post_id, character, post_type, location, encryption, state,
+                                   timestamp, score, source, content, scenario)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(post_id) DO UPDATE SET
+                    character=excluded.character, post_type=excluded.post_type,
+                    location=excluded.location, encryption=excluded.encryption,
+                    state=excluded.state, timestamp=excluded.timestamp, score=excluded.score,
+                    source=excluded.source, content=excluded.content, scenario=excluded.scenario
+                WHERE {_rank_sql("excluded.state")} >= {_rank_sql("posts.state")}
+            """, rows)
+        return len(rows)
+
+    def index_file(self, path: str, state: str = "draft", force: bool = False) -> int:
+        """Index one saved file if it changed since it was last indexed."""
+        path = Path(path)
+        mtime = path.stat().st_mtime
+        known = self.db.execute("SELECT mtime FROM files WHERE path = ?", (str(path),)).fetchone()
+        if known and known["mtime"] >= mtime and not force:
+            return 0
+
+        added = self.add_posts(posts_in_file(path), state=state, source=str(path))
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO files (path, mtime) VALUES (?, ?)", (str(path), mtime))
+        return added
+
+    def index_content(self, content_dir: str = "./content") -> int:
+        """Index new or changed files under content/{drafts,approved,published,rejected}."""
+        self._drop_missing_sources()
+        added = 0
+        for subdir, state in STATES.items():
+            for path in sorted((Path(content_dir) / subdir).glob("**/*.json")):
+                added += self.index_file(str(path), state)
+        return added
+
+    def _drop_missing_sources(self) -> int:
+        """Remove posts whose source file was deleted; returns the number removed."""
+        missing = [row["path"] for row in self.db.execute("SELECT path FROM files") if not Path(row["path"]).exists()]
+        if not missing:
+            return 0
+        with self.db:
+            removed = sum(self.db.execute("DELETE FROM posts WHERE source = ?", (path,)).rowcount for path in missing)
+            self.db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in missing])
+            if removed:
+                # A dropped post may still be saved elsewhere (its draft after the approved copy
+                # was deleted), so forget mtimes and let this scan re-read every file once
+                self.db.execute("DELETE FROM files")
+        return removed
+
+    @staticmethod
+    def _filters(filters: Dict[str, Optional[str]]):
+        clauses, params = [], []
+        for column in FACETS:
+            value = filters.get(column)
+            if value:
+                clauses.append(f"p.{column} = ?")
+                params.append(value)
+        return clauses, params
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, **filters) -> List[Dict]:
+        """
+        Ranked full-text search. Filters: character, post_type, location,
+        encryption, state. An empty query lists newest matches by filter only.
+        """
+        clauses, params = self._filters(filters)
+        if query:
+            sql = f"""
+                SELECT p.post_id, p.character, p.post_type, p.location, p.encryption, p.state,
+                       p.timestamp, p.score, p.source,
+                       snippet(posts_fts, 0, '[', ']', '…', 16) AS snippet,
+                       bm25(posts_fts, 1.0, 0.3) AS rank
+                FROM posts_fts JOIN posts p ON p.rowid = posts_fts.rowid
+                WHERE posts_fts MATCH ? {''.join(' AND ' + c for c in clauses)}
+                ORDER BY rank LIMIT ? OFFSET ?
+            """
+            params = [query] + params
+        else:
+            sql = f"""
+                SELECT p.post_id, p.character, p.post_type, p.location, p.encryption, p.state,
+                       p.timestamp, p.score, p.source, substr(p.content, 1, 160) AS snippet, 0 AS rank
+                FROM posts p {'WHERE ' + ' AND '.join(clauses) if clauses else ''}
+                ORDER BY p.timestamp DESC LIMIT ? OFFSET ?
+            """
+        rows = self.db.execute(sql, params + [limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def facets(self, query: str = "", **filters) -> Dict[str, Dict[str, int]]:
+        """Counts per facet value over everything matching the query and filters."""
+        clauses, params = self._filters(filters)
+        if query:
+            source = "posts_fts JOIN posts p ON p.rowid = posts_fts.rowid"
+            clauses = ["posts_fts MATCH ?"] + clauses
+            params = [query] + params
+        else:
+            source = "posts p"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        result = {}
+        for column in FACETS:
+            rows = self.db.execute(
+                f"SELECT p.{column} AS value, COUNT(*) AS n FROM {source} {where} "
+                f"GROUP BY p.{column} ORDER BY n DESC", params
+            ).fetchall()
+            result[column] = {row["value"]: row["n"] for row in rows}
+        return result
+
+    def get(self, post_id: str) -> Optional[Dict]:
+        row = self.db.execute("SELECT * FROM posts WHERE post_id = ?", (post_id,)).fetchone()
+        return dict(row) if row else None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
@@ -0,0 +1,235 @@
+"""
+Time-indexed story timeline built from the Novel Crafter export.
+
+The export carries in-world posts as codex entries ending in a byline such as
+"Posted by Tria, 03 June 2025, 2:30 PM". Each becomes a StoryEvent; events are
+kept sorted by datetime with per-character index lists, so "what had Chris
+witnessed or heard about before 2:00 PM" is a bisect, O(log n) + results.
+
+A character *witnessed* an event they wrote or are named in; they *heard
+about* public events (everything posted to the open network) and events
+involving their codex connections.
+
+Timeline file: ./data/story_timeline.json
+"""
+
+import re
+import json
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Optional
+
+BYLINE_PATTERN = re.compile(
+    r"Posted by ([A-Z][\w'-]*(?: [A-Z][\w'-]*)?),\s*(\d{1,2} \w+ \d{4}),\s*(\d{1,2}:\d{2}\s*[AP]M)"
+)
+SIGNOFF_PATTERN = re.compile(r"^([A-Z][\w'-]*),\s*Signing Off", re.MULTILINE)
+DATELINE_PATTERN = re.compile(r"(\d{1,2} \w+ \d{4}),\s*(\d{1,2}:\d{2}\s*[AP]M)")
+# Scene times as written in the phase0 scripts, e.g. "June 3, 2025, 2:45-6:00 PM"
+SCENE_TIME_PATTERN = re.compile(r"(\w+ \d{1,2}, \d{4}),\s*(\d{1,2}:\d{2})(?:\s*-\s*\d{1,2}:\d{2})?\s*([AP]M)")
+MENTION_PATTERN = re.compile(r"@(\w+)")
+
+
+def parse_story_time(text: str) -> Optional[datetime]:
+    """Parse an export byline time ("03 June 2025, 2:30 PM") or scene time ("June 3, 2025, 1:17 PM")."""
+    match = DATELINE_PATTERN.search(text)
+    if match:
+        return datetime.strptime(f"{match.group(1)} {match.group(2).replace(' ', '')}", "%d %B %Y %I:%M%p")
+    match = SCENE_TIME_PATTERN.search(text)
+    if match:
+        # A range ("2:45-6:00 PM") starts at its first time
+        return datetime.strptime(f"{match.group(1)} {match.group(2)}{match.group(3)}", "%B %d, %Y %I:%M%p")
+    return None
+
+
+@dataclass
+class StoryEvent:
+    """One dated in-world event (usually a post from the export)."""
+    when: datetime
+    author: str
+    title: str
+    summary: str
+    characters: List[str] = field(default_factory=list)  # author + named characters (witnesses)
+    public: bool = True
+    source: str = ""
+
+    @property
+    def event_id(self) -> str:
+        return f"{self.when.isoformat(timespec='minutes')} {self.author}"
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["when"] = self.when.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "StoryEvent":
+        return cls(**{**data, "when": datetime.fromisoformat(data["when"])})
+
+    def prompt_line(self, max_chars: int = 160) -> str:
+        summary = " ".join(self.summary.split())
+        if len(summary) > max_chars:
+            summary = summary[:max_chars].rsplit(" ", 1)[0] + "..."
+        return f"- {self.when.strftime('%d %b %I:%M %p')} | {self.author}: {summary}"
+
+
+def is_story_entry(body: str) -> bool:
+    """True for export entries that are in-world posts rather than character sheets."""
+    return bool(BYLINE_PATTERN.search(body) or (SIGNOFF_PATTERN.search(body) and DATELINE_PATTERN.search(body)))
+
+
+def parse_export_entry(body: str, title: str, known_names: Iterable[str]) -> Optional[StoryEvent]:
+    """
+    Turn an in-world post from the export into a StoryEvent, or None if the
+    entry has no byline/dateline (i.e. it is a real character entry).
+    """
+    byline = BYLINE_PATTERN.search(body)
+    if byline:
+        author = byline.group(1)
+        when = parse_story_time(f"{byline.group(2)}, {byline.group(3)}")
+        text = body[:byline.start()]
+    else:
+        signoff = SIGNOFF_PATTERN.search(body)
+        dateline = DATELINE_PATTERN.search(body)
+        if not (signoff and dateline):
+            return None
+        author = signoff.group(1)
+        when = parse_story_time(dateline.group(0))
+        text = body[:signoff.start()]
+
+    text = text.strip().strip('"“”').strip()
+    mentioned = set(MENTION_PATTERN.findall(text))
+    characters = [author] + sorted(
+        name for name in known_names
+        if name != author and (name in mentioned or re.search(rf"\b{re.escape(name)}\b", text))
+    )
+    return StoryEvent(when=when, author=author, title=title, summary=text, characters=characters)
+
+
+class StoryTimeline:
+    """Events sorted by datetime, with per-character index lists for bisect queries."""
+
+    def __init__(self, events: Iterable[StoryEvent] = (), connections: Optional[Dict[str, List[str]]] = None):
+        self.connections = connections or {}
+        self.events: List[StoryEvent] = []
+        self._times: List[datetime] = []
+        self._public: List[int] = []  # positions of public events
+        self._witnessed: Dict[str, List[int]] = {}
+        self._heard: Dict[str, List[int]] = {}  # non-public events involving a connection
+        for event in events:
+            self.add(event)
+
+    def add(self, event: StoryEvent):
+        """Insert an event, keeping every index sorted by time."""
+        position = bisect_right(self._times, event.when)
+        if position < len(self.events):
+            # Positions shift; rebuilding is cheap at export sizes and keeps indexes simple
+            self.events.insert(position, event)
+            self._reindex()
+            return
+
+        self.events.append(event)
+        self._times.append(event.when)
+        self._index(position, event)
+
+    def _reindex(self):
+        self._times = [e.when for e in self.events]
+        self._public, self._witnessed, self._heard = [], {}, {}
+        for position, event in enumerate(self.events):
+            self._index(position, event)
+
+    def _index(self, position: int, event: StoryEvent):
+        if event.public:
+            self._public.append(position)
+        for name in event.characters:
+            self._witnessed.setdefault(name, []).append(position)
+        if not event.public:
+            for name, known in self.connections.items():
+                if name not in event.characters and set(known) & set(event.characters):
+                    self._heard.setdefault(name, []).append(position)
+
+    @staticmethod
+    def _before(positions: List[int], limit_position: int) -> List[int]:
+        return positions[:bisect_left(positions, limit_position)]
+
+    def _positions_before(self, as_of: datetime, character: Optional[str],
+                          include_heard: bool, limit: Optional[int]) -> List[int]:
+        cutoff = bisect_left(self._times, as_of)
+        if character is None:
+            positions = list(range(cutoff))
+        else:
+            sources = [self._before(self._witnessed.get(character, []), cutoff)]
+            if include_heard:
+                sources.append(self._before(self._public, cutoff))
+                sources.append(self._before(self._heard.get(character, []), cutoff))
+            positions = sorted(set().union(*sources))
+
+        if limit is not None:
+            positions = positions[-limit:] if limit else []
+        return positions
+
+    def events_before(
+        self,
+        as_of: datetime,
+        character: Optional[str] = None,
+        include_heard: bool = True,
+        limit: Optional[int] = None
+    ) -> List[StoryEvent]:
+        """
+        Events strictly before `as_of`, oldest first. With a character, only
+        events they witnessed (and, if include_heard, heard about).
+        `limit` keeps the most recent N.
+        """
+        return [self.events[i] for i in self._positions_before(as_of, character, include_heard, limit)]
+
+    def witnessed_by(self, character: str) -> List[StoryEvent]:
+        return [self.events[i] for i in self._witnessed.get(character, [])]
+
+    def knowledge_scope(self, character: str) -> Dict[str, List[str]]:
+        """Event ids a character witnessed vs. heard about (for Character.knowledge_scope)."""
+        witnessed = set(self._witnessed.get(character, []))
+        heard = (set(self._public) | set(self._heard.get(character, []))) - witnessed
+        return {
+            "witnessed": [self.events[i].event_id for i in sorted(witnessed)],
+            "heard_about": [self.events[i].event_id for i in sorted(heard)],
+        }
+
+    def prompt_context(self, character: str, as_of: datetime, limit: int = 8) -> str:
+        """Bounded, time-correct event list for an agent prompt ('' if nothing is known yet)."""
+        positions = self._positions_before(as_of, character, include_heard=True, limit=limit)
+        witnessed = set(self._witnessed.get(character, []))
+        lines = []
+        for i in positions:
+            marker = "(you were there)" if i in witnessed else "(seen on the network)"
+            lines.append(f"{self.events[i].prompt_line()} {marker}")
+        return "\n".join(lines)
+
+    def to_dicts(self) -> List[Dict]:
+        return [e.to_dict() for e in self.events]
+
+    def save(self, path: str = "./data/story_timeline.json"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "connections": self.connections,
+                "events": self.to_dicts(),
+            }, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path: str = "./data/story_timeline.json") -> "StoryTimeline":
+        if not Path(path).exists():
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        return cls((StoryEvent.from_dict(e) for e in data["events"]), data.get("connections"))
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.story_timeline
+    timeline = StoryTimeline.load()
+    for event in timeline.events:
+        print(f"{event.when:%Y-%m-%d %H:%M}  {event.author:10} {', '.join(event.characters)}")
+        print(f"    {event.prompt_line(100)[2:]}")
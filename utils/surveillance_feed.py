@@ -0,0 +1,311 @@
+"""
+Procedural surveillance and sensor feed ("surveillance" post type).
+
+Camera logs and the "Mechanical Bugs" sensor network (docs/CONTENT_TYPES.md)
+are structured telemetry, so they are generated here rather than by model
+calls. For every device and tick in a story-time window, timestamps and
+readings are produced as NumPy arrays in one pass:
+
+- baselines with a diurnal cycle and AR(1) noise per device
+- activity bumps around timeline events, strongest at devices whose place
+  the event mentions, weaker campus-wide
+- anomaly masks (z-score for sensors, heat-signature counts for cameras)
+  and occasional corrupted readings
+
+Each device's anomalous report windows become Post objects in the usual
+schema. Only the short "System note:" annotations on the most eventful
+reports go through CharacterAgent (post type "annotation").
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime, timedelta
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from scipy.signal import lfilter
+
+from agents.base.character_agent import Post
+from utils.story_timeline import StoryEvent, StoryTimeline
+
+# Physical place -> device id prefix
+DEFAULT_PLACES = {
+    "north entrance": "NORTH_ENTRANCE",
+    "south field": "SOUTH_FIELD",
+    "library": "LIBRARY",
+    "gym": "GYM",
+    "server room": "SERVER_ROOM",
+    "commons": "COMMONS",
+    "board room": "BOARD_ROOM",
+    "Student Housing Block A": "HOUSING_A",
+    "Student Union": "STUDENT_UNION",
+    "woods": "WOODS",
+}
+
+# Sensor channels: (baseline, noise sd, diurnal amplitude, event amplitude, format)
+SENSOR_CHANNELS = {
+    "co2_ppm": (410.0, 12.0, 15.0, 240.0, "{:.0f}"),
+    "particles_cm3": (1200.0, 90.0, 150.0, 3800.0, "{:.0f}"),
+    "sound_db": (38.0, 2.5, 6.0, 28.0, "{:.1f}"),
+    "temp_c": (17.0, 0.4, 4.0, 1.5, "{:.1f}"),
+}
+CAMERA_CLASSIFICATIONS = ("thermal_imaging", "optical_lowlight")
+
+AUTHORS = {"camera": "Surveillance System", "sensor": "Sensor Network"}
+HEADERS = {"camera": "[SURVEILLANCE LOG - AUTOMATED]", "sensor": "[SENSOR NETWORK REPORT]"}
+
+# Codex-style character data for the agent that writes annotations
+SYSTEM_CHARACTER = {
+    "background": "Akima University's automated campus monitoring system: cameras, access control "
+                  "and a distributed mesh of sensor 'bugs'.",
+    "motivations": "Log, classify, flag. No opinions.",
+    "tags": ["system", "surveillance"],
+    "social_position": "infrastructure",
+    "aesthetic_lean": "100% cyberpunk",
+    "voice_notes": "Clinical, emotionless, terse machine register; sometimes glitches mid-sentence",
+}
+
+
+@dataclass
+class Device:
+    device_id: str
+    kind: str            # "camera" | "sensor"
+    place: str
+    classification: str
+
+
+def build_devices(places: Dict[str, str] = None, cameras_per_place: int = 2,
+                  sensors_per_place: int = 1) -> List[Device]:
+    devices = []
+    for place, prefix in (places or DEFAULT_PLACES).items():
+        for i in range(cameras_per_place):
+            devices.append(Device(f"{prefix}_CAM_{i + 1:02d}", "camera", place,
+                                  CAMERA_CLASSIFICATIONS[i % len(CAMERA_CLASSIFICATIONS)]))
+        for i in range(sensors_per_place):
+            devices.append(Device(f"BUG_CLUSTER_{prefix}_{i + 1:02d}", "sensor", place, "ambient_sensing"))
+    return devices
+
+
+class SurveillanceFeed:
+    """Vectorized telemetry for every device over a story-time window."""
+
+    def __init__(
+        self,
+        timeline: Optional[StoryTimeline] = None,
+        places: Dict[str, str] = None,
+        cameras_per_place: int = 2,
+        sensors_per_place: int = 1,
+        interval_seconds: int = 60,
+        event_sigma_minutes: float = 15.0,
+        seed: Optional[int] = None
+    ):
+        self.timeline = timeline or StoryTimeline()
+        self.devices = build_devices(places, cameras_per_place, sensors_per_place)
+        self.interval = interval_seconds
+        self.event_sigma = event_sigma_minutes * 60
+        self.rng = np.random.default_rng(seed)
+        self._is_camera = np.array([d.kind == "camera" for d in self.devices])
+
+    def _events(self, start: datetime, end: datetime) -> List[StoryEvent]:
+        margin = timedelta(seconds=3 * self.event_sigma)
+        return [e for e in self.timeline.events if start - margin <= e.when <= end + margin]
+
+    def _activity(self, seconds: np.ndarray, start: datetime, events: List[StoryEvent]) -> np.ndarray:
+        """Device x tick activity in [0, ~1]: Gaussian bumps around events, weighted by place."""
+        if not events:
+            return np.zeros(seconds.shape)
+        text = [f"{e.title} {e.summary}".lower() for e in events]
+        weights = np.array([[1.0 if d.place.lower() in t else 0.25 for t in text] for d in self.devices])  # D x E
+        activity = np.zeros(seconds.shape)
+        for e, event in enumerate(events):  # one D x T pass per event keeps memory flat on long windows
+            offset = (event.when - start).total_seconds()
+            activity += weights[:, e:e + 1] * np.exp(-0.5 * ((seconds - offset) / self.event_sigma) ** 2)
+        return activity
+
+    def readings(self, start: datetime, end: datetime) -> Dict[str, np.ndarray]:
+        """
+        Readings for every device and tick in [start, end).
+
+        Returns:
+            Arrays shaped (devices, ticks): "seconds" (offset from start),
+            one per sensor channel, "heat" and "motion_s" for cameras,
+            plus "activity", "anomaly" and "corrupted" masks
+        """
+        ticks = max(1, int((end - start).total_seconds() // self.interval))
+        n = len(self.devices)
+        seconds = np.arange(ticks) * self.interval + self.rng.uniform(0, self.interval, (n, ticks))
+        events = self._events(start, end)
+        activity = self._activity(seconds, start, events)
+
+        start_hour = start.hour + start.minute / 60
+        hours = (start_hour + seconds / 3600) % 24
+        diurnal = np.sin((hours - 9) / 24 * 2 * np.pi)  # peaks mid-afternoon
+
+        out = {"seconds": seconds, "activity": activity}
+        zscores = np.zeros((n, ticks))
+        for channel, (baseline, sd, daily, bump, _) in SENSOR_CHANNELS.items():
+            noise = lfilter([1.0], [1.0, -0.8], self.rng.normal(0, sd * 0.6, (n, ticks)), axis=1)
+            values = baseline + daily * diurnal + noise + bump * activity
+            out[channel] = values
+            zscores = np.maximum(zscores, (values - baseline - daily * diurnal) / sd)
+
+        expected = 0.05 + 0.4 * np.clip(diurnal, 0, None)  # ordinary foot traffic
+        out["heat"] = self.rng.poisson(expected + 6.0 * activity)
+        # Seconds of motion per person, about 2/3 of the tick on average and never more than all of it
+        motion = self.rng.gamma(2.0, self.interval / 3.0, (n, ticks)).clip(max=self.interval) * out["heat"]
+        out["motion_s"] = np.where(out["heat"] > 0, motion, 0.0)
+
+        heat_threshold = np.ceil(expected + 4 * np.sqrt(expected) + 2)
+        out["anomaly"] = np.where(self._is_camera[:, None], out["heat"] >= heat_threshold, zscores > 4.0)
+        out["corrupted"] = self.rng.random((n, ticks)) < 0.002
+        return out
+
+    def log_lines(self, start: datetime, end: datetime, data: Dict[str, np.ndarray] = None) -> Iterator[str]:
+        """Raw log lines for every device and tick, in device order."""
+        data = data or self.readings(start, end)
+        stamps = np.datetime_as_string(
+            np.datetime64(start, "s") + data["seconds"].astype("timedelta64[s]"), unit="s")
+        for d, device in enumerate(self.devices):
+            for t in range(stamps.shape[1]):
+                yield f"{stamps[d, t]} {device.device_id} {self._fields(device, data, d, t)}"
+
+    @staticmethod
+    def _fields(device: Device, data: Dict[str, np.ndarray], d: int, t: int) -> str:
+        if data["corrupted"][d, t]:
+            return "ERR 0x7FFF checksum mismatch [DATA CORRUPTED]"
+        if device.kind == "camera":
+            return (f"{device.classification} heat_signatures={data['heat'][d, t]} "
+                    f"motion_s={data['motion_s'][d, t]:.0f}")
+        return " ".join(f"{channel}={fmt.format(data[channel][d, t])}"
+                        for channel, (*_, fmt) in SENSOR_CHANNELS.items())
+
+    def posts(self, start: datetime, end: datetime, report_minutes: int = 60, max_lines: int = 8,
+              only_anomalous: bool = True, data: Dict[str, np.ndarray] = None) -> List[Post]:
+        """One report Post per device and report window (by default only windows with anomalies)."""
+        data = data or self.readings(start, end)
+        seconds = data["seconds"]
+        window = (seconds // (report_minutes * 60)).astype(int)
+        events = self._events(start, end)
+        posts = []
+        for d, device in enumerate(self.devices):
+            for w in np.unique(window[d]):
+                in_window = window[d] == w
+                anomalous = in_window & data["anomaly"][d]
+                if only_anomalous and not anomalous.any():
+                    continue
+                window_start = start + timedelta(minutes=int(w) * report_minutes)
+                window_end = min(end, window_start + timedelta(minutes=report_minutes))
+                posts.append(self._report(device, d, data, in_window, anomalous,
+                                          start, window_start, window_end, events, max_lines))
+        return posts
+
+    def _report(self, device: Device, d: int, data: Dict[str, np.ndarray], in_window: np.ndarray,
+                anomalous: np.ndarray, start: datetime, window_start: datetime, window_end: datetime,
+                events: List[StoryEvent], max_lines: int) -> Post:
+        ticks = np.flatnonzero(in_window)
+        flagged = np.flatnonzero(anomalous)
+        lines = [
+            HEADERS[device.kind],
+            f"timestamp: {window_end:%Y-%m-%d %H:%M}",
+            f"device_id: {device.device_id}",
+            f"{'classification' if device.kind == 'camera' else 'type'}: {device.classification}",
+            f"location: {device.place}",
+            "",
+        ]
+        if device.kind == "camera":
+            heat = data["heat"][d, ticks]
+            lines.append(f"Window {window_start:%H:%M}-{window_end:%H:%M}: {len(ticks)} frames sampled, "
+                         f"{int(heat.sum())} heat signatures (max {int(heat.max())} in frame), "
+                         f"motion {data['motion_s'][d, ticks].sum() / 60:.1f} min.")
+        else:
+            lines.append(f"Window {window_start:%H:%M}-{window_end:%H:%M} ({len(ticks)} samples):")
+            for channel, (baseline, *_) in SENSOR_CHANNELS.items():
+                values = data[channel][d, ticks]
+                lines.append(f"- {channel}: baseline {baseline:g} → mean {values.mean():.1f}, max {values.max():.1f}")
+
+        lines.append(f"Flagged readings: {len(flagged)}")
+        shown = flagged[:max_lines]
+        stamps = np.datetime_as_string(
+            np.datetime64(start, "s") + data["seconds"][d, shown].astype("timedelta64[s]"), unit="s")
+        for stamp, t in zip(stamps, shown):
+            lines.append(f"  {stamp} {self._fields(device, data, d, t)}")
+
+        reach = timedelta(seconds=3 * self.event_sigma)
+        nearby = [e for e in events if window_start - reach <= e.when <= window_end + reach]
+        content = "\n".join(lines)
+        return Post(
+            character_name=AUTHORS[device.kind],
+            content=content,
+            timestamp=f"{window_end:%Y-%m-%d %H:%M}",
+            location="surveillance",
+            encryption="encrypted" if device.kind == "camera" else "public",
+            post_type="surveillance",
+            metadata={
+                "generator": "procedural",
+                "device_id": device.device_id,
+                "device_kind": device.kind,
+                "place": device.place,
+                "window": [window_start.isoformat(), window_end.isoformat()],
+                "readings": int(len(ticks)),
+                "anomalies": int(len(flagged)),
+                "related_events": [e.event_id for e in nearby],
+                "as_of": window_end.isoformat(),
+                "signature": hashlib.sha256(content.encode()).hexdigest(),
+            },
+        )
+
+
+def annotate(posts: List[Post], agent, max_annotations: int = 5) -> int:
+    """
+    Append a model-written "System note:" to the most eventful reports.
+
+    Args:
+        posts: Reports from SurveillanceFeed.posts()
+        agent: CharacterAgent built from SYSTEM_CHARACTER
+        max_annotations: Model calls to spend (the rest stay purely procedural)
+
+    Returns:
+        Number of reports annotated
+    """
+    candidates = sorted(
+        (p for p in posts if p.metadata.get("related_events")),
+        key=lambda p: -p.metadata["anomalies"]
+    )[:max_annotations]
+
+    annotated = 0
+    for post in candidates:
+        scenario = f"""Write the "System note:" line for this automated log. State what the readings
+most likely indicate and any data inconsistency, in the system's clinical voice.
+Do not invent names; refer to people only as heat signatures or credentials.
+
+{post.content}"""
+        note = agent.generate_post(scenario=scenario, post_type="annotation", max_retries=1,
+                                   as_of=datetime.fromisoformat(post.metadata["as_of"]))
+        if note is None:
+            continue
+        post.content = f"{post.content}\n\nSystem note: {note.content.strip()}"
+        post.metadata["annotated"] = True
+        post.metadata["signature"] = hashlib.sha256(post.content.encode()).hexdigest()
+        annotated += 1
+    return annotated
+
+
+def save_feed_posts(posts: List[Post], output_dir: str = "./content/drafts") -> List[str]:
+    """Write reports to drafts, one file per system author, in the agents' draft format."""
+    files = []
+    stamp = datetime.now().isoformat()
+    for author in sorted({p.character_name for p in posts}):
+        own = [p for p in posts if p.character_name == author]
+        path = Path(output_dir) / f"{author.replace(' ', '_')}_{stamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "character": author,
+                "generated_at": stamp,
+                "posts": [p.to_dict() for p in own],
+                "total_posts": len(own),
+            }, f, indent=2, default=str)
+        files.append(str(path))
+    return files
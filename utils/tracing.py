@@ -0,0 +1,190 @@
+"""
+Lightweight per-stage tracing for generation runs.
+
+Spans wrap each stage (prompt build, process spawn, model wait, parse, JSON
+write, codex parsing) and carry character/post_type/attempt/bytes
+attributes. Child spans inherit their parent's attributes, so a
+`model_wait` span knows which character and attempt it belongs to.
+
+Tracing is off until configure() is called; disabled spans cost one
+attribute check.
+
+Outputs:
+    ./data/traces/<run_id>.jsonl   one JSON object per finished span
+    ./data/traces/<run_id>.prom    Prometheus textfile (histograms per stage)
+"""
+
+import json
+import time
+import threading
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Attributes passed down from a span to the spans opened inside it
+INHERITED_ATTRIBUTES = ("character", "post_type", "attempt", "scene")
+
+# Histogram buckets (seconds) - from sub-millisecond parsing up to full model calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+class Span:
+    """A single timed stage. Use set() to attach attributes known only at the end (e.g. bytes)."""
+
+    __slots__ = ("name", "attributes", "parent", "started", "duration")
+
+    def __init__(self, name: str, attributes: Dict, parent: Optional["Span"]):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.started = time.time()
+        self.duration = 0.0
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self, run_id: str) -> Dict:
+        return {
+            "run_id": run_id,
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "start": self.started,
+            "duration_ms": round(self.duration * 1000, 3),
+            **self.attributes
+        }
+
+
+class _NullSpan:
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects spans for one run and exports them as JSONL and Prometheus text."""
+
+    def __init__(self):
+        self.enabled = False
+        self.run_id = None
+        self.jsonl_path: Optional[Path] = None
+        self.spans: List[Dict] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stage_hook = None  # set by utils.profiling while --profile is on
+
+    def configure(self, run_id: str = None, trace_dir: str = "./data/traces"):
+        """Enable tracing; spans are appended to <trace_dir>/<run_id>.jsonl as they finish."""
+        self.run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.jsonl_path = Path(trace_dir) / f"{self.run_id}.jsonl"
+        self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+        self.spans = []
+        self.enabled = True
+        return self
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        if self.stage_hook is not None:
+            with self.stage_hook(name), self._span(name, attributes) as current:
+                yield current
+        else:
+            with self._span(name, attributes) as current:
+                yield current
+
+    @contextlib.contextmanager
+    def _span(self, name: str, attributes: Dict):
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        if parent:
+            inherited = {k: parent.attributes[k] for k in INHERITED_ATTRIBUTES if k in parent.attributes}
+            attributes = {**inherited, **attributes}
+
+        current = Span(name, attributes, parent)
+        stack.append(current)
+        started = time.perf_counter()
+        try:
+            yield current
+        except BaseException as e:
+            current.set(error=type(e).__name__)
+            raise
+        finally:
+            current.duration = time.perf_counter() - started
+            stack.pop()
+            self._record(current.to_dict(self.run_id))
+
+    def export_prometheus(self, path: str = None) -> str:
+        """Write per-stage latency histograms and byte counters in Prometheus textfile format."""
+        path = Path(path) if path else self.jsonl_path.with_suffix(".prom")
+        with self._lock:
+            spans = list(self.spans)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(prometheus_text(spans))
+        return str(path)
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, span: Dict):
+        line = json.dumps(span, default=str)
+        with self._lock:
+            self.spans.append(span)
+            with open(self.jsonl_path, 'a') as f:
+                f.write(line + "\n")
+
+
+def prometheus_text(spans: List[Dict]) -> str:
+    """Render span durations as `mfx_stage_duration_seconds` histograms."""
+    by_stage: Dict[str, List[Dict]] = {}
+    for span in spans:
+        by_stage.setdefault(span["name"], []).append(span)
+
+    lines = [
+        "# HELP mfx_stage_duration_seconds Duration of generation pipeline stages.",
+        "# TYPE mfx_stage_duration_seconds histogram",
+    ]
+    for stage, stage_spans in sorted(by_stage.items()):
+        durations = [s["duration_ms"] / 1000 for s in stage_spans]
+        for bucket in LATENCY_BUCKETS:
+            count = sum(1 for d in durations if d <= bucket)
+            lines.append(f'mfx_stage_duration_seconds_bucket{{stage="{stage}",le="{bucket}"}} {count}')
+        lines.append(f'mfx_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {len(durations)}')
+        lines.append(f'mfx_stage_duration_seconds_sum{{stage="{stage}"}} {sum(durations):.6f}')
+        lines.append(f'mfx_stage_duration_seconds_count{{stage="{stage}"}} {len(durations)}')
+
+    lines += [
+        "# HELP mfx_stage_bytes_total Bytes handled by generation pipeline stages.",
+        "# TYPE mfx_stage_bytes_total counter",
+    ]
+    for stage, stage_spans in sorted(by_stage.items()):
+        total = sum(s.get("bytes", 0) for s in stage_spans)
+        if total:
+            lines.append(f'mfx_stage_bytes_total{{stage="{stage}"}} {total}')
+
+    errors = [s for s in spans if s.get("error")]
+    lines += [
+        "# HELP mfx_stage_errors_total Stages that ended with an exception.",
+        "# TYPE mfx_stage_errors_total counter",
+    ]
+    for stage in sorted({s["name"] for s in errors}):
+        count = sum(1 for s in errors if s["name"] == stage)
+        lines.append(f'mfx_stage_errors_total{{stage="{stage}"}} {count}')
+
+    return "\n".join(lines) + "\n"
+
+
+def load_spans(jsonl_path: str) -> List[Dict]:
+    with open(jsonl_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Process-wide tracer used by CharacterAgent, the parser and the scripts
+tracer = Tracer()
+span = tracer.span
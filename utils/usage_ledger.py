@@ -0,0 +1,253 @@
+"""
+Usage ledger and quota-aware planner for generation runs.
+
+Generation runs on a capped plan, so every CLI call is recorded in a
+persistent ledger (calls, estimated tokens, wall time per character and
+post_type). The planner uses those averages to order a pending scene matrix
+so the most high-priority posts complete inside the remaining quota window,
+deferring low-priority (secondary character) posts when the budget runs out.
+
+Ledger file:   ./data/usage_ledger.jsonl
+Deferred file: ./data/deferred_cells.json
+"""
+
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+# Rough chars-per-token ratio for English prose; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Used until the ledger has history for a post_type
+DEFAULT_ESTIMATES = {
+    "social": {"input_tokens": 1500, "output_tokens": 200, "wall_seconds": 12.0},
+    "blog": {"input_tokens": 1500, "output_tokens": 650, "wall_seconds": 25.0},
+    "editorial": {"input_tokens": 1500, "output_tokens": 800, "wall_seconds": 28.0},
+    "dm": {"input_tokens": 1500, "output_tokens": 400, "wall_seconds": 15.0},
+    "surveillance": {"input_tokens": 1500, "output_tokens": 520, "wall_seconds": 20.0},
+}
+
+
+def estimate_tokens(text_or_chars) -> int:
+    chars = text_or_chars if isinstance(text_or_chars, int) else len(text_or_chars)
+    return max(chars // CHARS_PER_TOKEN, 1)
+
+
+class UsageLedger:
+    """Append-only JSONL record of every generation call."""
+
+    def __init__(self, path: str = "./data/usage_ledger.jsonl"):
+        self.path = Path(path)
+        self.entries: List[Dict] = []
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path) as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+
+    def record(
+        self,
+        character: str,
+        post_type: str,
+        prompt: str,
+        output: str,
+        wall_seconds: float,
+        success: bool
+    ) -> Dict:
+        """Record one CLI call (successful or not - both consume quota)."""
+        entry = {
+            "at": time.time(),
+            "character": character,
+            "post_type": post_type,
+            "input_tokens": estimate_tokens(prompt),
+            "output_tokens": estimate_tokens(output) if output else 0,
+            "wall_seconds": round(wall_seconds, 3),
+            "success": success,
+        }
+        with self._lock:
+            self.entries.append(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def usage_since(self, since: float) -> Dict[str, float]:
+        """Calls and estimated tokens used since a unix timestamp."""
+        with self._lock:
+            recent = [e for e in self.entries if e["at"] >= since]
+        return {
+            "calls": len(recent),
+            "tokens": sum(e["input_tokens"] + e["output_tokens"] for e in recent),
+            "wall_seconds": sum(e["wall_seconds"] for e in recent),
+        }
+
+    def estimate(self, character: str, post_type: str) -> Dict[str, float]:
+        """
+        Expected cost of one *completed* post: averages for this character and
+        post_type, falling back to the post_type, then to DEFAULT_ESTIMATES.
+        Failed calls inflate the estimate through the calls-per-success ratio.
+        """
+        with self._lock:
+            entries = list(self.entries)
+
+        for matches in (
+            [e for e in entries if e["character"] == character and e["post_type"] == post_type],
+            [e for e in entries if e["post_type"] == post_type],
+        ):
+            if len(matches) >= 3:
+                successes = max(sum(1 for e in matches if e["success"]), 1)
+                calls_per_post = len(matches) / successes
+                n = len(matches)
+                return {
+                    "calls": calls_per_post,
+                    "input_tokens": sum(e["input_tokens"] for e in matches) / n * calls_per_post,
+                    "output_tokens": sum(e["output_tokens"] for e in matches) / n * calls_per_post,
+                    "wall_seconds": sum(e["wall_seconds"] for e in matches) / n * calls_per_post,
+                }
+
+        default = DEFAULT_ESTIMATES.get(post_type, DEFAULT_ESTIMATES["social"])
+        return {"calls": 1.0, **default}
+
+    def summary(self) -> Dict[Tuple[str, str], Dict]:
+        """Totals per (character, post_type)."""
+        totals: Dict[Tuple[str, str], Dict] = {}
+        with self._lock:
+            entries = list(self.entries)
+        for e in entries:
+            t = totals.setdefault((e["character"], e["post_type"]), {"calls": 0, "tokens": 0, "wall_seconds": 0.0})
+            t["calls"] += 1
+            t["tokens"] += e["input_tokens"] + e["output_tokens"]
+            t["wall_seconds"] += e["wall_seconds"]
+        return totals
+
+
+@dataclass
+class QuotaWindow:
+    """
+    A rolling quota window, e.g. N calls / M tokens per 5 hours.
+    Limits set to None are not enforced.
+    """
+    hours: float = 5.0
+    max_calls: Optional[int] = 40
+    max_tokens: Optional[int] = None
+
+    def remaining(self, ledger: UsageLedger) -> Dict[str, float]:
+        used = ledger.usage_since(time.time() - self.hours * 3600)
+        return {
+            "calls": (self.max_calls - used["calls"]) if self.max_calls is not None else float("inf"),
+            "tokens": (self.max_tokens - used["tokens"]) if self.max_tokens is not None else float("inf"),
+        }
+
+
+@dataclass
+class PlannedCell:
+    """One (scene, character, post_type) generation in the scene matrix."""
+    scene: str
+    character: str
+    post_type: str
+    priority: int  # higher = more important
+    estimate: Dict[str, float] = field(default_factory=dict)
+    calls_per_cell: int = 1  # model calls the cell makes, e.g. N for a best-of-N anchor post
+
+    @property
+    def key(self) -> str:
+        return f"{self.scene}|{self.character}|{self.post_type}"
+
+
+class QuotaPlanner:
+    """
+    Orders the pending scene matrix to fit the remaining quota.
+
+    Cells are taken by priority, and within a priority by cost, so the
+    budget goes to the most important posts first. Cells that no longer fit
+    are deferred and written to the deferred file for the next window.
+    """
+
+    def __init__(
+        self,
+        ledger: UsageLedger,
+        window: QuotaWindow,
+        deferred_path: str = "./data/deferred_cells.json",
+        retry_headroom: float = 1.0
+    ):
+        self.ledger = ledger
+        self.window = window
+        self.deferred_path = Path(deferred_path)
+        self.retry_headroom = retry_headroom  # multiply estimates to leave room for retries
+
+    def plan(self, cells: List[PlannedCell]) -> Tuple[List[PlannedCell], List[PlannedCell]]:
+        """
+        Returns:
+            (scheduled, deferred). Scheduled cells are in execution order.
+        """
+        remaining = self.window.remaining(self.ledger)
+        budget_calls, budget_tokens = remaining["calls"], remaining["tokens"]
+
+        for cell in cells:
+            estimate = self.ledger.estimate(cell.character, cell.post_type)
+            cell.estimate = {key: value * cell.calls_per_cell for key, value in estimate.items()}
+
+        def cost(cell):
+            return cell.estimate["input_tokens"] + cell.estimate["output_tokens"]
+
+        ordered = sorted(cells, key=lambda c: (-c.priority, cost(c)))
+
+        scheduled, deferred = [], []
+        for cell in ordered:
+            calls = cell.estimate["calls"] * self.retry_headroom
+            tokens = cost(cell) * self.retry_headroom
+            if calls <= budget_calls and tokens <= budget_tokens:
+                scheduled.append(cell)
+                budget_calls -= calls
+                budget_tokens -= tokens
+            else:
+                deferred.append(cell)
+
+        return scheduled, deferred
+
+    def save_deferred(self, deferred: List[PlannedCell]):
+        """Merge deferred cells into the deferred file (keyed, so re-deferrals don't duplicate)."""
+        existing = self.load_deferred()
+        merged = {c.key: c for c in existing}
+        merged.update({c.key: c for c in deferred})
+
+        self.deferred_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.deferred_path, 'w') as f:
+            json.dump({
+                "updated_at": datetime.now().isoformat(),
+                "cells": [asdict(c) for c in merged.values()]
+            }, f, indent=2)
+
+    def load_deferred(self) -> List[PlannedCell]:
+        if not self.deferred_path.exists():
+            return []
+        with open(self.deferred_path) as f:
+            return [PlannedCell(**c) for c in json.load(f)["cells"]]
+
+    def clear_deferred(self, completed: List[PlannedCell]):
+        """Drop cells that have now been generated from the deferred file."""
+        done = {c.key for c in completed}
+        remaining = [c for c in self.load_deferred() if c.key not in done]
+        if self.deferred_path.exists():
+            self.deferred_path.unlink()
+        if remaining:
+            self.save_deferred(remaining)
+
+    def print_plan(self, scheduled: List[PlannedCell], deferred: List[PlannedCell]):
+        remaining = self.window.remaining(self.ledger)
+        print(f"\nQuota window: {self.window.hours}h | remaining calls: {remaining['calls']} "
+              f"| remaining tokens: {remaining['tokens']}")
+        print(f"Scheduled: {len(scheduled)} | Deferred: {len(deferred)}")
+        for cell in deferred:
+            print(f"  ⏸ deferred {cell.character:10} {cell.post_type:10} (priority {cell.priority})")
+
+
+if __name__ == "__main__":
+    # Run from the repo root: python -m utils.usage_ledger
+    ledger = UsageLedger()
+    print(f"{'character':12} {'post_type':12} {'calls':>6} {'tokens':>9} {'wall s':>9}")
+    for (character, post_type), totals in sorted(ledger.summary().items()):
+        print(f"{character:12} {post_type:12} {totals['calls']:>6} {totals['tokens']:>9} {totals['wall_seconds']:>9.1f}")